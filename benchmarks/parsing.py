@@ -0,0 +1,214 @@
+"""
+解析程式的效能量測（不需瀏覽器）
+
+    python benchmarks/parsing.py                  # 量測並與基準比較
+    python benchmarks/parsing.py --save           # 量測並更新基準
+    python benchmarks/parsing.py --threshold 0.5  # 每單位耗時超過基準 50% 才視為退步
+
+以產生的課程列表頁（10 至 10,000 列）與課程摘要頁量測 CourseParser 使用的解析函式：
+- list_html: 由列表頁 HTML 取出課程資料（parse_html_tables、find_list_rows、parse_course_rows）
+- list_rows: 由瀏覽器回傳的儲存格文字建立課程資料（parse_course_rows）
+- filter: 依狀態與日期範圍篩選（filter_courses）
+- summary_html: 由課程摘要頁 HTML 擷取統計（parse_html_tables、StatsExtractor）
+- stats_extract: 由瀏覽器回傳的表格文字擷取統計（StatsExtractor）
+- parse_number / parse_date: 單一欄位解析
+結果以「每單位（列、課程或次）微秒」記錄；每個項目取各規模的中位數與基準比較（降低單次量測的雜訊），
+有任一項超過基準乘以 (1 + threshold) 時返回代碼 1。基準與機器相關，更換機器後請以 --save 重建
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import timeit
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from src.crawler.course_list import filter_courses, find_list_rows, parse_course_rows, parse_date
+from src.crawler.html_tables import parse_html_tables
+from src.crawler.stats_schema import REGIONS, StatsExtractor, parse_number
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parsing_baseline.json')
+SIZES = (10, 100, 1000, 10000)
+STATUSES = ("開課中", "即將開課", "已結束")
+# 課程摘要的每門耗時與列表規模無關，最多產生這麼多門以縮短量測時間
+MAX_SUMMARIES = 1000
+
+
+def make_list_rows(count: int, seed: int = 0) -> list:
+    """產生課程列表的儲存格文字，欄位位置同 ewant 課程列表"""
+    rng = random.Random(seed)
+    rows = []
+    for idx in range(count):
+        start = datetime(2023, rng.randint(1, 12), rng.randint(1, 28))
+        end = datetime(start.year + 1, start.month, start.day)
+        # 少數課程的日期為文字，模擬無法解析的日期
+        start_text = "另行公告" if idx % 97 == 0 else start.strftime('%Y-%m-%d')
+        rows.append([
+            rng.choice(STATUSES), str(idx), f"課程名稱 {idx} 數位學習與 AI 應用",
+            "某某大學", start_text, end.strftime('%Y/%m/%d'), "自主學習", "進入課程",
+        ])
+    return rows
+
+
+def make_list_html(rows: list) -> str:
+    """將儲存格文字組成課程列表頁"""
+    body = "".join(
+        "<tr>" + "".join(f"<td>{cell}</td>" for cell in cells[:-1]) +
+        '<td><input class="btn btn-primary" type="button" value="進入課程"></td></tr>'
+        for cells in rows
+    )
+    return (
+        "<html><body><div class='table-responsive'><table>"
+        "<thead><tr><th>狀態</th><th>#</th><th>課程名稱</th><th>學校</th>"
+        "<th>開始</th><th>結束</th><th>類型</th><th></th></tr></thead>"
+        f"<tbody>{body}</tbody></table></div></body></html>"
+    )
+
+
+def make_summary_tables(seed: int = 0) -> list:
+    """產生一門課程的課程摘要表格文字：[表格][列][儲存格]"""
+    rng = random.Random(seed)
+    labels = ("選修人數", "通過人數", "影片瀏覽次數", "作業測驗作答次數",
+              "講義/參考資料瀏覽次數", "講義/參考資料瀏覽人數")
+    rows = []
+    for label in labels:
+        for pos, region in enumerate(REGIONS):
+            value = f"{rng.randint(0, 50000):,}"
+            # 類型欄位以 rowspan 延續，後續列只有地區與數值
+            rows.append([label, region, value] if pos == 0 else [region, value])
+    rows.append(["討論次數", str(rng.randint(0, 500))])
+    rows.append(["使用行動載具瀏覽影片次數", str(rng.randint(0, 500))])
+    return [[["課程資訊"], ["授課教師", "某某老師"]], rows]
+
+
+def make_summary_html(tables: list) -> str:
+    """將課程摘要表格文字組成課程摘要頁"""
+    html = ["<html><body><section class='panel'>"]
+    for rows in tables:
+        html.append("<div class='table-responsive'><table>")
+        for cells in rows:
+            html.append("<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>")
+        html.append("</table></div>")
+    html.append("</section></body></html>")
+    return "".join(html)
+
+
+def best_time(func, repeat: int) -> float:
+    """
+    單次呼叫的耗時（秒）
+    每輪呼叫足夠次數使耗時至少 0.2 秒（timeit 的 autorange），共 repeat 輪取最短，以降低雜訊
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run_benchmarks(sizes=SIZES, repeat: int = 5) -> dict:
+    """
+    執行所有量測
+    Returns:
+        dict: "項目/規模" -> 每單位微秒
+    """
+    results = {}
+    start_date, end_date = datetime(2023, 3, 1), datetime(2023, 9, 30)
+    extractor = StatsExtractor()
+
+    for size in sizes:
+        rows = make_list_rows(size, seed=size)
+        html = make_list_html(rows)
+        courses = parse_course_rows(rows)
+        summaries = [make_summary_tables(seed) for seed in range(min(size, MAX_SUMMARIES))]
+        summary_pages = [make_summary_html(tables) for tables in summaries]
+        numbers = [cells[-1] for tables in summaries for cells in tables[1]][:size]
+        dates = [cells[4] for cells in rows]
+
+        # 項目 -> (量測函式, 單位數)
+        cases = {
+            'list_html': (lambda: parse_course_rows(find_list_rows(parse_html_tables(html))), size),
+            'list_rows': (lambda: parse_course_rows(rows), size),
+            'filter': (lambda: filter_courses(courses, ["開課中"], start_date, end_date), size),
+            'summary_html': (lambda: [extractor.extract(parse_html_tables(page)) for page in summary_pages],
+                             len(summary_pages)),
+            'stats_extract': (lambda: [extractor.extract(tables) for tables in summaries], len(summaries)),
+            'parse_number': (lambda: [parse_number(text) for text in numbers], len(numbers)),
+            'parse_date': (lambda: [parse_date(text) for text in dates], size),
+        }
+        for name, (func, units) in cases.items():
+            results[f"{name}/{size}"] = best_time(func, repeat) / units * 1e6
+
+    return results
+
+
+def per_case(results: dict) -> dict:
+    """各項目在所有規模的每單位耗時中位數"""
+    values = {}
+    for name, value in results.items():
+        values.setdefault(name.split('/')[0], []).append(value)
+    return {case: statistics.median(case_values) for case, case_values in values.items()}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    以各項目的中位數與基準比較
+    Returns:
+        list: 退步的項目 (名稱, 基準, 本次)
+    """
+    current, base_values = per_case(results), per_case(baseline)
+    regressions = []
+    for case, value in current.items():
+        base = base_values.get(case)
+        if base and value > base * (1 + threshold):
+            regressions.append((case, base, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="量測解析程式的每單位耗時")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help="課程列表列數")
+    parser.add_argument('--repeat', type=int, default=3, help="每項重複次數（取最短）")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="基準檔案")
+    parser.add_argument('--threshold', type=float, default=0.25, help="容許的退步比例")
+    parser.add_argument('--save', action='store_true', help="以本次結果更新基準")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+
+    print(f"{'項目':<22} {'本次(µs)':>10} {'基準(µs)':>10} {'變化':>8}")
+    base_cases = per_case(baseline)
+    rows = [(name, value, baseline.get(name)) for name, value in results.items()]
+    rows += [(f"{case}（中位數）", value, base_cases.get(case)) for case, value in per_case(results).items()]
+    for name, value, base in rows:
+        change = f"{value / base - 1:+.0%}" if base else "-"
+        base_text = f"{base:.2f}" if base else "-"
+        print(f"{name:<22} {value:>10.2f} {base_text:>10} {change:>8}")
+
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'python': sys.version.split()[0],
+                'unit': 'microseconds per row/course/call',
+                'results': results,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"基準已更新：{args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n以下項目比基準慢超過 {args.threshold:.0%}：")
+        for name, base, value in regressions:
+            print(f"  {name}: {base:.2f}µs -> {value:.2f}µs")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+程式啟動時間量測
+
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --importtime
+    python benchmarks/startup.py --check-imports
+
+每次量測都啟動新的行程（避免模組已載入的影響），記錄：
+- import: 載入主視窗模組的時間
+- window: 建立主視窗的時間
+- first_paint: 從行程啟動到主視窗第一次繪製的時間
+量測前先確認載入主視窗模組時沒有載入 LAZY_MODULES，有的話返回代碼 1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 應在實際使用時才載入的較重模組，程式啟動時不應出現在 sys.modules
+LAZY_MODULES = ('selenium', 'psutil', 'openpyxl', 'keyring')
+
+
+def measure_once():
+    """子行程：量測一次啟動並以 JSON 輸出結果"""
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT_DIR)
+
+    from PyQt6.QtCore import QEvent, QObject, QTimer
+    from PyQt6.QtWidgets import QApplication
+    from src.ui.main_window import MainWindow
+    imported = time.perf_counter()
+
+    app = QApplication(sys.argv)
+    result = {}
+
+    class PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and 'first_paint' not in result:
+                result['first_paint'] = time.time()
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    watcher = PaintWatcher()
+    window_start = time.perf_counter()
+    window = MainWindow()
+    window.installEventFilter(watcher)
+    result['import'] = imported - start
+    result['window'] = time.perf_counter() - window_start
+    # 視窗未能繪製時（例如無顯示環境）避免無限等待
+    QTimer.singleShot(10000, app.quit)
+    app.exec()
+    window.close()
+    print(json.dumps(result))
+
+
+def run_child() -> dict:
+    """啟動子行程量測一次，first_paint 換算為從啟動行程起算的秒數"""
+    launched = time.time()
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child'],
+        capture_output=True, text=True, cwd=ROOT_DIR, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    if 'first_paint' in result:
+        result['first_paint'] -= launched
+    return result
+
+
+def loaded_lazy_modules() -> list:
+    """在新的行程載入主視窗模組，返回其中已被載入的 LAZY_MODULES"""
+    script = (
+        "import json, sys; import src.ui.main_window; "
+        f"print(json.dumps([name for name in {LAZY_MODULES!r} if name in sys.modules]))"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', script], capture_output=True, text=True, cwd=ROOT_DIR, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def check_lazy_imports() -> bool:
+    """確認啟動時沒有載入較重的模組"""
+    loaded = loaded_lazy_modules()
+    if loaded:
+        print(f"啟動時載入了應延後載入的模組：{', '.join(loaded)}")
+        return False
+    print("啟動時未載入 " + "、".join(LAZY_MODULES))
+    return True
+
+
+def show_import_time(limit: int = 20):
+    """列出載入主視窗模組時最耗時的模組（python -X importtime）"""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import src.ui.main_window'],
+        capture_output=True, text=True, cwd=ROOT_DIR
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.split('|')]
+        rows.append((int(cumulative_us), int(self_us.split(':')[-1]), name))
+    rows.sort(reverse=True)
+    print(f"{'累計(ms)':>10} {'自身(ms)':>10}  模組")
+    for cumulative_us, self_us, name in rows[:limit]:
+        print(f"{cumulative_us / 1000:>10.1f} {self_us / 1000:>10.1f}  {name.strip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="量測程式啟動時間")
+    parser.add_argument('--runs', type=int, default=5, help="量測次數")
+    parser.add_argument('--output', help="將結果輸出為 JSON 檔案")
+    parser.add_argument('--importtime', action='store_true', help="列出最耗時的模組載入")
+    parser.add_argument('--check-imports', action='store_true', help="只確認啟動時沒有載入較重的模組")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_once()
+        return
+    if args.importtime:
+        show_import_time()
+        return
+    if not check_lazy_imports():
+        sys.exit(1)
+    if args.check_imports:
+        return
+
+    runs = [run_child() for _ in range(args.runs)]
+    summary = {}
+    for key in ('import', 'window', 'first_paint'):
+        values = [run[key] for run in runs if key in run]
+        if values:
+            summary[key] = {'median': statistics.median(values), 'min': min(values), 'max': max(values)}
+            print(f"{key:<12} 中位數 {summary[key]['median']:.3f}s  "
+                  f"最小 {summary[key]['min']:.3f}s  最大 {summary[key]['max']:.3f}s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'runs': runs, 'summary': summary}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
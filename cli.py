@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import sys
+
+from main import setup_environment
+
+
+def get_credentials(args):
+    """依序從參數、環境變數、系統金鑰管理工具取得帳號密碼"""
+    username = args.username or os.environ.get('EWANT_USERNAME')
+    password = args.password or os.environ.get('EWANT_PASSWORD')
+    if not (username and password):
+        from src.utils.config import Config
+        saved_config = Config().load_config()
+        username = username or saved_config.get('username')
+        password = password or saved_config.get('password')
+    if not (username and password):
+        print("請提供帳號和密碼（--username/--password 或環境變數 EWANT_USERNAME/EWANT_PASSWORD）")
+        sys.exit(1)
+    return username, password
+
+
+def metric_keys(text):
+    """--metrics 參數：以逗號分隔的統計名稱"""
+    from src.crawler.stats_schema import parse_metric_keys
+    try:
+        return parse_metric_keys(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def add_login_arguments(parser):
+    parser.add_argument('--username', help="Ewant 帳號")
+    parser.add_argument('--password', help="Ewant 密碼")
+
+
+def cmd_crawl(args):
+    """執行一次爬取，可在同一次登入中搜尋多個關鍵字"""
+    from src.crawler.course_list import split_keywords
+    from src.crawler.runner import create_session
+
+    texts = list(args.search or [])
+    if args.keywords_file:
+        with open(args.keywords_file, encoding='utf-8') as f:
+            texts.append(f.read())
+    keywords = split_keywords('\n'.join(texts))
+
+    username, password = get_credentials(args)
+    login_manager, parser = create_session(
+        username,
+        password,
+        search_text=keywords[0] if keywords else None,
+        status_filters=args.status,
+        tabs=args.tabs,
+        capture_network=args.capture_network,
+        stat_keys=args.metrics,
+        prefetch=args.prefetch
+    )
+    try:
+        if len(keywords) > 1:
+            courses = parser.process_keywords(keywords)
+        else:
+            courses = parser.process_all_courses()
+    finally:
+        login_manager.close()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(courses, f, ensure_ascii=False, indent=2)
+    print(f"已輸出 {len(courses)} 門課程到 {args.output}")
+
+
+def cmd_schedule(args):
+    """常駐排程，依各課程的變動頻率重新爬取"""
+    from src.crawler.scheduler import RefreshScheduler
+
+    username, password = get_credentials(args)
+    scheduler = RefreshScheduler(
+        args.db,
+        username,
+        password,
+        search_text=args.search,
+        status_filters=args.status
+    )
+    if args.once:
+        scheduler.run_once()
+    else:
+        scheduler.run_forever()
+
+
+def cmd_shard_publish(args):
+    """發布分散式爬取工作"""
+    from src.crawler.sharding import publish_job
+    from src.crawler.work_queue import WorkQueue
+
+    username, password = get_credentials(args)
+    queue = WorkQueue(args.queue)
+    try:
+        publish_job(queue, args.job, username, password,
+                    search_text=args.search, status_filters=args.status)
+    finally:
+        queue.close()
+
+
+def cmd_shard_worker(args):
+    """領取並處理分散式爬取工作"""
+    from src.crawler.sharding import run_worker
+    from src.crawler.work_queue import WorkQueue
+
+    username, password = get_credentials(args)
+    queue = WorkQueue(args.queue, lease_seconds=args.lease)
+    try:
+        run_worker(queue, args.job, username, password)
+    finally:
+        queue.close()
+
+
+def cmd_shard_collect(args):
+    """合併分散式爬取結果"""
+    from src.crawler.sharding import collect_results
+    from src.crawler.work_queue import WorkQueue
+
+    queue = WorkQueue(args.queue)
+    try:
+        courses = collect_results(queue, args.job, wait=not args.no_wait)
+    finally:
+        queue.close()
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(courses, f, ensure_ascii=False, indent=2)
+    print(f"已輸出 {len(courses)} 門課程到 {args.output}")
+
+
+def cmd_reparse(args):
+    """從頁面封存檔離線重新解析課程資料"""
+    from src.crawler.archive import reparse_archive
+
+    courses = reparse_archive(args.archive, workers=args.workers)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(courses, f, ensure_ascii=False, indent=2)
+    print(f"已輸出 {len(courses)} 門課程到 {args.output}")
+
+
+def cmd_history_search(args):
+    """搜尋歷次爬取過的課程，可直接針對搜尋結果重新爬取"""
+    from src.crawler.history import CourseHistory, default_history_path
+
+    history = CourseHistory(args.db or default_history_path())
+    try:
+        courses = history.search(args.query, since=args.since, statuses=args.status, limit=args.limit)
+        for course in courses:
+            fetched = "已擷取" if 'stats' in course else "未擷取"
+            print(f"{course['start_time']}\t{course['status']}\t{fetched}\t{course['name']}")
+        print(f"共 {len(courses)} 門課程")
+
+        if args.crawl and courses:
+            from src.crawler.runner import run_headless_crawl
+
+            username, password = get_credentials(args)
+            keys = {course['key'] for course in courses}
+            courses = run_headless_crawl(
+                username,
+                password,
+                search_text=args.query,
+                status_filters=['開課中', '即將開課', '已結束'],
+                course_filter=lambda course: course['key'] in keys
+            )
+            history.record_courses(courses, args.query)
+    finally:
+        history.close()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(courses, f, ensure_ascii=False, indent=2)
+        print(f"已輸出 {len(courses)} 門課程到 {args.output}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Ewant 課程資料爬蟲（無介面模式）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    crawl_parser = subparsers.add_parser('crawl', help="執行一次爬取並輸出 JSON")
+    add_login_arguments(crawl_parser)
+    crawl_parser.add_argument('--search', action='append',
+                              help="搜尋關鍵字，可重複指定或以逗號分隔；多個關鍵字時重複的課程只擷取一次")
+    crawl_parser.add_argument('--keywords-file', help="關鍵字清單檔案（每行一個）")
+    crawl_parser.add_argument('--status', action='append', choices=['開課中', '即將開課', '已結束'],
+                              help="課程狀態，可重複指定（預設開課中）")
+    crawl_parser.add_argument('--tabs', type=int, default=1, help="同時擷取課程摘要的分頁數")
+    crawl_parser.add_argument('--metrics', type=metric_keys,
+                              help="只擷取這些統計（以逗號分隔，例如 選修人數,通過人數），預設全部")
+    crawl_parser.add_argument('--capture-network', action='store_true',
+                              help="從瀏覽器收到的網路回應直接解析資料，找不到時改讀頁面")
+    crawl_parser.add_argument('--no-prefetch', dest='prefetch', action='store_false',
+                              help="逐一擷取時不在背景分頁預先載入下一門課程")
+    crawl_parser.add_argument('--output', default='results.json', help="輸出的 JSON 檔案")
+    crawl_parser.set_defaults(func=cmd_crawl)
+
+    schedule_parser = subparsers.add_parser('schedule', help="依課程變動頻率自動重新爬取")
+    add_login_arguments(schedule_parser)
+    schedule_parser.add_argument('--db', default='crawl_state.db', help="排程狀態資料庫路徑")
+    schedule_parser.add_argument('--search', help="搜尋關鍵字")
+    schedule_parser.add_argument('--status', action='append', choices=['開課中', '即將開課', '已結束'],
+                                 help="納入排程的課程狀態，可重複指定（預設全部）")
+    schedule_parser.add_argument('--once', action='store_true', help="只執行一輪後結束")
+    schedule_parser.set_defaults(func=cmd_schedule)
+
+    publish_parser = subparsers.add_parser('shard-publish', help="掃描課程列表並發布到共用工作佇列")
+    add_login_arguments(publish_parser)
+    publish_parser.add_argument('--queue', required=True, help="共用工作佇列（SQLite 檔案）路徑")
+    publish_parser.add_argument('--job', required=True, help="工作識別碼")
+    publish_parser.add_argument('--search', help="搜尋關鍵字")
+    publish_parser.add_argument('--status', action='append', choices=['開課中', '即將開課', '已結束'],
+                                help="課程狀態，可重複指定（預設開課中）")
+    publish_parser.set_defaults(func=cmd_shard_publish)
+
+    worker_parser = subparsers.add_parser('shard-worker', help="從共用工作佇列領取課程並擷取資料")
+    add_login_arguments(worker_parser)
+    worker_parser.add_argument('--queue', required=True, help="共用工作佇列（SQLite 檔案）路徑")
+    worker_parser.add_argument('--job', required=True, help="工作識別碼")
+    worker_parser.add_argument('--lease', type=int, default=600, help="租約秒數，逾時未完成的課程會被重新分派")
+    worker_parser.set_defaults(func=cmd_shard_worker)
+
+    collect_parser = subparsers.add_parser('shard-collect', help="合併所有 worker 的結果")
+    collect_parser.add_argument('--queue', required=True, help="共用工作佇列（SQLite 檔案）路徑")
+    collect_parser.add_argument('--job', required=True, help="工作識別碼")
+    collect_parser.add_argument('--output', default='results.json', help="輸出的 JSON 檔案")
+    collect_parser.add_argument('--no-wait', action='store_true', help="不等待未完成的項目")
+    collect_parser.set_defaults(func=cmd_shard_collect)
+
+    reparse_parser = subparsers.add_parser('reparse', help="從頁面封存檔離線重新解析課程資料")
+    reparse_parser.add_argument('archive', help="頁面封存檔（.jsonl.gz）")
+    reparse_parser.add_argument('--output', default='results.json', help="輸出的 JSON 檔案")
+    reparse_parser.add_argument('--workers', type=int, help="平行解析的行程數（預設為 CPU 核心數）")
+    reparse_parser.set_defaults(func=cmd_reparse)
+
+    history_parser = subparsers.add_parser('history-search', help="搜尋歷次爬取過的課程名稱")
+    add_login_arguments(history_parser)
+    history_parser.add_argument('query', help="課程名稱包含的文字")
+    history_parser.add_argument('--db', help="歷史資料庫路徑（預設為 history/courses.db）")
+    history_parser.add_argument('--since', help="只列出此日期之後開課的課程（YYYY-MM-DD）")
+    history_parser.add_argument('--status', action='append', choices=['開課中', '即將開課', '已結束'],
+                                help="課程狀態，可重複指定（預設全部）")
+    history_parser.add_argument('--limit', type=int, help="最多列出幾門")
+    history_parser.add_argument('--crawl', action='store_true', help="登入並只重新擷取搜尋到的課程")
+    history_parser.add_argument('--output', help="將結果輸出為 JSON 檔案")
+    history_parser.set_defaults(func=cmd_history_search)
+
+    return parser
+
+
+if __name__ == "__main__":
+    setup_environment()
+    args = build_parser().parse_args()
+    args.func(args)
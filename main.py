@@ -17,6 +17,9 @@ def setup_environment():
         os.environ['PATH'] = base_path + os.pathsep + os.environ['PATH']
 
 if __name__ == "__main__":
+    # 爬蟲在子行程執行，打包後的執行檔需要此呼叫
+    import multiprocessing
+    multiprocessing.freeze_support()
     setup_environment()
     
     from PyQt6.QtWidgets import QApplication
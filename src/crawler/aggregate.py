@@ -0,0 +1,140 @@
+from array import array
+from itertools import compress
+from typing import Dict, List, Optional, Sequence
+
+from src.crawler.stats_schema import REGIONS
+
+# 依地區區分的統計欄位
+REGION_FIELDS = ('選修人數', '通過人數', '影片瀏覽次數', '作業測驗作答次數', '講義參考資料瀏覽次數')
+# 不分地區的統計欄位
+SCALAR_FIELDS = ('討論次數', '使用行動載具瀏覽影片次數')
+
+STATUS_ORDER = ('開課中', '即將開課', '已結束')
+
+SUMMARY_HEADERS = [
+    "分類", "項目", "課程數", "選修人數", "通過人數", "通過率",
+    "每人影片瀏覽次數", "每人作答次數", "每人講義瀏覽次數", "每人討論次數"
+]
+# 計算每人平均的欄位，依 SUMMARY_HEADERS 的順序
+PER_PERSON_FIELDS = ('影片瀏覽次數', '作業測驗作答次數', '講義參考資料瀏覽次數', '討論次數')
+
+
+def _to_number(value) -> float:
+    """統計值可能是 'N/A' 或空字串，視為 0"""
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+def _has_value(value) -> bool:
+    """課程是否有此統計（未勾選或未擷取的統計不會出現在 stats 中）"""
+    if isinstance(value, dict):
+        return any(isinstance(item, (int, float)) for item in value.values())
+    return isinstance(value, (int, float))
+
+
+def _ratio(numerator: Optional[float], denominator: Optional[float], digits: int):
+    """比例，缺少統計時留白"""
+    if numerator is None or denominator is None:
+        return ""
+    return round(numerator / denominator, digits) if denominator else 0.0
+
+
+class CourseColumns:
+    """
+    課程統計的欄式儲存：每個欄位一個 array('d')，彙總時直接對整欄加總
+    數萬筆歷史資料時比逐筆走訪巢狀 dict 快得多，也省記憶體
+    present 記錄各課程是否有該統計，沒有的課程不計入加總與每人平均的分母
+    """
+
+    def __init__(self, courses: Sequence[Dict]):
+        self.size = len(courses)
+        self.status: List[str] = [course.get('status', '') for course in courses]
+        self.columns: Dict[str, array] = {}
+
+        all_stats = [course.get('stats') or {} for course in courses]
+        self.present: Dict[str, List[bool]] = {
+            field: [_has_value(stats.get(field)) for stats in all_stats]
+            for field in REGION_FIELDS + SCALAR_FIELDS
+        }
+        for field in REGION_FIELDS:
+            field_values = [stats.get(field) or {} for stats in all_stats]
+            for region in REGIONS:
+                self.columns[f"{field}|{region}"] = array('d', (
+                    _to_number(values.get(region)) for values in field_values
+                ))
+        for field in SCALAR_FIELDS:
+            self.columns[field] = array('d', (_to_number(stats.get(field)) for stats in all_stats))
+
+        # 各地區加總後的欄位
+        for field in REGION_FIELDS:
+            region_columns = [self.columns[f"{field}|{region}"] for region in REGIONS]
+            self.columns[field] = array('d', map(sum, zip(*region_columns)))
+
+    def total(self, column: str, mask: Sequence[bool] = None, present_field: str = None) -> Optional[float]:
+        """
+        加總整欄，mask 指定時只加總符合的列
+        Args:
+            column: 欄位，地區欄位為 '欄位|地區'
+            mask: 要加總的列
+            present_field: 只加總有此統計的課程（預設為欄位本身），例如每人平均的分母
+        Returns:
+            Optional[float]: 加總，沒有任何課程有此統計時返回 None
+        """
+        present = self.present[present_field or column.split('|')[0]]
+        if mask is not None:
+            present = [has and selected for has, selected in zip(present, mask)]
+        if not any(present):
+            return None
+        return sum(compress(self.columns[column], present))
+
+    def status_mask(self, status: str) -> List[bool]:
+        return [value == status for value in self.status]
+
+
+def summarize_courses(courses: Sequence[Dict]) -> List[List]:
+    """
+    彙總已擷取課程的統計：全部、各課程狀態、各地區
+    尚未擷取的課程不計入；沒有任何課程有的統計（例如未勾選）留白而不是 0
+    Args:
+        courses: 爬取到的課程資料
+    Returns:
+        List[List]: 各列對應 SUMMARY_HEADERS 的欄位，通過率為 0~1 的比例
+    """
+    columns = CourseColumns([course for course in courses if course.get('stats')])
+    rows = []
+
+    def add_row(category: str, label: str, count: int, mask=None, region: str = None):
+        suffix = f"|{region}" if region else ""
+
+        def total(field: str, present_field: str = None):
+            return columns.total(field + suffix, mask, present_field)
+
+        enrolled = total('選修人數')
+        passed = total('通過人數')
+        row = [
+            category,
+            label,
+            count,
+            int(enrolled) if enrolled is not None else "",
+            int(passed) if passed is not None else "",
+            _ratio(passed, total('選修人數', '通過人數'), 4),
+        ]
+        for field in PER_PERSON_FIELDS:
+            # 討論次數不分地區，地區列不計算每人討論次數
+            if region and field in SCALAR_FIELDS:
+                row.append("")
+            else:
+                row.append(_ratio(total(field), total('選修人數', field), 2))
+        rows.append(row)
+
+    add_row("全部", "全部課程", columns.size)
+
+    statuses = list(STATUS_ORDER) + sorted(set(columns.status) - set(STATUS_ORDER) - {''})
+    for status in statuses:
+        mask = columns.status_mask(status)
+        if any(mask):
+            add_row("課程狀態", status, sum(mask), mask)
+
+    for region in REGIONS:
+        add_row("地區", region, columns.size, region=region)
+
+    return rows
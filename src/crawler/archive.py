@@ -0,0 +1,102 @@
+import gzip
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+from src.crawler.course_list import find_list_rows, parse_course_rows
+from src.crawler.html_tables import parse_html_tables, parse_summary_tables
+from src.crawler.stats_schema import StatsExtractor
+
+
+class CrawlArchive:
+    """將爬取過程中抓到的課程列表與課程摘要頁面壓縮保存（gzip 壓縮的 JSON Lines）"""
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path: 封存檔路徑，已存在時接續寫入
+        """
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._file = gzip.open(file_path, 'at', encoding='utf-8')
+
+    def record(self, kind: str, url: str, html: str, course: Optional[Dict] = None, **extra) -> None:
+        """
+        寫入一筆頁面
+        Args:
+            kind: 'list' 或 'summary'
+            url: 頁面網址
+            html: 頁面原始碼
+            course: 課程資料（summary 頁面時提供）
+            extra: 其他附加資訊，例如搜尋關鍵字
+        """
+        entry = {
+            'kind': kind,
+            'url': url,
+            'timestamp': time.time(),
+            'course_key': course['key'] if course else None,
+            'course': course,
+            'html': html,
+        }
+        entry.update(extra)
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            # 確保程式中斷時已寫入的頁面仍可讀取
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def read_archive(file_path: str) -> Iterator[Dict]:
+    """逐筆讀取封存檔"""
+    with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _parse_summary(html: str) -> Dict:
+    """
+    在子行程中解析課程摘要頁（模組層級函式才能被 ProcessPoolExecutor 傳遞）
+    與爬取時相同只讀取 SUMMARY_TABLE_SELECTOR 的表格，重新解析的結果才會一致
+    """
+    return StatsExtractor().extract(parse_summary_tables(html))
+
+
+def reparse_archive(file_path: str, workers: int = None) -> List[Dict]:
+    """
+    以封存檔重新產生爬取結果，課程摘要頁以多個行程平行解析
+    Args:
+        file_path: 封存檔路徑
+        workers: 行程數，預設為 CPU 核心數
+    Returns:
+        List[Dict]: 有課程摘要的課程資料（依列表順序，附帶重新解析的 stats）
+    """
+    courses: Dict[str, Dict] = {}
+    summaries: List[Dict] = []
+
+    for entry in read_archive(file_path):
+        if entry['kind'] == 'list':
+            for course in parse_course_rows(find_list_rows(parse_html_tables(entry['html']))):
+                courses.setdefault(course['key'], course)
+        elif entry['kind'] == 'summary':
+            summaries.append(entry)
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(summaries) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parsed = executor.map(_parse_summary, (entry['html'] for entry in summaries), chunksize=chunksize)
+        for entry, stats in zip(summaries, parsed):
+            # 同一課程有多筆時以最後抓取的為準
+            course = courses.setdefault(entry['course_key'], dict(entry['course'] or {}))
+            course['stats'] = stats
+            course['crawled_at'] = entry['timestamp']
+
+    return [course for course in courses.values() if 'stats' in course]
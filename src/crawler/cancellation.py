@@ -0,0 +1,59 @@
+import threading
+
+# 等待頁面元素時檢查取消的間隔（秒）
+POLL_INTERVAL = 0.2
+
+
+class CrawlCancelled(BaseException):
+    """
+    爬取已被取消
+    繼承 BaseException，不會被各處的 except Exception 當成一般錯誤吞掉，可直接回到最外層
+    """
+
+
+class CancellationToken:
+    """可跨執行緒設定的取消旗標，所有等待與休眠都應透過它進行，取消後可立即結束"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise CrawlCancelled()
+
+    def sleep(self, seconds: float) -> None:
+        """休眠，期間被取消時立即拋出 CrawlCancelled"""
+        if self._event.wait(seconds):
+            raise CrawlCancelled()
+
+
+class CancellableWait:
+    """
+    可取消的 WebDriverWait：每次輪詢前檢查取消旗標
+    搭配較短的 implicit wait，取消後最多在一次輪詢加一次元素查詢的時間內結束
+    """
+
+    def __init__(self, driver, timeout: float, token: CancellationToken):
+        """
+        Args:
+            driver: WebDriver
+            timeout: 最長等待秒數
+            token: 取消旗標
+        """
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        self._wait = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL)
+        self.token = token
+
+    def until(self, method, message: str = ''):
+        def check(driver):
+            self.token.raise_if_cancelled()
+            return method(driver)
+        return self._wait.until(check, message)
@@ -0,0 +1,67 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from src.crawler.course_list import parse_date
+
+
+class CourseIndex:
+    """
+    課程列表快照的索引，用於在本機重新篩選已爬取的結果
+    課程狀態以位置清單索引，開課日期排序後以二分搜尋取範圍，名稱以子字串比對
+    """
+
+    def __init__(self, courses: Sequence[Dict]):
+        """
+        Args:
+            courses: 完整的課程列表（未經篩選）
+        """
+        self.courses = list(courses)
+        self.by_status: Dict[str, List[int]] = {}
+        self.names = []
+        dated = []
+        self.undated = set()    # 無法解析日期的課程，與爬取時相同，不受日期範圍限制
+
+        for pos, course in enumerate(self.courses):
+            self.by_status.setdefault(course['status'], []).append(pos)
+            self.names.append(course['name'].casefold())
+            start = parse_date(course['start_time'])
+            if start is None:
+                self.undated.add(pos)
+            else:
+                dated.append((start, pos))
+
+        dated.sort()
+        self.dates = [start for start, _ in dated]
+        self.date_positions = [pos for _, pos in dated]
+
+    def filter(self, statuses: Optional[Iterable[str]] = None, start_date: datetime = None,
+               end_date: datetime = None, name: str = None) -> List[Dict]:
+        """
+        篩選課程，條件為 None 時不限制
+        Args:
+            statuses: 課程狀態
+            start_date / end_date: 開課日期範圍（需同時提供）
+            name: 課程名稱包含的文字（不分大小寫）
+        Returns:
+            List[Dict]: 符合條件的課程，依原列表順序
+        """
+        candidates = None
+        if statuses is not None:
+            candidates = set()
+            for status in statuses:
+                candidates.update(self.by_status.get(status, ()))
+
+        if start_date and end_date:
+            lo = bisect_left(self.dates, start_date)
+            hi = bisect_right(self.dates, end_date)
+            in_range = set(self.date_positions[lo:hi]) | self.undated
+            candidates = in_range if candidates is None else candidates & in_range
+
+        positions = range(len(self.courses)) if candidates is None else sorted(candidates)
+
+        needle = (name or '').strip().casefold()
+        if needle:
+            positions = [pos for pos in positions if needle in self.names[pos]]
+
+        return [self.courses[pos] for pos in positions]
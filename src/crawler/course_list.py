@@ -0,0 +1,162 @@
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# 一次取回課程列表的儲存格文字：[列][儲存格]
+# arguments[1]、arguments[2] 為起始列與列數（可省略），只取回其中一段，讓擷取可以在列表讀完前開始
+LIST_ROWS_SCRIPT = """
+var table = document.querySelector(arguments[0]);
+if (!table) { return null; }
+var rows = table.querySelectorAll('tbody tr');
+var start = arguments[1] || 0;
+var end = arguments[2] ? Math.min(rows.length, start + arguments[2]) : rows.length;
+var result = [];
+for (var i = start; i < end; i++) {
+    result.push(Array.from(rows[i].querySelectorAll('td')).map(function (cell) {
+        return (cell.innerText || '').trim();
+    }));
+}
+return result;
+"""
+
+# 課程列表的總列數
+LIST_ROW_COUNT_SCRIPT = """
+var table = document.querySelector(arguments[0]);
+return table ? table.querySelectorAll('tbody tr').length : 0;
+"""
+
+# 課程列表各列的課程名稱與開始時間（欄位不足的列為 null），用於將列表資料對應到頁面上的列
+# arguments[1]、arguments[2]、arguments[3] 為課程名稱欄、開始時間欄與最少欄位數
+LIST_ROW_KEYS_SCRIPT = """
+var table = document.querySelector(arguments[0]);
+if (!table) { return []; }
+var nameColumn = arguments[1], startColumn = arguments[2], minColumns = arguments[3];
+return Array.from(table.querySelectorAll('tbody tr')).map(function (row) {
+    var cells = row.querySelectorAll('td');
+    if (cells.length < minColumns) { return null; }
+    return [(cells[nameColumn].innerText || '').trim(), (cells[startColumn].innerText || '').trim()];
+});
+"""
+
+# 每次讀取的課程列表列數
+LIST_CHUNK_SIZE = 200
+
+LIST_TABLE_SELECTOR = ".table-responsive table"
+
+# 課程列表欄位位置
+STATUS_COLUMN = 0
+NAME_COLUMN = 2
+START_COLUMN = 4
+END_COLUMN = 5
+MIN_COLUMNS = 8
+
+# 多個搜尋關鍵字的分隔符號
+_KEYWORD_SEPARATORS = re.compile(r'[,，;；\n]')
+
+# ewant日期格式通常為 "2024-03-01" 或 "2024/03/01"
+_DATE_PATTERN = re.compile(r'(\d{4})[-/](\d{2})[-/](\d{2})')
+
+
+def course_key(course: Dict) -> str:
+    """
+    課程的識別鍵
+    列表中沒有課程編號，以課程名稱加開始時間區分同名的不同梯次
+    """
+    return f"{course['name']}|{course['start_time']}"
+
+
+def split_keywords(text: Optional[str]) -> List[str]:
+    """將以逗號、分號或換行分隔的搜尋文字拆成關鍵字（去除空白與重複）"""
+    keywords = []
+    for keyword in _KEYWORD_SEPARATORS.split(text or ''):
+        keyword = keyword.strip()
+        if keyword and keyword not in keywords:
+            keywords.append(keyword)
+    return keywords
+
+
+def parse_date(date_str: str) -> Optional[datetime]:
+    """解析日期字串，無法解析時返回 None"""
+    match = _DATE_PATTERN.match(date_str.strip())
+    if not match:
+        return None
+    year, month, day = map(int, match.groups())
+    return datetime(year, month, day)
+
+
+def parse_course_rows(rows: Sequence[Sequence[str]], offset: int = 0) -> List[Dict]:
+    """
+    將課程列表的儲存格文字轉為課程資料（不做任何篩選）
+    Args:
+        rows: [列][儲存格文字]，列的順序即頁面上的順序
+        offset: rows 第一列在列表中的位置（只讀取列表其中一段時）
+    Returns:
+        List[Dict]: 課程資料，row_idx 為該列在列表中的位置
+    """
+    courses = []
+    for idx, cells in enumerate(rows, offset):
+        if len(cells) < MIN_COLUMNS:
+            continue
+        course = {
+            'name': cells[NAME_COLUMN].strip(),
+            'status': cells[STATUS_COLUMN].strip(),
+            'start_time': cells[START_COLUMN].strip(),
+            'end_time': cells[END_COLUMN].strip(),
+            'row_idx': idx,
+            'enrolled_count': 0
+        }
+        course['key'] = course_key(course)
+        courses.append(course)
+    return courses
+
+
+def row_index_by_key(row_keys: Sequence[Optional[Sequence[str]]]) -> Dict[str, int]:
+    """
+    LIST_ROW_KEYS_SCRIPT 的結果轉為 {課程識別鍵: 頁面上的列位置}（同名同梯次時取第一列）
+    """
+    index = {}
+    for idx, cells in enumerate(row_keys):
+        if cells:
+            index.setdefault(course_key({'name': cells[0], 'start_time': cells[1]}), idx)
+    return index
+
+
+def filter_courses(courses: Sequence[Dict], status_filters: Sequence[str], start_date: datetime = None,
+                   end_date: datetime = None, on_undated: Callable[[str], None] = None) -> Tuple[List[Dict], int]:
+    """
+    依課程狀態與開課日期範圍篩選課程列表
+    Args:
+        courses: parse_course_rows 產生的課程資料
+        status_filters: 要保留的課程狀態
+        start_date / end_date: 開課日期範圍（需同時提供），無法解析日期的課程一律保留
+        on_undated: 遇到無法解析的開課日期時呼叫，參數為日期文字
+    Returns:
+        Tuple[List[Dict], int]: (符合的課程, 狀態符合但不在日期範圍內的數量)
+    """
+    matched = []
+    date_filtered_count = 0
+    check_date = bool(start_date and end_date)
+
+    for course in courses:
+        if check_date:
+            course_date = parse_date(course['start_time'])
+            if course_date is None:
+                if on_undated:
+                    on_undated(course['start_time'])
+            elif not start_date <= course_date <= end_date:
+                if course['status'] in status_filters:
+                    date_filtered_count += 1
+                continue
+
+        if course['status'] in status_filters:
+            matched.append(course)
+
+    return matched, date_filtered_count
+
+
+def find_list_rows(tables: Sequence[Sequence[Sequence[str]]]) -> List[Sequence[str]]:
+    """從整頁的表格資料中找出課程列表的資料列（略過只有表頭的列）"""
+    for rows in tables:
+        if any(len(cells) >= MIN_COLUMNS for cells in rows):
+            return [cells for cells in rows if cells]
+    return []
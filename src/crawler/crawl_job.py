@@ -0,0 +1,241 @@
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from src.crawler.archive import CrawlArchive
+from src.crawler.cancellation import CancellationToken, CrawlCancelled
+from src.crawler.course_list import split_keywords
+from src.crawler.events import EventBus, Finished, Results
+from src.crawler.history import CourseHistory, default_history_path
+from src.crawler.metrics import CrawlMetrics
+from src.crawler.page_cache import PageCache
+from src.utils.resource_utils import ResourceUtils
+
+
+class CrawlJob:
+    """
+    介面發起的一次完整爬取：登入、爬取、寫入歷史資料庫、輸出計時統計
+    不依賴 Qt，進度與結果都以事件發布，可在子行程中執行
+    """
+
+    def __init__(self, options: Dict, events: EventBus):
+        """
+        Args:
+            options: username、password、search_text、status_filters、start_date、end_date、
+                     use_cache、use_archive、skip_keys、tabs、capture_network、stat_keys
+            events: 事件分派器
+        """
+        self.username = options['username']
+        self.password = options['password']
+        self.search_text = options.get('search_text')
+        self.status_filters = options.get('status_filters') or ["開課中"]
+        self.start_date = options.get('start_date')
+        self.end_date = options.get('end_date')
+        self.use_cache = options.get('use_cache', True)
+        self.use_archive = options.get('use_archive', False)
+        self.skip_keys = set(options.get('skip_keys') or ())    # 已擷取過、不需重新擷取的課程
+        self.tabs = options.get('tabs', 1)
+        self.capture_network = options.get('capture_network', False)
+        self.stat_keys = options.get('stat_keys')     # 要擷取的統計，None 表示全部
+        self.events = events
+        self.archive = None
+        self.login_manager = None
+        self.parser = None
+        self.monitor = None
+        self.metrics = CrawlMetrics()
+        # 登入與爬取共用的取消旗標，停止時所有等待立即結束
+        self.cancel_token = CancellationToken()
+        self.finished = threading.Event()
+
+    @property
+    def stop_flag(self) -> bool:
+        return self.cancel_token.cancelled
+
+    def run(self) -> Tuple[bool, str]:
+        """
+        執行爬取
+        Returns:
+            Tuple[bool, str]: (是否成功, 訊息)
+        """
+        try:
+            return self._run()
+        except CrawlCancelled:
+            # 登入期間被取消時瀏覽器尚未交給爬取流程關閉
+            if self.login_manager:
+                self.login_manager.close()
+            return False, "爬蟲已停止"
+        finally:
+            self.stop_monitor()
+            self.finished.set()
+
+    def _run(self) -> Tuple[bool, str]:
+        try:
+            from src.crawler.login import EwantLogin
+            from src.crawler.parser import CourseParser
+            from src.crawler.resource_monitor import ResourceMonitor
+
+            # 執行登入
+            self.events.log("初始化登入...")
+            self.login_manager = EwantLogin(headless=True, metrics=self.metrics,
+                                            capture_network=self.capture_network,
+                                            cancel_token=self.cancel_token)
+            # 定期取樣瀏覽器的 CPU 與記憶體，顯示於介面並記錄到計時統計
+            self.monitor = ResourceMonitor(self.login_manager.get_driver, self.events, self.metrics)
+            self.monitor.start()
+
+            # 檢查是否提前收到停止信號
+            if self.stop_flag:
+                return False, "爬蟲已停止"
+
+            self.events.log("開始登入...")
+            success, message = self.login_manager.login(self.username, self.password)
+            if not success:
+                return False, f"登入失敗：{message}"
+
+            # 再次檢查停止信號
+            if self.stop_flag:
+                return False, "爬蟲已停止"
+
+            # 開始爬取資料
+            self.events.log("開始爬取課程資料...")
+            self.parser = CourseParser(
+                self.login_manager.get_driver(),
+                events=self.events,
+                search_text=(split_keywords(self.search_text) or [None])[0],
+                status_filters=self.status_filters,
+                start_date=self.start_date,
+                end_date=self.end_date,
+                metrics=self.metrics,
+                login_manager=self.login_manager,
+                page_cache=self.create_page_cache(),
+                archive=self.create_archive(),
+                course_filter=self.is_not_fetched if self.skip_keys else None,
+                tabs=self.tabs,
+                stat_keys=self.stat_keys,
+                cancel_token=self.cancel_token
+            )
+
+            try:
+                if self.stop_flag:
+                    return False, "爬蟲已停止"
+
+                # 執行爬蟲並獲取結果
+                keywords = split_keywords(self.search_text)
+                if len(keywords) > 1:
+                    courses = self.parser.process_keywords(keywords)
+                else:
+                    courses = self.parser.process_all_courses()
+                self.record_history(self.parser.list_snapshot, courses)
+
+                if courses:
+                    # 發送完整的課程資料（停止時為已擷取的部分）
+                    self.events.publish(Results(courses))
+                if self.stop_flag:
+                    return False, "爬蟲已停止"
+                if courses:
+                    return True, "爬取完成"
+                return False, "未取得任何課程資料"
+
+            except Exception as e:
+                return False, f"爬取過程發生錯誤：{str(e)}"
+
+            finally:
+                # 確保總是清理資源
+                self.stop_monitor()
+                if self.login_manager:
+                    self.login_manager.close()
+                if self.archive:
+                    self.archive.close()
+                    self.events.log(f"頁面封存已輸出：{self.archive.file_path}")
+                self.export_metrics()
+
+        except Exception as e:
+            return False, f"執行過程發生錯誤：{str(e)}"
+
+    def record_history(self, list_snapshot: List[Dict], courses: List[Dict]) -> None:
+        """將本次的課程列表與擷取結果寫入歷史資料庫，供之後搜尋"""
+        try:
+            history = CourseHistory(default_history_path())
+            try:
+                history.record_courses(list_snapshot, self.search_text)
+                history.record_courses(courses or [], self.search_text)
+            finally:
+                history.close()
+        except Exception as e:
+            self.events.log(f"寫入歷史資料庫時發生錯誤：{str(e)}", 'warning')
+
+    def is_not_fetched(self, course: Dict) -> bool:
+        return course['key'] not in self.skip_keys
+
+    def create_page_cache(self):
+        """建立課程摘要快取，未啟用或無法建立時返回 None"""
+        if not self.use_cache:
+            return None
+        try:
+            return PageCache(ResourceUtils.get_output_dir('page_cache'), account=self.username)
+        except Exception as e:
+            self.events.log(f"無法使用頁面快取：{str(e)}", 'warning')
+            return None
+
+    def create_archive(self):
+        """建立頁面封存檔，未啟用或無法建立時返回 None"""
+        if not self.use_archive:
+            return None
+        try:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            file_path = os.path.join(ResourceUtils.get_output_dir('archives'), f"crawl_{timestamp}.jsonl.gz")
+            self.archive = CrawlArchive(file_path)
+            return self.archive
+        except Exception as e:
+            self.events.log(f"無法建立頁面封存：{str(e)}", 'warning')
+            return None
+
+    def export_metrics(self) -> None:
+        """輸出本次執行的計時統計與時間軸檔案"""
+        try:
+            paths = self.metrics.export(ResourceUtils.get_output_dir('metrics'))
+            self.events.log(f"計時統計已輸出：{paths['json']}\n時間軸檔案：{paths['trace']}")
+        except Exception as e:
+            print(f"輸出計時統計時發生錯誤: {str(e)}")
+
+    def stop_monitor(self) -> None:
+        if self.monitor:
+            self.monitor.stop()
+            self.monitor = None
+
+    def stop(self, grace: float = 1.0) -> None:
+        """
+        要求停止：等待與休眠立即結束，已擷取的資料照常輸出
+        進行中的頁面載入無法取消，超過 grace 秒仍未結束時關閉瀏覽器使其失敗
+        """
+        self.cancel_token.cancel()
+        if self.finished.wait(grace) or not self.login_manager:
+            return
+        try:
+            self.login_manager.close()
+        except Exception as e:
+            print(f"關閉WebDriver時出錯: {str(e)}")
+
+
+def run_crawl_process(options: Dict, queue, stop_event) -> None:
+    """
+    子行程的進入點：執行 CrawlJob，將所有事件放入 queue，最後放入 Finished
+    Args:
+        options: CrawlJob 的參數
+        queue: multiprocessing.Queue
+        stop_event: multiprocessing.Event，設定後停止爬取
+    """
+    events = EventBus()
+    events.subscribe_all(queue.put)
+    job = CrawlJob(options, events)
+
+    def watch_stop():
+        stop_event.wait()
+        job.stop()
+
+    threading.Thread(target=watch_stop, daemon=True).start()
+    success, message = job.run()
+    if stop_event.is_set() and not success:
+        message = "爬蟲已停止"
+    queue.put(Finished(success, message))
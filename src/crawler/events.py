@@ -0,0 +1,165 @@
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# 爬蟲事件：CourseParser 只發布事件，由訂閱者（介面、主控台、其他行程）決定如何呈現
+
+
+class Log(NamedTuple):
+    """一般訊息"""
+    message: str
+    level: str = 'info'         # 'info'、'warning' 或 'error'
+
+
+class CourseListed(NamedTuple):
+    """搜尋後取得完整的課程列表（未經篩選）"""
+    courses: List[Dict]
+
+
+class CourseStarted(NamedTuple):
+    """開始擷取一門課程"""
+    course: Dict
+    index: int
+    total: int
+
+
+class CourseFinished(NamedTuple):
+    """一門課程擷取結束"""
+    course: Dict
+    index: int
+    total: int
+    ok: bool
+    stats: Optional[Dict] = None
+
+
+class Progress(NamedTuple):
+    """整體進度百分比"""
+    percent: int
+
+
+class Eta(NamedTuple):
+    """預估剩餘秒數，None 表示已完成"""
+    seconds: Optional[float]
+
+
+class Results(NamedTuple):
+    """目前已擷取的課程資料"""
+    courses: List[Dict]
+
+
+class RateChanged(NamedTuple):
+    """AIMD 控制器調整了同時擷取數或速率"""
+    concurrency: int
+    rate: float
+    description: str
+
+
+class ResourceSample(NamedTuple):
+    """瀏覽器行程樹（chromedriver 與 Chrome）的資源使用量"""
+    cpu_percent: float          # 各行程加總，可超過 100
+    rss_mb: float
+    processes: int
+
+
+class MetricsReport(NamedTuple):
+    """爬取結束時的各階段耗時統計"""
+    summary: Dict
+    text: str
+
+
+class Finished(NamedTuple):
+    """整個爬取工作結束"""
+    success: bool
+    message: str
+
+
+class EventBus:
+    """
+    同步的事件分派器
+    訂閱者依事件類型註冊；沒有訂閱者的事件可用 wants() 事先略過，避免建立事件與格式化文字的成本
+    """
+
+    def __init__(self):
+        self._handlers: Dict[type, List[Callable]] = {}
+        self._catch_all: List[Callable] = []
+
+    def subscribe(self, event_type: type, handler: Callable) -> None:
+        """訂閱特定類型的事件"""
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def subscribe_all(self, handler: Callable) -> None:
+        """訂閱所有事件"""
+        self._catch_all.append(handler)
+
+    def wants(self, event_type: type) -> bool:
+        """是否有訂閱者會收到此類型的事件"""
+        return bool(self._catch_all or self._handlers.get(event_type))
+
+    def publish(self, event) -> None:
+        for handler in self._handlers.get(type(event), ()):
+            handler(event)
+        for handler in self._catch_all:
+            handler(event)
+
+    def log(self, message: str, level: str = 'info') -> None:
+        if self.wants(Log):
+            self.publish(Log(message, level))
+
+
+def format_duration(seconds: float) -> str:
+    """將秒數格式化為「X小時Y分鐘Z秒」"""
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    text = ""
+    if hours > 0:
+        text += f"{int(hours)}小時"
+    if minutes > 0:
+        text += f"{int(minutes)}分鐘"
+    return text + f"{int(seconds)}秒"
+
+
+def format_resource(event: ResourceSample) -> str:
+    """資源使用量的顯示文字"""
+    return f"瀏覽器 CPU {event.cpu_percent:.0f}%，記憶體 {event.rss_mb:.0f} MB（{event.processes} 個行程）"
+
+
+def format_event(event) -> Optional[str]:
+    """事件轉為日誌文字，不需要顯示於日誌的事件返回 None"""
+    if isinstance(event, Log):
+        return event.message
+    if isinstance(event, CourseStarted):
+        course = event.course
+        return (f"正在處理：{course['name']}\n"
+                f"課程狀態：{course['status']}\n"
+                f"開課時間：{course['start_time']}")
+    if isinstance(event, CourseFinished):
+        if not event.ok:
+            return f"無法擷取課程資料：{event.course['name']}"
+        if event.stats and '選修人數' in event.stats:
+            return f"選修總人數：{sum(event.stats['選修人數'].values())} 人\n------------------------"
+        return "------------------------"
+    if isinstance(event, MetricsReport):
+        return event.text
+    return None
+
+
+class TextSink:
+    """將事件轉為文字輸出，例如主控台或日誌視窗"""
+
+    def __init__(self, write: Callable[[str], None]):
+        self.write = write
+
+    def __call__(self, event) -> None:
+        text = format_event(event)
+        if text is not None:
+            self.write(text)
+
+    def attach(self, bus: EventBus) -> None:
+        """只訂閱會產生文字的事件，其他事件不會觸發此輸出"""
+        for event_type in (Log, CourseStarted, CourseFinished, MetricsReport):
+            bus.subscribe(event_type, self)
+
+
+def console_bus() -> EventBus:
+    """輸出到主控台的事件分派器，供無介面執行使用"""
+    bus = EventBus()
+    TextSink(lambda text: print(text, flush=True)).attach(bus)
+    return bus
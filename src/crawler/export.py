@@ -1,15 +1,256 @@
+import csv
 import os
+from datetime import datetime
+from typing import List
+
 import openpyxl
 from openpyxl.styles import Font, Alignment, PatternFill
 from PyQt6.QtWidgets import QTableWidget, QFileDialog, QMessageBox
 
+# 匯出模式
+MODE_NEW = 'new'          # 每次輸出新的活頁簿
+MODE_SHEET = 'sheet'      # 在既有活頁簿加入以擷取時間命名的工作表
+MODE_ROWS = 'rows'        # 在既有活頁簿的「歷史資料」工作表附加資料列
+MODE_CSV = 'csv'          # 附加到 CSV 累積檔
+
+CRAWL_TIME_HEADER = "擷取時間"
+HISTORY_SHEET = "歷史資料"
+# CSV 累積檔超過此大小時改名保存，另起新檔
+ROLLING_MAX_BYTES = 20 * 1024 * 1024
+
+STATUS_FILLS = {
+    "開課中": "C6EFCE",
+    "即將開課": "FFEB9C",
+    "已結束": "FFC7CE",
+}
+
+
+def _style_header(sheet, row: int = 1) -> None:
+    """設定標題列樣式與欄寬"""
+    header_font = Font(bold=True)
+    header_fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+    header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+
+    for cell in sheet[row]:
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        # 設定欄寬：課程名稱欄位較寬
+        width = 40 if cell.value == "課程名稱" else 15
+        sheet.column_dimensions[cell.column_letter].width = width
+
+
+def _style_rows(sheet, min_row: int, headers: List[str]) -> None:
+    """設定 min_row 之後資料列的對齊方式，並依課程狀態設定背景色"""
+    name_col = headers.index("課程名稱") if "課程名稱" in headers else None
+    status_col = headers.index("課程狀態") if "課程狀態" in headers else None
+    data_alignment_right = Alignment(horizontal='right', vertical='center')
+    data_alignment_left = Alignment(horizontal='left', vertical='center')
+
+    for row in sheet.iter_rows(min_row=min_row):
+        for idx, cell in enumerate(row):
+            # 課程名稱靠左，其他欄位靠右
+            cell.alignment = data_alignment_left if idx == name_col else data_alignment_right
+            if idx == status_col and cell.value in STATUS_FILLS:
+                color = STATUS_FILLS[cell.value]
+                cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+def _open_workbook(file_path: str):
+    """開啟既有活頁簿，檔案不存在時建立不含工作表的活頁簿"""
+    if os.path.exists(file_path):
+        return openpyxl.load_workbook(file_path)
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    return workbook
+
+
+def append_sheet(file_path: str, headers: List[str], rows: List[list], crawled_at: datetime) -> str:
+    """
+    在活頁簿加入一個以擷取時間命名的工作表，檔案不存在時建立
+    Returns:
+        str: 工作表名稱
+    """
+    workbook = _open_workbook(file_path)
+    title = f"課程資料_{crawled_at.strftime('%Y%m%d_%H%M')}"
+    # 同一分鐘內匯出多次時加上序號（工作表名稱最長 31 字元）
+    base, suffix = title, 2
+    while title in workbook.sheetnames:
+        title = f"{base}_{suffix}"
+        suffix += 1
+
+    sheet = workbook.create_sheet(title)
+    sheet.append(headers)
+    _style_header(sheet)
+    for values in rows:
+        sheet.append(values)
+    _style_rows(sheet, 2, headers)
+    workbook.save(file_path)
+    return title
+
+
+def append_rows(file_path: str, headers: List[str], rows: List[list], crawled_at: datetime) -> int:
+    """
+    將資料列附加到活頁簿的「歷史資料」工作表，每列第一欄為擷取時間
+    欄位依標題對應；本次有、既有工作表沒有的欄位加在最後（先前的列留空）
+    Returns:
+        int: 附加的列數
+    """
+    workbook = _open_workbook(file_path)
+    if HISTORY_SHEET in workbook.sheetnames:
+        sheet = workbook[HISTORY_SHEET]
+        existing = [cell.value for cell in sheet[1]]
+    else:
+        sheet = workbook.create_sheet(HISTORY_SHEET)
+        existing = []
+
+    all_headers = list(existing or [CRAWL_TIME_HEADER])
+    all_headers += [header for header in headers if header not in all_headers]
+    if all_headers != existing:
+        for col, header in enumerate(all_headers, start=1):
+            sheet.cell(row=1, column=col, value=header)
+        _style_header(sheet)
+
+    positions = [all_headers.index(header) for header in headers]
+    crawl_time_col = all_headers.index(CRAWL_TIME_HEADER)
+    first_new_row = sheet.max_row + 1
+    stamp = crawled_at.strftime('%Y-%m-%d %H:%M')
+    for values in rows:
+        line = [None] * len(all_headers)
+        line[crawl_time_col] = stamp
+        for position, value in zip(positions, values):
+            line[position] = value
+        sheet.append(line)
+    _style_rows(sheet, first_new_row, all_headers)
+    workbook.save(file_path)
+    return len(rows)
+
+
+def _csv_header(file_path: str) -> List[str]:
+    """只讀取 CSV 的第一列"""
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+
+def append_csv(file_path: str, headers: List[str], rows: List[list], crawled_at: datetime,
+               max_bytes: int = ROLLING_MAX_BYTES) -> str:
+    """
+    將資料列附加到 CSV 累積檔，每列第一欄為擷取時間；只寫入新的資料，不讀取既有內容
+    既有檔案超過 max_bytes 或欄位與本次不同時，將它改名保存（加上時間）後另起新檔
+    Returns:
+        str: 舊檔改名後的路徑，未改名時返回空字串
+    """
+    full_headers = [CRAWL_TIME_HEADER] + headers
+    rolled = ""
+    if os.path.exists(file_path):
+        if os.path.getsize(file_path) >= max_bytes or _csv_header(file_path) != full_headers:
+            base, ext = os.path.splitext(file_path)
+            rolled = f"{base}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}"
+            os.replace(file_path, rolled)
+
+    is_new = not os.path.exists(file_path)
+    # 新檔加上 BOM，Excel 開啟時才能正確辨識 UTF-8
+    with open(file_path, 'a', newline='', encoding='utf-8-sig' if is_new else 'utf-8') as f:
+        writer = csv.writer(f)
+        if is_new:
+            writer.writerow(full_headers)
+        stamp = crawled_at.strftime('%Y-%m-%d %H:%M')
+        writer.writerows([stamp] + list(values) for values in rows)
+    return rolled
+
+
 class CourseExporter:
     def __init__(self, table_widget: QTableWidget):
         self.table_widget = table_widget
-    
-    def export_to_excel(self, filter_info=None) -> bool:
+
+    def table_data(self):
+        """
+        取得表格目前的內容
+        Returns:
+            Tuple[List[str], List[list]]: (欄位標題, 各列的值)，統計欄位轉為數字
+        """
+        # 標題列與表格目前的欄位相同（只包含勾選的統計）
+        headers = [self.table_widget.horizontalHeaderItem(col).text()
+                   for col in range(self.table_widget.columnCount())]
+        rows = []
+        for row in range(self.table_widget.rowCount()):
+            course_data = []
+            for col in range(self.table_widget.columnCount()):
+                item = self.table_widget.item(row, col)
+                text = item.text() if item else ""
+                if col >= 4:  # 數字欄位
+                    # 嘗試轉換為數字，如果失敗就保留原始值
+                    try:
+                        course_data.append(int(text))
+                    except ValueError:
+                        course_data.append(text)
+                else:  # 文字欄位
+                    course_data.append(text)
+            rows.append(course_data)
+        return headers, rows
+
+    def export(self, mode: str = MODE_NEW, filter_info=None, summary_rows=None, crawled_at: datetime = None) -> bool:
+        """
+        依匯出模式匯出課程資料
+        Args:
+            mode: MODE_NEW、MODE_SHEET、MODE_ROWS 或 MODE_CSV
+            filter_info: 加入檔名的過濾資訊（僅 MODE_NEW）
+            summary_rows: summarize_courses() 的結果（僅 MODE_NEW）
+            crawled_at: 擷取時間，用於工作表名稱與擷取時間欄位，預設為現在
+        Returns:
+            bool: 是否匯出成功
+        """
+        if mode == MODE_NEW:
+            return self.export_to_excel(filter_info, summary_rows)
+
+        if self.table_widget.rowCount() == 0:
+            QMessageBox.warning(None, "警告", "沒有資料可供匯出！")
+            return False
+
+        if mode == MODE_CSV:
+            caption, default_filename, file_filter, ext = "附加到 CSV 累積檔", "課程報表_累積.csv", "CSV 檔案 (*.csv)", '.csv'
+        else:
+            caption, default_filename, file_filter, ext = "附加到 Excel 檔案", "課程報表_歷史.xlsx", "Excel 檔案 (*.xlsx)", '.xlsx'
+        # 附加到既有檔案，不需確認覆寫
+        file_path, _ = QFileDialog.getSaveFileName(
+            None, caption, default_filename, file_filter,
+            options=QFileDialog.Option.DontConfirmOverwrite
+        )
+        if not file_path:
+            return False
+        if not file_path.endswith(ext):
+            file_path += ext
+
+        headers, rows = self.table_data()
+        crawled_at = crawled_at or datetime.now()
+        try:
+            if mode == MODE_SHEET:
+                title = append_sheet(file_path, headers, rows, crawled_at)
+                message = f"已新增工作表「{title}」到：\n{file_path}"
+            elif mode == MODE_ROWS:
+                count = append_rows(file_path, headers, rows, crawled_at)
+                message = f"已附加 {count} 筆資料到：\n{file_path}"
+            else:
+                rolled = append_csv(file_path, headers, rows, crawled_at)
+                message = f"已附加 {len(rows)} 筆資料到：\n{file_path}"
+                if rolled:
+                    message += f"\n原檔案已改名為：\n{rolled}"
+        except PermissionError:
+            QMessageBox.critical(None, "錯誤", "無法存取檔案，可能是檔案已開啟或沒有寫入權限")
+            return False
+        except Exception as e:
+            QMessageBox.critical(None, "錯誤", f"匯出過程發生錯誤：\n{str(e)}")
+            return False
+
+        QMessageBox.information(None, "成功", message)
+        return True
+
+    def export_to_excel(self, filter_info=None, summary_rows=None) -> bool:
         """
         將課程資料匯出到 Excel
+        Args:
+            filter_info: 加入檔名的過濾資訊
+            summary_rows: summarize_courses() 的結果，提供時另外輸出「統計摘要」工作表
         Returns:
             bool: 是否匯出成功
         """
@@ -18,135 +259,78 @@ class CourseExporter:
             if self.table_widget.rowCount() == 0:
                 QMessageBox.warning(None, "警告", "沒有資料可供匯出！")
                 return False
-            
+
             # 生成預設檔案名稱
-            from datetime import datetime
             current_datetime = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
+
             # 基本檔案名稱
             file_name_base = "課程報表"
-            
+
             # 如果有提供過濾資訊，加入檔案名稱
             if filter_info:
                 file_name_base += f"_{filter_info}"
-            
+
             # 完整的預設檔案名稱
             default_filename = f"{file_name_base}_{current_datetime}.xlsx"
-            
+
             # 選擇儲存路徑
             file_path, _ = QFileDialog.getSaveFileName(
-                None, 
-                "匯出 Excel 檔案", 
-                default_filename, 
+                None,
+                "匯出 Excel 檔案",
+                default_filename,
                 "Excel 檔案 (*.xlsx)"
             )
 
             if not file_path:
                 return False
-                
+
             # 確保檔案副檔名為 .xlsx
             if not file_path.endswith('.xlsx'):
                 file_path += '.xlsx'
-            
+
             # 建立新的 Excel 活頁簿和工作表
             workbook = openpyxl.Workbook()
             sheet = workbook.active
             sheet.title = "課程資料"
-            
-            # 設定標題列
-            headers = [
-                "課程狀態",
-                "課程名稱",
-                "開始時間",
-                "結束時間",
-                "選修人數(台灣)",
-                "選修人數(中國大陸)",
-                "選修人數(其他)",
-                "通過人數(台灣)",
-                "通過人數(中國大陸)",
-                "通過人數(其他)",
-                "影片瀏覽次數(台灣)",
-                "影片瀏覽次數(中國大陸)",
-                "影片瀏覽次數(其他)",
-                "作業測驗作答次數(台灣)",
-                "作業測驗作答次數(中國大陸)",
-                "作業測驗作答次數(其他)",
-                "講義參考資料瀏覽人數(台灣)",
-                "講義參考資料瀏覽人數(中國大陸)",
-                "講義參考資料瀏覽人數(其他)",
-                "講義參考資料瀏覽次數(台灣)",
-                "講義參考資料瀏覽次數(中國大陸)",
-                "講義參考資料瀏覽次數(其他)",
-                "討論次數",
-                "使用行動載具瀏覽影片次數"
-            ]
+
+            headers, rows = self.table_data()
             sheet.append(headers)
-            
-            # 設定標題列樣式
-            header_font = Font(bold=True)
-            header_fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-            header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            
-            for idx, cell in enumerate(sheet[1]):
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                # 設定欄寬
-                if idx == 1:  # 課程名稱欄位
-                    sheet.column_dimensions[cell.column_letter].width = 40
-                else:  # 其他欄位
-                    sheet.column_dimensions[cell.column_letter].width = 15
-            
+            _style_header(sheet)
+
             # 寫入課程資料
-            row_count = self.table_widget.rowCount()
-            for row in range(row_count):
-                course_data = []
-                for col in range(self.table_widget.columnCount()):
-                    item = self.table_widget.item(row, col)
-                    if col >= 4:  # 數字欄位
-                        try:
-                            original_value = item.text() if item else ""
-                            # 嘗試轉換為數字，如果失敗就保留原始值
-                            try:
-                                value = int(original_value)
-                                course_data.append(value)
-                            except ValueError:
-                                course_data.append(original_value)
-                        except:
-                            course_data.append("")
-                    else:  # 文字欄位
-                        course_data.append(item.text() if item else "")
+            for course_data in rows:
                 sheet.append(course_data)
-            
-            # 設定資料列樣式
-            data_alignment_right = Alignment(horizontal='right', vertical='center')
-            data_alignment_left = Alignment(horizontal='left', vertical='center')
-            
-            for row in sheet.iter_rows(min_row=2):
-                for idx, cell in enumerate(row):
-                    if idx == 1:  # 課程名稱靠左
-                        cell.alignment = data_alignment_left
-                    else:  # 其他欄位靠右
-                        cell.alignment = data_alignment_right
-                    
-                    # 根據課程狀態設定背景色
-                    if idx == 0:  # 課程狀態欄位
-                        if cell.value == "開課中":
-                            cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                        elif cell.value == "即將開課":
-                            cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-                        elif cell.value == "已結束":
-                            cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-            
+            _style_rows(sheet, 2, headers)
+
+            if summary_rows:
+                self._write_summary_sheet(workbook, summary_rows)
+
             # 儲存 Excel 檔案
             workbook.save(file_path)
-            
+
             QMessageBox.information(None, "成功", f"課程資料已成功匯出到：\n{file_path}")
             return True
-            
+
         except PermissionError:
             QMessageBox.critical(None, "錯誤", "無法存取檔案，可能是檔案已開啟或沒有寫入權限")
             return False
         except Exception as e:
             QMessageBox.critical(None, "錯誤", f"匯出過程發生錯誤：\n{str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+    def _write_summary_sheet(self, workbook, summary_rows):
+        """輸出統計摘要工作表"""
+        from src.crawler.aggregate import SUMMARY_HEADERS
+
+        sheet = workbook.create_sheet("統計摘要")
+        sheet.append(SUMMARY_HEADERS)
+        for idx, cell in enumerate(sheet[1]):
+            cell.font = Font(bold=True)
+            cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+            cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+            sheet.column_dimensions[cell.column_letter].width = 15
+
+        pass_rate_col = SUMMARY_HEADERS.index("通過率")
+        for values in summary_rows:
+            sheet.append(values)
+            sheet.cell(row=sheet.max_row, column=pass_rate_col + 1).number_format = '0.00%'
@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Sequence
+
+from src.crawler.course_list import course_key, parse_date
+from src.utils.resource_utils import ResourceUtils
+
+# trigram 斷詞以三個字元為單位，較短的查詢改用 LIKE
+TRIGRAM_MIN_LENGTH = 3
+
+
+def default_history_path() -> str:
+    """介面與命令列共用的歷史資料庫位置"""
+    return os.path.join(ResourceUtils.get_output_dir('history'), 'courses.db')
+
+
+class CourseHistory:
+    """
+    歷次爬取的課程資料庫，以 SQLite FTS5 trigram 索引課程名稱
+    trigram 不需斷詞即可比對中文名稱中的任意子字串
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite 資料庫檔案路徑
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS courses (
+                key TEXT PRIMARY KEY,
+                name TEXT,
+                status TEXT,
+                start_time TEXT,
+                end_time TEXT,
+                start_date TEXT,
+                search_text TEXT,
+                first_seen REAL,
+                last_seen REAL,
+                stats TEXT,
+                crawled_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_courses_start_date ON courses(start_date);
+        """)
+        self.has_fts = self._create_fts()
+        self.conn.commit()
+
+    def _create_fts(self) -> bool:
+        """建立全文索引，SQLite 版本過舊（3.34 以前）不支援 trigram 時改用 LIKE 查詢"""
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS course_fts USING fts5(key UNINDEXED, name, tokenize='trigram')"
+            )
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def record_courses(self, courses: Sequence[Dict], search_text: str = None) -> None:
+        """
+        寫入課程列表與擷取結果，已存在的課程更新狀態與最後出現時間
+        Args:
+            courses: 課程資料，含 stats 時一併保存
+            search_text: 取得這些課程時使用的搜尋關鍵字
+        """
+        now = time.time()
+        with self.conn:
+            for course in courses:
+                key = course.get('key') or course_key(course)
+                start = parse_date(course['start_time'])
+                stats = course.get('stats')
+                exists = self.conn.execute("SELECT 1 FROM courses WHERE key = ?", (key,)).fetchone()
+                if exists:
+                    self.conn.execute("""
+                        UPDATE courses SET status = ?, end_time = ?, last_seen = ?,
+                            search_text = COALESCE(?, search_text),
+                            stats = COALESCE(?, stats), crawled_at = COALESCE(?, crawled_at)
+                        WHERE key = ?
+                    """, (course['status'], course['end_time'], now, search_text,
+                          json.dumps(stats, ensure_ascii=False) if stats else None,
+                          now if stats else None, key))
+                    continue
+
+                self.conn.execute("""
+                    INSERT INTO courses(key, name, status, start_time, end_time, start_date, search_text,
+                                        first_seen, last_seen, stats, crawled_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (key, course['name'], course['status'], course['start_time'], course['end_time'],
+                      start.strftime('%Y-%m-%d') if start else None, search_text, now, now,
+                      json.dumps(stats, ensure_ascii=False) if stats else None, now if stats else None))
+                if self.has_fts:
+                    self.conn.execute("INSERT INTO course_fts(key, name) VALUES (?, ?)", (key, course['name']))
+
+    def search(self, query: str, since: str = None, statuses: Sequence[str] = None,
+               limit: int = None) -> List[Dict]:
+        """
+        搜尋課程名稱包含 query 的歷史課程
+        Args:
+            query: 課程名稱包含的文字
+            since: 只取開課日期在此之後的課程（YYYY-MM-DD）
+            statuses: 只取最後一次看到時為這些狀態的課程
+            limit: 最多筆數
+        Returns:
+            List[Dict]: 課程資料（依開課日期新到舊），曾擷取過的附帶 stats
+        """
+        query = query.strip()
+        conditions = []
+        params: List = []
+
+        if self.has_fts and len(query) >= TRIGRAM_MIN_LENGTH:
+            sql = "SELECT c.* FROM course_fts f JOIN courses c ON c.key = f.key"
+            conditions.append("course_fts MATCH ?")
+            params.append('"' + query.replace('"', '""') + '"')
+        else:
+            sql = "SELECT c.* FROM courses c"
+            if query:
+                escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                conditions.append("c.name LIKE ? ESCAPE '\\'")
+                params.append(f"%{escaped}%")
+
+        if since:
+            conditions.append("c.start_date >= ?")
+            params.append(since)
+        if statuses:
+            conditions.append(f"c.status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY c.start_date DESC, c.name"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        return [self._row_to_course(row) for row in self.conn.execute(sql, params)]
+
+    @staticmethod
+    def _row_to_course(row: sqlite3.Row) -> Dict:
+        course = {
+            'key': row['key'],
+            'name': row['name'],
+            'status': row['status'],
+            'start_time': row['start_time'],
+            'end_time': row['end_time'],
+            'last_seen': row['last_seen'],
+        }
+        if row['stats']:
+            course['stats'] = json.loads(row['stats'])
+            course['crawled_at'] = row['crawled_at']
+        return course
+
+    def close(self) -> None:
+        self.conn.close()
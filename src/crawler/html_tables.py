@@ -0,0 +1,87 @@
+import re
+from html.parser import HTMLParser
+from typing import List
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class _TableCollector(HTMLParser):
+    """收集 HTML 中所有表格的儲存格文字（巢狀表格各自獨立）"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables: List[List[List[str]]] = []
+        self.summary_flags: List[bool] = []   # 各表格是否符合 SUMMARY_TABLE_SELECTOR
+        self._stack = []      # 尚未結束的表格：每個元素為 [rows, current_row, current_cell]
+        # 尚未結束的 section.panel 與其中的 .table-responsive：(標籤, 種類)
+        self._containers = []
+
+    def _in_panel_responsive(self) -> bool:
+        return any(kind == 'responsive' for _, kind in self._containers)
+
+    def handle_starttag(self, tag, attrs):
+        classes = (dict(attrs).get('class') or '').split()
+        if tag == 'section' and 'panel' in classes:
+            self._containers.append((tag, 'panel'))
+        elif 'table-responsive' in classes and any(kind == 'panel' for _, kind in self._containers):
+            self._containers.append((tag, 'responsive'))
+
+        if tag == 'table':
+            rows = []
+            self.tables.append(rows)
+            self.summary_flags.append('table' in classes or self._in_panel_responsive())
+            self._stack.append([rows, None, None])
+        elif not self._stack:
+            return
+        elif tag == 'tr':
+            table = self._stack[-1]
+            table[1] = []
+            table[0].append(table[1])
+        elif tag == 'td':
+            table = self._stack[-1]
+            if table[1] is None:
+                table[1] = []
+                table[0].append(table[1])
+            table[2] = []
+        elif tag == 'br':
+            self.handle_data(' ')
+
+    def handle_endtag(self, tag):
+        if self._containers and self._containers[-1][0] == tag:
+            self._containers.pop()
+        if not self._stack:
+            return
+        table = self._stack[-1]
+        if tag == 'table':
+            self._stack.pop()
+        elif tag == 'td' and table[2] is not None:
+            table[1].append(_WHITESPACE.sub(' ', ''.join(table[2])).strip())
+            table[2] = None
+        elif tag == 'tr':
+            table[1] = None
+
+    def handle_data(self, data):
+        if self._stack and self._stack[-1][2] is not None:
+            self._stack[-1][2].append(data)
+
+
+def parse_html_tables(html: str) -> List[List[List[str]]]:
+    """
+    從 HTML 取出所有表格的文字，格式同瀏覽器端的 TABLES_SCRIPT：[表格][列][儲存格]
+    只收集 td，表頭 th 不列入
+    """
+    collector = _TableCollector()
+    collector.feed(html)
+    collector.close()
+    return collector.tables
+
+
+def parse_summary_tables(html: str) -> List[List[List[str]]]:
+    """
+    只取出課程摘要的表格，與瀏覽器端以 SUMMARY_TABLE_SELECTOR
+    （section.panel .table-responsive table, table.table）取回的表格相同
+    """
+    collector = _TableCollector()
+    collector.feed(html)
+    collector.close()
+    return [rows for rows, is_summary in zip(collector.tables, collector.summary_flags) if is_summary]
@@ -1,23 +1,44 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 from typing import Tuple
 
+from src.crawler.cancellation import CancellableWait, CancellationToken
+from src.crawler.metrics import CrawlMetrics
+from src.crawler.network_capture import NetworkCapture, enable_performance_log
+
 
 class EwantLogin:
-    def __init__(self, headless: bool = False):
+    # 元素查詢的隱含等待（秒）
+    # 隱含等待在瀏覽器端進行、無法中途取消，原本的 30 秒會讓停止最多延遲 30 秒；
+    # 需要等待頁面的元素一律使用 CancellableWait 明確等待（登入表單、課程列表、進入課程按鈕），
+    # 直接 find_element 只用於應已存在或不存在也無妨的元素
+    IMPLICIT_WAIT = 0.5
+
+    def __init__(self, headless: bool = False, metrics: CrawlMetrics = None, capture_network: bool = False,
+                 cancel_token: CancellationToken = None):
         """
         初始化登入類別
         Args:
             headless: 是否使用無頭模式（不顯示瀏覽器視窗）
+            metrics: 計時記錄器，未提供時自行建立
+            capture_network: 是否透過 DevTools 記錄網路回應，供直接從回應內容解析資料
+            cancel_token: 取消旗標，設定後進行中的等待立即結束
         """
         self.driver = None
         self.headless = headless
+        self.metrics = metrics or CrawlMetrics()
+        self.base_url = "https://report.ewant.org/"
         self.login_url = "https://report.ewant.org/Login"
+        self.home_url = None   # 登入後的課程列表頁
+        self.username = None
+        self.password = None
+        self.capture_network = capture_network
+        self.network_capture = None    # 目前瀏覽器的 NetworkCapture，未啟用或不支援時為 None
+        self.cancel_token = cancel_token or CancellationToken()
     
     def init_driver(self) -> None:
         """初始化瀏覽器驅動"""
@@ -42,14 +63,27 @@ class EwantLogin:
         options.add_argument("--disable-gpu") # 禁用GPU加速
         options.add_argument('--window-size=1920,1080')  # 設定視窗大小
         options.add_experimental_option('excludeSwitches', ['enable-logging', 'enable-automation'])  # 禁用自動控制提示
+        if self.capture_network:
+            enable_performance_log(options)
 
         # 设置user-agent
         options.add_argument(
             "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/95.0.4638.69 Safari/537.36")
 
         # 使用 WebDriver Manager 自動管理 ChromeDriver
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        self.driver.implicitly_wait(30)
+        with self.metrics.span('driver_startup'):
+            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        self.driver.implicitly_wait(self.IMPLICIT_WAIT)
+
+        if self.capture_network:
+            try:
+                self.network_capture = NetworkCapture(self.driver, self.base_url)
+            except WebDriverException as e:
+                print(f"無法啟用網路擷取，改用頁面擷取: {str(e)}")
+                self.network_capture = None
+
+    def _wait(self, timeout: float) -> CancellableWait:
+        return CancellableWait(self.driver, timeout, self.cancel_token)
 
     def login(self, username: str, password: str) -> Tuple[bool, str]:
         """
@@ -60,6 +94,13 @@ class EwantLogin:
         Returns:
             Tuple[bool, str]: (是否成功, 訊息)
         """
+        self.username = username
+        self.password = password
+        with self.metrics.span('login'):
+            return self._login(username, password)
+
+    def _login(self, username: str, password: str) -> Tuple[bool, str]:
+        """實際的登入步驟"""
         try:
             if not self.driver:
                 self.init_driver()
@@ -78,17 +119,17 @@ class EwantLogin:
                 pass  # 沒有警告視窗就繼續
                 
             # 等待並點選同意條款
-            agree_checkbox = WebDriverWait(self.driver, 10).until(
+            agree_checkbox = self._wait(10).until(
                 EC.presence_of_element_located((By.ID, "agree"))
             )
             if not agree_checkbox.is_selected():
                 agree_checkbox.click()
             
             # 填寫登入表單
-            username_input = WebDriverWait(self.driver, 10).until(
+            username_input = self._wait(10).until(
                 EC.presence_of_element_located((By.NAME, "user_email"))
             )
-            password_input = WebDriverWait(self.driver, 10).until(
+            password_input = self._wait(10).until(
                 EC.presence_of_element_located((By.NAME, "user_pw"))
             )
             
@@ -99,7 +140,7 @@ class EwantLogin:
             password_input.send_keys(password)
             
             # 提交表單
-            submit_button = WebDriverWait(self.driver, 10).until(
+            submit_button = self._wait(10).until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit'], input[type='submit'], .btn-primary"))
             )
             submit_button.click()
@@ -114,26 +155,32 @@ class EwantLogin:
                 except:
                     pass
                     
-                WebDriverWait(self.driver, 10).until(
+                self._wait(10).until(
                     lambda driver: driver.current_url != self.login_url
                 )
                 
                 # 等待搜尋按鈕出現並點擊
-                search_button = WebDriverWait(self.driver, 10).until(
+                search_button = self._wait(10).until(
                     EC.element_to_be_clickable((By.CSS_SELECTOR, "button.btn-primary.hidden-xs"))
                 )
                 search_button.click()
                 
                 # 等待課程列表載入
-                WebDriverWait(self.driver, 10).until(
+                self._wait(10).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, ".table-responsive table"))
                 )
                 
+                self.home_url = self.driver.current_url
                 return True, "登入成功並顯示所有課程"
                 
             except TimeoutException:
-                # 檢查是否有錯誤訊息
-                error_message = self.driver.find_element(By.CSS_SELECTOR, ".validation-summary-errors").text
+                # 檢查是否有錯誤訊息（隱含等待很短，以明確等待讓錯誤訊息有時間顯示）
+                try:
+                    error_message = self._wait(5).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, ".validation-summary-errors"))
+                    ).text
+                except TimeoutException:
+                    return False, "登入失敗：登入後未顯示課程列表"
                 return False, f"登入失敗：{error_message}"
                 
         except TimeoutException:
@@ -143,12 +190,75 @@ class EwantLogin:
         except Exception as e:
             return False, f"未知錯誤：{str(e)}"
     
+    def is_login_page(self) -> bool:
+        """目前頁面是否為登入頁（工作階段失效時會被導回登入頁）"""
+        try:
+            return '/login' in self.driver.current_url.lower()
+        except WebDriverException:
+            return False
+
+    def restore_session(self, cookies) -> bool:
+        """
+        以先前的 cookies 還原登入狀態
+        Args:
+            cookies: driver.get_cookies() 的結果
+        Returns:
+            bool: 是否已回到登入後的頁面
+        """
+        try:
+            # 必須先位於同一網域才能加入 cookies
+            self.driver.get(self.base_url)
+            for cookie in cookies:
+                try:
+                    self.driver.add_cookie(cookie)
+                except WebDriverException:
+                    continue
+                    
+            self.driver.get(self.home_url or self.base_url)
+            if self.is_login_page():
+                return False
+                
+            self._wait(10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "button.btn-primary.hidden-xs"))
+            )
+            return True
+        except (TimeoutException, WebDriverException):
+            return False
+
+    def restart_driver(self) -> Tuple[bool, str]:
+        """
+        重新啟動瀏覽器並還原登入狀態
+        優先沿用原本的 cookies，失效時才重新登入
+        Returns:
+            Tuple[bool, str]: (是否成功, 訊息)
+        """
+        cookies = []
+        try:
+            if self.driver:
+                cookies = self.driver.get_cookies()
+        except WebDriverException:
+            pass  # 瀏覽器已無回應時無法取得 cookies
+
+        self.close()
+        self.init_driver()
+
+        if cookies and self.restore_session(cookies):
+            return True, "已沿用原登入狀態"
+
+        if not self.username:
+            return False, "沒有可用的登入資訊"
+        return self.login(self.username, self.password)
+
     def get_driver(self):
         """獲取瀏覽器驅動實例"""
         return self.driver
     
     def close(self) -> None:
         """關閉瀏覽器"""
+        self.network_capture = None
         if self.driver:
-            self.driver.quit()
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                pass  # 瀏覽器已經結束
             self.driver = None
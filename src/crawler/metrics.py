@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# 各階段名稱與日誌顯示文字
+PHASE_LABELS = {
+    'login': '登入',
+    'driver_startup': '啟動瀏覽器',
+    'search': '搜尋課程',
+    'list_scan': '掃描課程列表',
+    'enter_course': '進入課程',
+    'summary_load': '載入課程摘要',
+    'prefetch_wait': '等待預先載入',
+    'stats_extraction': '擷取統計資料',
+    'summary_cache': '讀取快取',
+    'cache_validators': '取得快取驗證資訊',
+    'return_to_list': '返回課程列表',
+    'browser_recycle': '重啟瀏覽器',
+    'session_recovery': '恢復連線',
+    'course': '單一課程總計',
+}
+
+# 數值名稱與日誌顯示文字
+VALUE_LABELS = {
+    'concurrency': '同時擷取數',
+    'request_rate': '請求速率（次/秒）',
+    'browser_cpu_percent': '瀏覽器 CPU 使用率（%）',
+    'browser_rss_mb': '瀏覽器記憶體（MB）',
+    'browser_processes': '瀏覽器行程數',
+}
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """以線性內插計算百分位數（sorted_values 需已排序）"""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+class CrawlMetrics:
+    """記錄爬蟲各階段的耗時，並輸出統計與時間軸"""
+
+    def __init__(self):
+        self.run_started_at = time.time()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: List[Dict] = []
+        # 隨時間變化的數值（例如同時擷取數），時間軸上以計數器顯示
+        self.samples: List[Dict] = []
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """
+        計時區段
+        Args:
+            name: 階段名稱（參考 PHASE_LABELS）
+            args: 附加在時間軸上的資訊，例如課程名稱
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start, **args)
+
+    def record(self, name: str, start: float, duration: float, **args) -> None:
+        """加入一筆已完成的區段（start 為 time.perf_counter() 的值）"""
+        with self._lock:
+            self.spans.append({
+                'name': name,
+                'start': start - self._origin,
+                'duration': duration,
+                'thread': threading.get_ident(),
+                'args': args,
+            })
+
+    def record_value(self, name: str, value: float) -> None:
+        """記錄某個數值在目前時間點的值"""
+        with self._lock:
+            self.samples.append({
+                'name': name,
+                'time': time.perf_counter() - self._origin,
+                'value': value,
+            })
+
+    def latest_values(self) -> Dict[str, float]:
+        """各數值最後一次記錄的值"""
+        with self._lock:
+            return {sample['name']: sample['value'] for sample in self.samples}
+
+    def peak_values(self) -> Dict[str, float]:
+        """各數值記錄過的最大值"""
+        peaks: Dict[str, float] = {}
+        with self._lock:
+            for sample in self.samples:
+                name = sample['name']
+                peaks[name] = max(peaks.get(name, sample['value']), sample['value'])
+        return peaks
+
+    def durations(self, name: str) -> List[float]:
+        """取得某階段所有區段的耗時（秒）"""
+        with self._lock:
+            return [span['duration'] for span in self.spans if span['name'] == name]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """依階段彙整次數、總耗時與百分位數（秒）"""
+        grouped: Dict[str, List[float]] = {}
+        with self._lock:
+            for span in self.spans:
+                grouped.setdefault(span['name'], []).append(span['duration'])
+
+        result = {}
+        for name, values in grouped.items():
+            values.sort()
+            result[name] = {
+                'count': len(values),
+                'total': sum(values),
+                'mean': sum(values) / len(values),
+                'p50': _percentile(values, 50),
+                'p90': _percentile(values, 90),
+                'p99': _percentile(values, 99),
+                'max': values[-1],
+            }
+        return result
+
+    def to_dict(self) -> Dict:
+        """轉換為可序列化的字典"""
+        with self._lock:
+            spans = list(self.spans)
+            samples = list(self.samples)
+        return {
+            'run_started_at': self.run_started_at,
+            'elapsed': time.perf_counter() - self._origin,
+            'phases': self.summary(),
+            'latest_values': self.latest_values(),
+            'peak_values': self.peak_values(),
+            'spans': spans,
+            'samples': samples,
+        }
+
+    def export_json(self, file_path: str) -> None:
+        """將統計結果與所有區段輸出為 JSON"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def export_chrome_trace(self, file_path: str) -> None:
+        """輸出 Chrome Trace 格式，可於 chrome://tracing 或 Perfetto 開啟"""
+        with self._lock:
+            spans = list(self.spans)
+            samples = list(self.samples)
+
+        thread_ids: Dict[int, int] = {}
+        events = []
+        for span in spans:
+            tid = thread_ids.setdefault(span['thread'], len(thread_ids) + 1)
+            events.append({
+                'name': PHASE_LABELS.get(span['name'], span['name']),
+                'cat': span['name'],
+                'ph': 'X',
+                'ts': int(span['start'] * 1_000_000),
+                'dur': int(span['duration'] * 1_000_000),
+                'pid': os.getpid(),
+                'tid': tid,
+                'args': span['args'],
+            })
+        for sample in samples:
+            events.append({
+                'name': sample['name'],
+                'ph': 'C',
+                'ts': int(sample['time'] * 1_000_000),
+                'pid': os.getpid(),
+                'args': {sample['name']: sample['value']},
+            })
+
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+
+    def format_summary(self) -> str:
+        """產生適合顯示於日誌的階段耗時摘要"""
+        phases = self.summary()
+        if not phases:
+            return "沒有可用的計時資料"
+
+        lines = ["各階段耗時統計（秒）："]
+        ordered = [name for name in PHASE_LABELS if name in phases]
+        ordered += [name for name in phases if name not in PHASE_LABELS]
+        for name in ordered:
+            stat = phases[name]
+            lines.append(
+                f"{PHASE_LABELS.get(name, name)}：{stat['count']} 次，"
+                f"總計 {stat['total']:.2f}，p50 {stat['p50']:.2f}，"
+                f"p90 {stat['p90']:.2f}，最大 {stat['max']:.2f}"
+            )
+        peaks = self.peak_values()
+        for name, value in self.latest_values().items():
+            peak = peaks.get(name, value)
+            peak_text = f"（最大 {peak:g}）" if peak != value else ""
+            lines.append(f"{VALUE_LABELS.get(name, name)}：{value:g}{peak_text}")
+        return "\n".join(lines)
+
+    def export(self, output_dir: str, prefix: Optional[str] = None) -> Dict[str, str]:
+        """
+        將 JSON 統計與 Chrome Trace 一併輸出到指定資料夾
+        Returns:
+            Dict[str, str]: {'json': 路徑, 'trace': 路徑}
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(self.run_started_at))
+        prefix = prefix or "crawl"
+        paths = {
+            'json': os.path.join(output_dir, f"{prefix}_metrics_{stamp}.json"),
+            'trace': os.path.join(output_dir, f"{prefix}_trace_{stamp}.json"),
+        }
+        self.export_json(paths['json'])
+        self.export_chrome_trace(paths['trace'])
+        return paths
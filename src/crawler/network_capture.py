@@ -0,0 +1,191 @@
+import base64
+import json
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.crawler.course_list import find_list_rows, parse_course_rows
+from src.crawler.html_tables import parse_html_tables
+from src.crawler.stats_schema import StatsExtractor
+
+# 只記錄這些類型的回應：頁面本身與 XHR/fetch 取得的資料
+CAPTURE_RESOURCE_TYPES = ('Document', 'XHR', 'Fetch')
+CAPTURE_MIME_TYPES = ('application/json', 'text/json', 'text/html')
+# 每次最多保留的回應數，避免長時間未讀取時佔用過多記憶體
+MAX_RESPONSES = 50
+
+
+class CapturedResponse(NamedTuple):
+    """瀏覽器收到的一個回應"""
+    url: str
+    mime_type: str
+    resource_type: str
+    body: str
+    headers: Dict = {}
+
+
+def enable_performance_log(options) -> None:
+    """在 ChromeOptions 啟用 performance 記錄，才能以 get_log('performance') 取得網路事件"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def payload_tables(response: CapturedResponse) -> List[List[List[str]]]:
+    """
+    將回應內容轉為 [表格][列][儲存格] 格式，與 TABLES_SCRIPT 的結果相同
+    HTML 取出所有表格；JSON 中由陣列組成的陣列視為表格，物件陣列以各物件的值為一列
+    """
+    if 'html' in response.mime_type:
+        return parse_html_tables(response.body)
+    try:
+        data = json.loads(response.body)
+    except ValueError:
+        return []
+    tables = []
+    _collect_json_tables(data, tables)
+    return tables
+
+
+def _collect_json_tables(data, tables: List) -> None:
+    if isinstance(data, dict):
+        for value in data.values():
+            _collect_json_tables(value, tables)
+        return
+    if not isinstance(data, list) or not data:
+        return
+    if all(isinstance(item, (list, dict)) for item in data):
+        rows = []
+        for item in data:
+            values = item.values() if isinstance(item, dict) else item
+            cells = [str(value).strip() for value in values if not isinstance(value, (list, dict))]
+            rows.append(cells)
+        if any(rows):
+            tables.append(rows)
+        # 巢狀的陣列也可能是表格
+        for item in data:
+            nested = item.values() if isinstance(item, dict) else item
+            for value in nested:
+                if isinstance(value, (list, dict)):
+                    _collect_json_tables(value, tables)
+
+
+class NetworkCapture:
+    """
+    透過 Chrome DevTools 的網路事件取得頁面與 XHR/fetch 回應的原始內容
+    報表頁面的數字可直接從回應解析，不需等待並讀取渲染後的 DOM
+    需在啟動瀏覽器時呼叫 enable_performance_log
+    """
+
+    def __init__(self, driver, url_prefix: str = None):
+        """
+        Args:
+            driver: 已啟用 performance 記錄的 Chrome WebDriver
+            url_prefix: 只記錄此網址開頭的回應，None 表示不限制
+        """
+        self.driver = driver
+        self.url_prefix = url_prefix
+        self.responses: List[CapturedResponse] = []
+        self._pending: Dict[str, Dict] = {}    # requestId -> 已收到標頭、尚未載入完成的回應
+        self.driver.execute_cdp_cmd('Network.enable', {})
+
+    def collect(self) -> List[CapturedResponse]:
+        """
+        讀取上次以來的網路事件，取回已載入完成的回應內容
+        Returns:
+            List[CapturedResponse]: 目前保留的回應（舊到新）
+        """
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            return self.responses
+
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                self._on_response(params)
+            elif method == 'Network.loadingFinished':
+                self._on_finished(params['requestId'])
+            elif method == 'Network.loadingFailed':
+                self._pending.pop(params['requestId'], None)
+
+        del self.responses[:-MAX_RESPONSES]
+        return self.responses
+
+    def _on_response(self, params: Dict) -> None:
+        response = params.get('response', {})
+        url = response.get('url', '')
+        mime_type = response.get('mimeType', '')
+        if params.get('type') not in CAPTURE_RESOURCE_TYPES:
+            return
+        if not any(mime in mime_type for mime in CAPTURE_MIME_TYPES):
+            return
+        if self.url_prefix and not url.startswith(self.url_prefix):
+            return
+        self._pending[params['requestId']] = {
+            'url': url, 'mime_type': mime_type, 'resource_type': params['type'],
+            'headers': response.get('headers') or {}
+        }
+
+    def _on_finished(self, request_id: str) -> None:
+        info = self._pending.pop(request_id, None)
+        if info is None:
+            return
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception:
+            # 頁面已離開或內容已被釋放
+            return
+        body = result.get('body', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        self.responses.append(CapturedResponse(body=body, **info))
+
+    def clear(self) -> None:
+        """捨棄目前保留的回應與尚未讀取的網路事件（不取回內容）"""
+        try:
+            self.driver.get_log('performance')
+        except Exception:
+            pass
+        self._pending = {}
+        self.responses = []
+
+    def find_stats(self, extractor: StatsExtractor) -> Optional[Tuple[Dict, List]]:
+        """
+        從最新的回應開始尋找課程摘要統計
+        Returns:
+            Optional[Tuple[Dict, List]]: (統計資料, 表格資料)，沒有任何回應包含統計時返回 None（應改用 DOM 擷取）
+        """
+        empty = extractor.empty_stats()
+        for response in reversed(self.collect()):
+            tables = payload_tables(response)
+            if not tables:
+                continue
+            stats = extractor.extract(tables)
+            if stats != empty:
+                return stats, tables
+        return None
+
+    def find_headers(self, url: str) -> Optional[Dict]:
+        """
+        最新一個此網址頁面回應的標頭（例如寫入快取時取得 ETag/Last-Modified）
+        Returns:
+            Optional[Dict]: 回應標頭，沒有此網址的回應時返回 None
+        """
+        for response in reversed(self.collect()):
+            if response.url == url:
+                return response.headers
+        return None
+
+    def find_course_rows(self) -> Optional[List[Sequence[str]]]:
+        """
+        從最新的回應開始尋找課程列表
+        Returns:
+            Optional[List]: [列][儲存格文字]，沒有任何回應包含課程列表時返回 None
+        """
+        for response in reversed(self.collect()):
+            rows = find_list_rows(payload_tables(response))
+            if parse_course_rows(rows):
+                return rows
+        return None
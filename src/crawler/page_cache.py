@@ -0,0 +1,237 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.crawler.html_tables import parse_summary_tables
+
+
+class PageCache:
+    """
+    課程摘要頁的磁碟快取
+    以「帳號 + 正規化 URL」為鍵儲存頁面表格資料，超過 TTL 後以 ETag/Last-Modified
+    向伺服器確認是否變更，總大小超過上限時依最近使用時間（LRU）淘汰
+    """
+
+    DEFAULT_TTL = 30 * 60
+    DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+    REQUEST_TIMEOUT = 15
+    # 寫入快取時以 HEAD 取得 ETag/Last-Modified 的逾時，取不到時只是下次確認改為完整請求
+    VALIDATOR_TIMEOUT = 5
+
+    def __init__(self, cache_dir: str, account: str, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: 快取資料夾
+            account: 登入帳號，不同帳號看到的資料可能不同，因此分開快取
+            ttl: 快取有效秒數
+            max_bytes: 快取檔案總大小上限
+        """
+        self.cache_dir = cache_dir
+        self.account = account
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'index.db'), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                stored_at REAL,
+                last_access REAL,
+                size INTEGER,
+                etag TEXT,
+                last_modified TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages(last_access);
+            CREATE TABLE IF NOT EXISTS links (
+                account TEXT,
+                course_key TEXT,
+                url TEXT,
+                PRIMARY KEY (account, course_key)
+            );
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """正規化 URL：網域轉小寫、查詢參數排序、移除錨點"""
+        parts = urlsplit(url)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', query, ''))
+
+    def _key(self, url: str) -> str:
+        raw = f"{self.account}\n{self.normalize_url(url)}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json.gz")
+
+    def get_link(self, course_key: str) -> Optional[str]:
+        """取得課程對應的課程摘要網址"""
+        row = self.conn.execute(
+            "SELECT url FROM links WHERE account = ? AND course_key = ?", (self.account, course_key)
+        ).fetchone()
+        return row['url'] if row else None
+
+    def put_link(self, course_key: str, url: str) -> None:
+        """記錄課程對應的課程摘要網址"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO links(account, course_key, url) VALUES (?, ?, ?)",
+            (self.account, course_key, url)
+        )
+        self.conn.commit()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        讀取快取
+        Returns:
+            Dict: {'tables', 'stored_at', 'etag', 'last_modified', 'fresh'}，沒有快取時返回 None
+        """
+        key = self._key(url)
+        row = self.conn.execute("SELECT * FROM pages WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            with gzip.open(self._path(key), 'rt', encoding='utf-8') as f:
+                tables = json.load(f)
+        except (OSError, ValueError):
+            self._delete(key)
+            return None
+
+        now = time.time()
+        self.conn.execute("UPDATE pages SET last_access = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        return {
+            'tables': tables,
+            'stored_at': row['stored_at'],
+            'etag': row['etag'],
+            'last_modified': row['last_modified'],
+            'fresh': now - row['stored_at'] < self.ttl,
+        }
+
+    def put(self, url: str, tables: List, etag: str = None, last_modified: str = None) -> None:
+        """寫入快取並在超過大小上限時淘汰最久未使用的項目"""
+        key = self._key(url)
+        path = self._path(key)
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump(tables, f, ensure_ascii=False)
+        now = time.time()
+        self.conn.execute("""
+            INSERT OR REPLACE INTO pages(key, url, stored_at, last_access, size, etag, last_modified)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (key, self.normalize_url(url), now, now, os.path.getsize(path), etag, last_modified))
+        self.conn.commit()
+        self._evict()
+
+    def _touch(self, url: str) -> None:
+        """伺服器確認未變更，重新開始計算 TTL"""
+        now = time.time()
+        self.conn.execute(
+            "UPDATE pages SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, self._key(url))
+        )
+        self.conn.commit()
+
+    def _delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+        self.conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+        self.conn.commit()
+
+    def _evict(self) -> None:
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) AS total FROM pages").fetchone()['total']
+        if total <= self.max_bytes:
+            return
+        for row in self.conn.execute("SELECT key, size FROM pages ORDER BY last_access").fetchall():
+            self._delete(row['key'])
+            total -= row['size']
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def validators(headers: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """從回應標頭取出 (ETag, Last-Modified)，標頭名稱不分大小寫"""
+        lowered = {name.lower(): value for name, value in headers.items()}
+        return lowered.get('etag'), lowered.get('last-modified')
+
+    @staticmethod
+    def _session(cookies: List[Dict], user_agent: str = None):
+        """帶有瀏覽器 cookies 與 User-Agent 的 requests 工作階段"""
+        import requests
+
+        session = requests.Session()
+        if user_agent:
+            session.headers['User-Agent'] = user_agent
+        for cookie in cookies:
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'),
+                                path=cookie.get('path', '/'))
+        return session
+
+    def fetch_validators(self, url: str, cookies: List[Dict],
+                         user_agent: str = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        以 HEAD 請求取得頁面的 ETag 與 Last-Modified，寫入快取時一併保存，過期後才能以條件式請求確認
+        Returns:
+            Tuple: (ETag, Last-Modified)，伺服器未提供或請求失敗時為 None
+        """
+        import requests
+
+        try:
+            response = self._session(cookies, user_agent).head(
+                url, timeout=self.VALIDATOR_TIMEOUT, allow_redirects=False
+            )
+        except requests.RequestException:
+            return None, None
+        if response.status_code != 200:
+            return None, None
+        return self.validators(response.headers)
+
+    def revalidate(self, url: str, entry: Dict, cookies: List[Dict], user_agent: str = None) -> Optional[Dict]:
+        """
+        以 HTTP 條件式請求確認過期的快取
+        伺服器回應 304 時沿用快取；回應 200 時直接解析新頁面並更新快取
+        Args:
+            url: 課程摘要網址
+            entry: get() 取得的過期快取
+            cookies: 瀏覽器目前的 cookies（driver.get_cookies()）
+            user_agent: 與瀏覽器相同的 User-Agent
+        Returns:
+            Dict: 更新後的快取內容，無法確認時（例如登入逾期被導向）返回 None
+        """
+        import requests
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = self._session(cookies, user_agent).get(
+                url, headers=headers, timeout=self.REQUEST_TIMEOUT, allow_redirects=False
+            )
+        except requests.RequestException:
+            return None
+
+        if response.status_code == 304:
+            self._touch(url)
+            return dict(entry, fresh=True)
+        if response.status_code != 200:
+            return None
+
+        # 與瀏覽器擷取時相同，只保存課程摘要的表格
+        tables = parse_summary_tables(response.text)
+        if not tables:
+            return None
+        etag, last_modified = self.validators(response.headers)
+        self.put(url, tables, etag, last_modified)
+        return {'tables': tables, 'stored_at': time.time(), 'etag': etag,
+                'last_modified': last_modified, 'fresh': True}
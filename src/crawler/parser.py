@@ -1,302 +1,269 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from typing import List, Dict, Tuple
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from typing import List, Dict, Tuple, Callable, Iterable, Iterator, Optional
 import time
 from datetime import datetime
-import re
+
+from src.crawler.archive import CrawlArchive
+from src.crawler.cancellation import CancellableWait, CancellationToken, CrawlCancelled
+from src.crawler.course_list import (
+    LIST_CHUNK_SIZE, LIST_ROW_COUNT_SCRIPT, LIST_ROW_KEYS_SCRIPT, LIST_ROWS_SCRIPT, LIST_TABLE_SELECTOR,
+    MIN_COLUMNS, NAME_COLUMN, START_COLUMN, filter_courses, parse_course_rows, parse_date, row_index_by_key
+)
+from src.crawler.events import (
+    CourseFinished, CourseListed, CourseStarted, Eta, EventBus, Log, MetricsReport, Progress, RateChanged
+)
+from src.crawler.metrics import CrawlMetrics
+from src.crawler.page_cache import PageCache
+from src.crawler.prefetch import SummaryPrefetcher
+from src.crawler.rate_limit import AimdController
+from src.crawler.tab_pool import ENTRY_TARGETS_SCRIPT, SUMMARY_LINK_SCRIPT, TabPool, entry_url
+from src.crawler.stats_schema import StatsExtractor, TABLES_SCRIPT, SUMMARY_TABLE_SELECTOR, parse_number
+from src.utils.process_utils import ProcessUtils
 
 class CourseParser:
-    def __init__(self, driver, progress=None, search_text=None, status_filters=None, start_date=None, end_date=None):
+    # 瀏覽器重啟條件：每處理幾門課程，或瀏覽器記憶體超過多少 MB（0 表示停用）
+    DEFAULT_RECYCLE_EVERY = 100
+    DEFAULT_MAX_BROWSER_MEMORY_MB = 2048
+    # 瀏覽器崩潰或登入逾期時，最多自動恢復幾次
+    MAX_SESSION_RECOVERIES = 5
+
+    def __init__(self, driver, events: EventBus = None, search_text=None, status_filters=None, start_date=None, end_date=None,
+                 metrics: CrawlMetrics = None, login_manager=None,
+                 recycle_every: int = DEFAULT_RECYCLE_EVERY,
+                 max_browser_memory_mb: int = DEFAULT_MAX_BROWSER_MEMORY_MB,
+                 course_filter: Optional[Callable[[Dict], bool]] = None,
+                 rate_controller: AimdController = None,
+                 page_cache: PageCache = None,
+                 archive: CrawlArchive = None,
+                 tabs: int = 1,
+                 stat_keys: Optional[List[str]] = None,
+                 cancel_token: CancellationToken = None,
+                 prefetch: bool = True):
+        # 停止爬取的旗標：所有等待與休眠都透過它進行，設定後立即結束並保留已擷取的資料
+        self.cancel_token = cancel_token or CancellationToken()
         self.driver = driver
-        self.wait = WebDriverWait(driver, 30)
-        self.progress = progress
-        self.progress_percent = None
-        self.time_remaining = None
-        self.stop_crawling = False
+        self.wait = CancellableWait(driver, 30, self.cancel_token)
+        # 進度、結果等以事件發布，由訂閱者（介面、主控台等）決定如何呈現
+        self.events = events or EventBus()
         self.search_text = search_text
         self.status_filters = status_filters if status_filters else ["開課中"]
         self.start_date = start_date
         self.end_date = end_date
         self.courses = []
+        self.list_snapshot = []         # 最近一次搜尋的完整課程列表（未經篩選）
+        self.list_rows_total = 0        # 課程列表的總列數
+        self.list_rows_scanned = 0      # 已讀取的列數，小於總列數時列表尚未讀完
+        # 列表篩選後再決定哪些課程需要進入擷取，None 表示全部
+        self.course_filter = course_filter
+        self.metrics = metrics or CrawlMetrics()
+        # 只擷取需要的統計（None 表示全部），頁面上也只取回包含這些統計的表格
+        self.stats_extractor = StatsExtractor(keys=stat_keys)
+        # 瀏覽器重啟需要 EwantLogin 以重新建立工作階段
+        self.login_manager = login_manager
+        self.recycle_every = recycle_every
+        self.max_browser_memory_mb = max_browser_memory_mb
+        self.courses_since_recycle = 0
+        self.session_recoveries = 0
+        # 同時使用幾個分頁擷取課程摘要，1 表示逐一在同一頁擷取
+        self.tabs = max(1, tabs)
+        # 依課程摘要延遲與錯誤率自動調整請求速率與同時擷取數（分頁模式時同時擷取數即使用中的分頁數）
+        self.rate_controller = rate_controller or AimdController(max_concurrency=max(self.tabs, 4))
+        # 課程摘要快取，None 表示不使用
+        self.page_cache = page_cache
+        self.on_course_list = False     # 目前是否停留在課程列表頁
+        self.last_summary_url = None    # 最近一次進入的課程摘要網址
+        self.last_tables = None         # 最近一次擷取的課程摘要表格資料
+        # 保存抓到的頁面以便離線重新解析，None 表示不保存
+        self.archive = archive
+        # 逐一擷取時在背景分頁預先載入下一門課程的課程摘要
+        self.prefetch = prefetch
+        self.prefetcher = None
+
+    @property
+    def stop_crawling(self) -> bool:
+        return self.cancel_token.cancelled
+
+    @stop_crawling.setter
+    def stop_crawling(self, value: bool) -> None:
+        # 取消後無法復原，與原本的旗標用法相容
+        if value:
+            self.cancel_token.cancel()
 
     def _parse_date(self, date_str):
         """解析日期字串，轉換為 datetime 物件"""
         try:
-            # 移除所有空白字元
-            date_str = date_str.strip()
-            
-            # ewant日期格式通常為 "2024-03-01" 或 "2024/03/01"
-            patterns = [
-                r'(\d{4})-(\d{2})-(\d{2})',  # 匹配 2024-03-01
-                r'(\d{4})/(\d{2})/(\d{2})',  # 匹配 2024/03/01
-            ]
-            
-            for pattern in patterns:
-                match = re.match(pattern, date_str)
-                if match:
-                    year, month, day = map(int, match.groups())
-                    return datetime(year, month, day)
-            return None
+            return parse_date(date_str)
         except Exception as e:
-            if self.progress:
-                self.progress.emit(f"日期解析錯誤 ({date_str}): {str(e)}")
+            if self.events.wants(Log):
+                self.events.log(f"日期解析錯誤 ({date_str}): {str(e)}", 'warning')
             return None
 
-    def _is_date_in_range(self, date_str):
-        """檢查日期是否在指定範圍內"""
-        if not (self.start_date and self.end_date):
-            return True
-            
-        course_date = self._parse_date(date_str)
-        if not course_date:
-            if self.progress:
-                self.progress.emit(f"無法解析日期: {date_str}")
-            return True  # 如果無法解析日期，預設允許通過
-            
-        # 只返回是否在範圍內的結果，不顯示每個被過濾的日期
-        return self.start_date <= course_date <= self.end_date
+    def _warn_undated(self, date_str):
+        """無法解析日期的課程預設允許通過，僅提示訊息"""
+        self.events.log(f"無法解析日期: {date_str}", 'warning')
 
     def get_course_rows(self) -> List[Dict]:
-        """抓取課程列表"""
+        """抓取整個課程列表，返回符合狀態與日期條件的課程"""
+        for _ in self.scan_course_list():
+            pass
+        return self.courses
+
+    def scan_course_list(self) -> Iterator[List[Dict]]:
+        """
+        逐段讀取目前頁面的課程列表，每段篩選後立即交給呼叫端擷取，不需等整個列表讀完
+        讀完後 list_snapshot 為完整列表、courses 為符合狀態與日期條件的課程，並發布 CourseListed
+        每次取得下一段時目前頁面需為課程列表
+        Yields:
+            List[Dict]: 該段中符合條件且需要擷取的課程（可能為空）
+        """
         try:
-            table = self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".table-responsive table"))
+            self.wait.until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, LIST_TABLE_SELECTOR))
             )
-            rows = table.find_elements(By.CSS_SELECTOR, "tbody tr")
-            courses = []
-            
-            total_rows = len(rows)  # 這裡定義了 total_rows 變數
-            filtered_count = 0
-            date_filtered_count = 0
-            
-            for idx, row in enumerate(rows):
-                try:
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    if len(cells) >= 8:
-                        status = cells[0].text.strip()
-                        start_time = cells[4].text.strip()
-                        
-                        # 檢查日期範圍
-                        if not self._is_date_in_range(start_time):
-                            if status in self.status_filters:
-                                date_filtered_count += 1
-                            continue
-                            
-                        if status in self.status_filters:
-                            filtered_count += 1
-                            courses.append({
-                                'name': cells[2].text.strip(),
-                                'status': status,
-                                'start_time': start_time,
-                                'end_time': cells[5].text.strip(),
-                                'row_idx': idx,
-                                'enrolled_count': 0
-                            })
-                except Exception as e:
-                    print(f"處理第 {idx} 行時發生錯誤: {str(e)}")
-                    continue
-            
-            if self.progress:
-                # 重新組織訊息顯示順序
-                msgs = [f"搜尋到 {total_rows} 門課程"]
-                
-                # 日期範圍資訊
-                if self.start_date and self.end_date:
-                    date_range = (f"日期範圍篩選: {self.start_date.strftime('%Y-%m-%d')} "
-                                f"至 {self.end_date.strftime('%Y-%m-%d')}")
-                    msgs.append(date_range)
-                
-                # 狀態過濾資訊
-                status_str = "、".join(self.status_filters)
-                status_msg = f"符合「{status_str}」狀態的有 {filtered_count + date_filtered_count} 門"
-                msgs.append(status_msg)
-                
-                # 日期過濾後的結果 - 改為更簡潔的訊息
-                if self.start_date and self.end_date and date_filtered_count > 0:
-                    date_filter_msg = f"符合狀態和日期範圍的有 {filtered_count} 門課程"
-                    msgs.append(date_filter_msg)
-                
-                # 發送完整訊息
-                self.progress.emit("\n".join(msgs))
-                
-            self.courses = courses
-            return courses
-                
         except TimeoutException:
             raise Exception("無法載入課程列表")
+
+        # 啟用網路擷取時直接解析列表頁的回應內容，找不到時才讀取 DOM
+        capture = self._network_capture()
+        captured_rows = capture.find_course_rows() if capture else None
+        if captured_rows is not None:
+            self.list_rows_total = len(captured_rows)
+            # 回應內容的順序不一定與頁面相同，依課程識別鍵對應頁面上的列，進入課程時才會點到正確的列
+            dom_rows = row_index_by_key(self.driver.execute_script(
+                LIST_ROW_KEYS_SCRIPT, LIST_TABLE_SELECTOR, NAME_COLUMN, START_COLUMN, MIN_COLUMNS
+            ) or [])
+            unaligned = 0
+        else:
+            self.list_rows_total = self.driver.execute_script(LIST_ROW_COUNT_SCRIPT, LIST_TABLE_SELECTOR) or 0
+        self.list_rows_scanned = 0
+        # 保留完整列表，讓介面可在本機重新篩選而不需重新爬取
+        self.list_snapshot = []
+        self.courses = []
+        date_filtered_count = 0
+        queued_count = 0
+        # 只回報是否在範圍內的結果，不顯示每個被過濾的日期
+        on_undated = self._warn_undated if self.events.wants(Log) else None
+
+        while self.list_rows_scanned < self.list_rows_total:
+            offset = self.list_rows_scanned
+            with self.metrics.span('list_scan', offset=offset):
+                if captured_rows is not None:
+                    rows = captured_rows[offset:offset + LIST_CHUNK_SIZE]
+                else:
+                    # 每次只取回一段列的文字，第一段讀完即可開始擷取
+                    rows = self.driver.execute_script(
+                        LIST_ROWS_SCRIPT, LIST_TABLE_SELECTOR, offset, LIST_CHUNK_SIZE
+                    ) or []
+                listed = parse_course_rows(rows, offset)
+                if captured_rows is not None:
+                    aligned = [course for course in listed if course['key'] in dom_rows]
+                    unaligned += len(listed) - len(aligned)
+                    for course in aligned:
+                        course['row_idx'] = dom_rows[course['key']]
+                    listed = aligned
+                matched, filtered = filter_courses(
+                    listed, self.status_filters, self.start_date, self.end_date, on_undated=on_undated
+                )
+            if not rows:
+                # 列表在讀取期間變短
+                break
+            self.list_rows_scanned += len(rows)
+            self.list_snapshot.extend(listed)
+            self.courses.extend(matched)
+            date_filtered_count += filtered
+            if self.course_filter:
+                matched = [course for course in matched if self.course_filter(course)]
+            queued_count += len(matched)
+            yield matched
+
+        self.list_rows_total = self.list_rows_scanned
+        if captured_rows is not None and unaligned and self.events.wants(Log):
+            self.events.log(f"{unaligned} 門課程不在頁面上的課程列表中，略過")
+        if self.events.wants(CourseListed):
+            self.events.publish(CourseListed([dict(course) for course in self.list_snapshot]))
+        if self.events.wants(Log):
+            self._log_list_summary(date_filtered_count, queued_count)
+
+    def _log_list_summary(self, date_filtered_count: int, queued_count: int) -> None:
+        """列表讀完後顯示搜尋與篩選結果"""
+        filtered_count = len(self.courses)
+        # 重新組織訊息顯示順序
+        msgs = [f"搜尋到 {len(self.list_snapshot)} 門課程"]
+        
+        # 日期範圍資訊
+        if self.start_date and self.end_date:
+            date_range = (f"日期範圍篩選: {self.start_date.strftime('%Y-%m-%d')} "
+                        f"至 {self.end_date.strftime('%Y-%m-%d')}")
+            msgs.append(date_range)
+        
+        # 狀態過濾資訊
+        status_str = "、".join(self.status_filters)
+        status_msg = f"符合「{status_str}」狀態的有 {filtered_count + date_filtered_count} 門"
+        msgs.append(status_msg)
+        
+        # 日期過濾後的結果 - 改為更簡潔的訊息
+        if self.start_date and self.end_date and date_filtered_count > 0:
+            date_filter_msg = f"符合狀態和日期範圍的有 {filtered_count} 門課程"
+            msgs.append(date_filter_msg)
+
+        if self.course_filter:
+            msgs.append(f"其中 {queued_count} 門需要擷取")
+        
+        # 發送完整訊息
+        self.events.log("\n".join(msgs))
+
+    @property
+    def list_scan_complete(self) -> bool:
+        return self.list_rows_scanned >= self.list_rows_total
+
+    def _estimated_total(self, queued: int) -> int:
+        """列表尚未讀完時，依已讀取列數的比例估計需要擷取的課程總數"""
+        if self.list_scan_complete or not self.list_rows_scanned:
+            return queued
+        return max(queued, round(queued * self.list_rows_total / self.list_rows_scanned))
         
     def get_enrolled_count(self) -> Dict:
         """抓取課程相關統計資訊"""
+        with self.metrics.span('stats_extraction'):
+            return self._get_enrolled_count()
+
+    def _get_enrolled_count(self) -> Dict:
         try:
             # 等待特定表格出現
             self.wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, ".table-responsive"))
             )
             
-            # 初始化回傳的資料結構
-            stats = {
-                '選修人數': {'台灣': 0, '中國大陸': 0, '其他': 0},
-                '通過人數': {'台灣': 0, '中國大陸': 0, '其他': 0},
-                '影片瀏覽次數': {'台灣': 0, '中國大陸': 0, '其他': 0},
-                '作業測驗作答次數': {'台灣': 0, '中國大陸': 0, '其他': 0},
-                '講義參考資料瀏覽次數': {'台灣': 0, '中國大陸': 0, '其他': 0},
-                '講義參考資料瀏覽人數': {'台灣': 0, '中國大陸': 0, '其他': 0},
-                '討論次數': 0,
-                '使用行動載具瀏覽影片次數': 'N/A'  # 預設值為 N/A
-            }
-            
-            # 找到所有表格
-            tables = self.driver.find_elements(
-                By.CSS_SELECTOR, 
-                "section.panel .table-responsive table"
-            )
-            
-            # 處理兩個表格的資料
-            for table_idx, table in enumerate(tables):
-                try:
-                    rows = table.find_elements(By.TAG_NAME, "tr")
-                    current_type = ''
-                    
-                    for row in rows:
-                        cells = row.find_elements(By.TAG_NAME, "td")
-                        
-                        # 跳過空行或格式不符的行
-                        if len(cells) < 2:
-                            continue
-                        
-                        # 處理不同格式的表格行
-                        if len(cells) == 3:  # 包含類型的列
-                            type_text = cells[0].text.strip()
-                            region = cells[1].text.strip()
-                            count = self._parse_number(cells[2].text.strip())
-                            
-                            # 如果有rowspan，那麼這是一個新類型
-                            if 'rowspan' in cells[0].get_attribute('outerHTML').lower():
-                                current_type = type_text
-                            
-                            # 改進的類型匹配邏輯
-                            if '講義' in current_type and '參考資料' in current_type:
-                                if '瀏覽人數' in current_type:
-                                    # 講義/參考資料瀏覽人數
-                                    if region in ["台灣", "中國大陸", "其他"]:
-                                        stats['講義參考資料瀏覽人數'][region] = count
-                                elif '瀏覽次數' in current_type:
-                                    # 講義/參考資料瀏覽次數
-                                    if region in ["台灣", "中國大陸", "其他"]:
-                                        stats['講義參考資料瀏覽次數'][region] = count
-                            else:
-                                # 其他正常資料的處理
-                                if region in ["台灣", "中國大陸", "其他"] and current_type in stats and isinstance(stats[current_type], dict):
-                                    stats[current_type][region] = count
-                                    
-                        elif len(cells) == 2:  # 一般資料列或討論次數
-                            col1_text = cells[0].text.strip()
-                            col2_text = cells[1].text.strip()
-                            
-                            # 處理討論次數
-                            if '討論次數' in col1_text:
-                                stats['討論次數'] = self._parse_number(col2_text)
-                            # 處理行動載具瀏覽影片次數
-                            elif '使用行動載具瀏覽影片次數' in col1_text:
-                                # 如果是純數字就解析，否則保留原值(可能是N/A)
-                                try:
-                                    stats['使用行動載具瀏覽影片次數'] = self._parse_number(col2_text)
-                                except:
-                                    stats['使用行動載具瀏覽影片次數'] = col2_text.strip()
-                            # 處理普通地區資料
-                            elif col1_text in ["台灣", "中國大陸", "其他"] and current_type in stats and isinstance(stats[current_type], dict):
-                                stats[current_type][col1_text] = self._parse_number(col2_text)
-                
-                except Exception as e:
-                    if self.progress:
-                        self.progress.emit(f"處理第 {table_idx+1} 個表格時發生錯誤: {str(e)}")
-                    print(f"處理表格時發生錯誤: {str(e)}")
-                    continue
-            
-            # 額外處理：直接從表格查找特定文字
-            try:
-                # 尋找講義/參考資料瀏覽人數和次數的行
-                all_cells = self.driver.find_elements(By.CSS_SELECTOR, ".table tr td")
-                for cell_idx, cell in enumerate(all_cells):
-                    cell_text = cell.text.strip()
-                    
-                    # 檢查是否為講義/參考資料瀏覽人數
-                    if '講義' in cell_text and '參考資料' in cell_text and '瀏覽人數' in cell_text:
-                        try:
-                            # 嘗試獲取相應的地區及數值
-                            region_cells = all_cells[cell_idx+1:cell_idx+7]  # 抓取後續6個單元格
-                            
-                            # 遍歷每個可能的地區單元格
-                            for i in range(0, len(region_cells), 2):
-                                if i+1 < len(region_cells):
-                                    region = region_cells[i].text.strip()
-                                    if region in ["台灣", "中國大陸", "其他"]:
-                                        count = self._parse_number(region_cells[i+1].text.strip())
-                                        stats['講義參考資料瀏覽人數'][region] = count
-                        except Exception as e:
-                            print(f"處理講義/參考資料瀏覽人數時發生錯誤: {str(e)}")
-                    
-                    # 檢查是否為講義/參考資料瀏覽次數
-                    if '講義' in cell_text and '參考資料' in cell_text and '瀏覽次數' in cell_text:
-                        try:
-                            # 嘗試獲取相應的地區及數值
-                            region_cells = all_cells[cell_idx+1:cell_idx+7]  # 抓取後續6個單元格
-                            
-                            # 遍歷每個可能的地區單元格
-                            for i in range(0, len(region_cells), 2):
-                                if i+1 < len(region_cells):
-                                    region = region_cells[i].text.strip()
-                                    if region in ["台灣", "中國大陸", "其他"]:
-                                        count = self._parse_number(region_cells[i+1].text.strip())
-                                        stats['講義參考資料瀏覽次數'][region] = count
-                        except Exception as e:
-                            print(f"處理講義/參考資料瀏覽次數時發生錯誤: {str(e)}")
-                    
-                    # 檢查是否為使用行動載具瀏覽影片次數
-                    if '使用行動載具瀏覽影片次數' in cell_text:
-                        try:
-                            # 檢查是否有下一個單元格
-                            if cell_idx + 1 < len(all_cells):
-                                value_text = all_cells[cell_idx+1].text.strip()
-                                try:
-                                    stats['使用行動載具瀏覽影片次數'] = self._parse_number(value_text)
-                                except:
-                                    stats['使用行動載具瀏覽影片次數'] = value_text
-                        except Exception as e:
-                            print(f"處理使用行動載具瀏覽影片次數時發生錯誤: {str(e)}")
-                    
-                    # 檢查是否為討論次數
-                    if '討論次數' in cell_text and not '人數' in cell_text:
-                        try:
-                            # 討論次數通常在下一個單元格
-                            if cell_idx + 1 < len(all_cells):
-                                count = self._parse_number(all_cells[cell_idx+1].text.strip())
-                                stats['討論次數'] = count
-                        except Exception as e:
-                            print(f"處理討論次數時發生錯誤: {str(e)}")
-            except Exception as e:
-                if self.progress:
-                    self.progress.emit(f"直接查找特定文字時發生錯誤: {str(e)}")
-            
-            return stats
+            # 啟用網路擷取時先從課程摘要的回應內容（頁面或 XHR/fetch）解析
+            capture = self._network_capture()
+            found = capture.find_stats(self.stats_extractor) if capture else None
+            if found:
+                stats, self.last_tables = found
+                return stats
+
+            # 一次取回所有表格文字，再依 schema 單次掃描
+            tables = self.driver.execute_script(
+                TABLES_SCRIPT, SUMMARY_TABLE_SELECTOR, self.stats_extractor.table_keywords()
+            ) or []
+            self.last_tables = tables
+            return self.stats_extractor.extract(tables)
                 
         except Exception as e:
-            if self.progress:
-                self.progress.emit(f"抓取統計資訊時發生錯誤: {str(e)}")
+            if self.events.wants(Log):
+                self.events.log(f"抓取統計資訊時發生錯誤: {str(e)}", 'warning')
             print(f"抓取統計資訊時發生錯誤: {str(e)}")
             return None
 
+    def _network_capture(self):
+        """登入時啟用網路擷取才有值，瀏覽器重啟後對應新的瀏覽器"""
+        return getattr(self.login_manager, 'network_capture', None)
+
     def _parse_number(self, text: str) -> int:
         """解析數字文字"""
-        try:
-            # 移除所有非數字字元
-            number = ''.join(filter(str.isdigit, text))
-            return int(number) if number else 0
-        except:
-            return 0
+        return parse_number(text)
     
     def enter_course(self, course_idx: int) -> Tuple[bool, Dict]:
         """進入課程並抓取資料"""
@@ -304,30 +271,41 @@ class CourseParser:
             table = self.wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, ".table-responsive table"))
             )
-            rows = table.find_elements(By.CSS_SELECTOR, "tbody tr")
+            # 隱含等待很短，列表的列以可取消的明確等待確認已產生
+            rows = self.wait.until(lambda driver: table.find_elements(By.CSS_SELECTOR, "tbody tr"))
             
             if course_idx >= len(rows):
                 return False, None
                 
+            self.last_summary_url = None
+            self.last_tables = None
+            capture = self._network_capture()
+            if capture:
+                # 只保留本課程之後的回應，避免誤用上一門課程的資料
+                capture.clear()
             try:
                 row = rows[course_idx]
-                button = row.find_element(
-                    By.CSS_SELECTOR, 
-                    "input.btn.btn-primary[type='button'][value='進入課程']"
-                )
-                button.click()
-                time.sleep(2)
-                
-                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".panel-heading")))
-                
-                try:
-                    summary_link = self.wait.until(
-                        EC.element_to_be_clickable((By.LINK_TEXT, "課程摘要"))
-                    )
-                    summary_link.click()
-                    time.sleep(2)
+                with self.metrics.span('enter_course', row=course_idx):
+                    button = self.wait.until(lambda driver: row.find_element(
+                        By.CSS_SELECTOR,
+                        "input.btn.btn-primary[type='button'][value='進入課程']"
+                    ))
+                    self.on_course_list = False
+                    button.click()
+                    self.cancel_token.sleep(2)
                     
                     self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".panel-heading")))
+                
+                try:
+                    with self.metrics.span('summary_load', row=course_idx):
+                        summary_link = self.wait.until(
+                            EC.element_to_be_clickable((By.LINK_TEXT, "課程摘要"))
+                        )
+                        self.last_summary_url = summary_link.get_attribute('href')
+                        summary_link.click()
+                        self.cancel_token.sleep(2)
+                        
+                        self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".panel-heading")))
                     
                     stats = self.get_enrolled_count()
                     return True, stats
@@ -345,12 +323,577 @@ class CourseParser:
             return False, None
 
     def process_all_courses(self) -> List[Dict]:
+        all_courses = []    # 已排入擷取的課程（依列表順序）
+        try:
+            if self.search_text and self.events.wants(Log):
+                self.events.log(f"搜尋關鍵字: {self.search_text}")
+            self._run_search()
+            self._archive_page('list', search_text=self.search_text)
+
+            # 列表逐段讀取，每段篩選後立即開始擷取，不需等整個列表讀完
+            chunks = self.scan_course_list()
+            self.events.log("\n開始擷取課程資料...")
+            self._report_rate()
+
+            queued = all_courses
+            if self.tabs > 1:
+                # 分頁模式無法完成的課程再逐一擷取
+                fallback = self._fetch_in_tabs(chunks, all_courses)
+                if fallback and not self.stop_crawling and self.events.wants(Log):
+                    self.events.log(f"\n{len(fallback)} 門課程改為逐一擷取")
+                chunks = [fallback]
+                queued = []
+
+            if not self._fetch_one_by_one(chunks, queued):
+                return self._fetched(all_courses)
+
+            if not all_courses and not self.stop_crawling:
+                self.events.log("未找到符合條件的課程")
+                return []
+
+            # 最終更新進度為100%，清除剩餘時間
+            self.events.publish(Progress(100))
+            self.events.publish(Eta(None))
+                
+            # 使用者停止時只有部分課程已擷取
+            all_courses = self._fetched(all_courses)
+            if self.events.wants(Log):
+                self.events.log(f"\n資料擷取完成! 共處理 {len(all_courses)} 門課程")
+            if self.events.wants(MetricsReport):
+                self.events.publish(MetricsReport(self.metrics.summary(), self.metrics.format_summary()))
+            return all_courses
+
+        except CrawlCancelled:
+            # 進行中的課程放棄，已擷取的課程資料保持完整
+            self.events.log("使用者停止爬蟲")
+            self.events.publish(Eta(None))
+            return self._fetched(all_courses)
+
+        except Exception as e:
+            error_msg = f"處理課程列表時發生錯誤：{str(e)}"
+            print(error_msg)
+            if self.events.wants(Log):
+                self.events.log(error_msg, 'error')
+            return []
+
+    @staticmethod
+    def _fetched(courses: List[Dict]) -> List[Dict]:
+        """已取得統計資料的課程（停止或中途失敗時，排入擷取的課程不一定都已完成）"""
+        return [course for course in courses if course.get('stats')]
+
+    def _fetch_one_by_one(self, chunks: Iterable[List[Dict]], queued: List[Dict]) -> bool:
+        """
+        在課程列表頁逐一進入課程擷取；每處理完一段課程才向 chunks 取得下一段（此時已返回課程列表）
+        Args:
+            chunks: 逐段產生的課程，例如 scan_course_list()
+            queued: 已排入擷取的課程，取得每段時附加到此列表
+        Returns:
+            bool: 是否正常結束（使用者停止也算），無法返回課程列表或擷取失敗時為 False
+        """
+        # 添加時間追蹤
+        start_time = time.time()
+        idx = 0
+        # 分頁模式改為逐一擷取的課程無法解析課程網址，不預先載入；網路擷取會混入背景分頁的回應，也不預先載入
+        prefetch = self.prefetch and self.tabs == 1 and not self._network_capture()
+        try:
+            for chunk in chunks:
+                queued.extend(chunk)
+                for pos, course in enumerate(chunk):
+                    course_start_time = time.perf_counter()
+                
+                    if self.stop_crawling:
+                        self.events.log("使用者停止爬蟲")
+                        return True
+
+                    idx += 1
+                    # 列表尚未讀完時總數為估計值
+                    total_courses = self._estimated_total(len(queued))
+                    
+                    # 發送進度百分比
+                    self.events.publish(Progress(int((idx - 1) / total_courses * 100)))
+                
+                    # 計算預估剩餘時間
+                    if idx > 1:
+                        avg_time_per_course = (time.time() - start_time) / (idx - 1)
+                        self.events.publish(Eta(avg_time_per_course * (total_courses - (idx - 1))))
+                
+                    self.events.publish(CourseStarted(course, idx, total_courses))
+
+                    # 只預先載入同一段中的下一門，下一段要回到課程列表後才會讀取
+                    next_course = chunk[pos + 1] if prefetch and self.prefetch and pos + 1 < len(chunk) else None
+                    success, stats = self.fetch_course(course, next_course)
+                    if success:
+                        course['stats'] = stats
+                    
+                        # 資料取自快取時仍在課程列表，不需等待頁面切換
+                        page_changed = not self.on_course_list
+                        if page_changed:
+                            self.cancel_token.sleep(1)
+
+                        if not self.resume_course_list(has_more=idx < total_courses):
+                            return False
+                    
+                        if page_changed:
+                            self.cancel_token.sleep(1)
+                        self.events.publish(CourseFinished(course, idx, total_courses, True, stats))
+                    
+                        # 更新進度為當前課程完成的百分比
+                        self.events.publish(Progress(int(idx / total_courses * 100)))
+                    
+                        # 記錄課程處理時間
+                        self.metrics.record('course', course_start_time,
+                                            time.perf_counter() - course_start_time, course=course['name'])
+                    
+                    else:
+                        self.events.publish(CourseFinished(course, idx, total_courses, False))
+                        return False
+            return True
+        finally:
+            # 停止或結束時捨棄預先載入的頁面
+            self._discard_prefetch()
+
+    def process_keywords(self, keywords: List[str]) -> List[Dict]:
+        """
+        在同一個登入工作階段依序搜尋多個關鍵字
+        多個關鍵字搜尋到的同一門課程只擷取一次，結果的 keywords 記錄所有符合的關鍵字
+        Args:
+            keywords: 搜尋關鍵字
+        Returns:
+            List[Dict]: 去除重複後的課程資料（依首次出現順序）
+        """
+        results: Dict[str, Dict] = {}
+        matched: Dict[str, List[str]] = {}
+        snapshot: Dict[str, Dict] = {}
+        original_filter = self.course_filter
+
+        def not_fetched(course):
+            if course['key'] in results:
+                return False
+            return original_filter is None or original_filter(course)
+
+        self.course_filter = not_fetched
         try:
-            start_process_time = time.time()  # 使用已導入的 time 模組
+            for n, keyword in enumerate(keywords, 1):
+                if self.stop_crawling:
+                    break
+                if self.events.wants(Log):
+                    self.events.log(f"\n===== 關鍵字 {n}/{len(keywords)}：{keyword} =====")
+                if n > 1 and not self.on_course_list and self.login_manager:
+                    # 上一個關鍵字中途停止時頁面狀態未知，回到首頁重新搜尋
+                    self.driver.get(self.login_manager.home_url)
+                self.search_text = keyword
+                self.courses = []
+
+                for course in self.process_all_courses():
+                    if course.get('stats'):
+                        results.setdefault(course['key'], course)
+                # self.courses 為本關鍵字符合狀態與日期條件的完整列表
+                for course in self.courses:
+                    matched.setdefault(course['key'], []).append(keyword)
+                snapshot.update((course['key'], course) for course in self.list_snapshot)
+        finally:
+            self.course_filter = original_filter
+            self.list_snapshot = list(snapshot.values())
+
+        courses = list(results.values())
+        for course in courses:
+            course['keywords'] = matched.get(course['key'], [])
+        if self.events.wants(Log):
+            self.events.log(f"\n{len(keywords)} 個關鍵字共擷取 {len(courses)} 門不重複的課程")
+        return courses
+
+    def _fetch_in_tabs(self, chunks: Iterable[List[Dict]], queued: List[Dict]) -> List[Dict]:
+        """
+        在同一個瀏覽器開啟多個分頁交錯擷取課程摘要：
+        各分頁發出導覽後不等待，輪詢哪個分頁先載入完成就先處理
+        待擷取的課程不足以填滿分頁時才在原本的分頁讀取下一段列表，與各分頁的載入同時進行
+        同時使用的分頁數依 AIMD 控制器的同時擷取數調整
+        Args:
+            chunks: 逐段產生的課程，例如 scan_course_list()（目前頁面需為課程列表）
+            queued: 已排入擷取的課程，取得每段時附加到此列表
+        Returns:
+            List[Dict]: 無法以分頁擷取、需改為逐一擷取的課程
+        """
+        fallback = []
+        pending = []        # (課程, 階段, 網址)
+        base_url = self.driver.current_url
+        chunks = iter(chunks)
+        scanning = True
+        done = 0            # 已完成（含直接取自快取）的課程數
+        fetched = 0         # 以分頁擷取完成的課程數
+        start_time = time.time()
+        pool = None
+        try:
+            while not self.stop_crawling:
+                while scanning and len(pending) < self.tabs:
+                    if pool:
+                        pool.switch_to_main()
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        scanning = False
+                        break
+                    queued.extend(chunk)
+                    cached = self._queue_tab_courses(chunk, pending, fallback, base_url)
+                    for course in cached:
+                        done += 1
+                        self.events.publish(CourseFinished(course, done, self._estimated_total(len(queued)),
+                                                           True, course['stats']))
+                total = self._estimated_total(len(queued))
+
+                if pool is None:
+                    if not pending:
+                        # 列表已讀完，所有課程都取自快取或需逐一擷取
+                        if done:
+                            self._report_tab_progress(done, total, start_time, 0)
+                        break
+                    if self.events.wants(Log):
+                        self.events.log(f"以 {self.tabs} 個分頁交錯擷取課程")
+                    pool = TabPool(self.driver, self.tabs)
+                if not scanning and not pending and not any(slot.busy for slot in pool.slots):
+                    break
+
+                progressed = False
+                active = sum(1 for slot in pool.slots if slot.busy)
+                for slot in pool.slots:
+                    if not slot.busy:
+                        if pending and active < self.rate_controller.concurrency:
+                            course, stage, url = pending.pop(0)
+                            self.rate_controller.acquire(sleep=self.cancel_token.sleep)
+                            slot.course, slot.stage, slot.started = course, stage, time.perf_counter()
+                            slot.summary_url = url if stage == 'summary' else None
+                            self.events.publish(CourseStarted(course, done + active + 1, total))
+                            pool.navigate(slot, url)
+                            active += 1
+                            progressed = True
+                        continue
+
+                    if not pool.is_ready(slot):
+                        if pool.is_timed_out(slot):
+                            self._finish_tab(pool, slot, None, fallback)
+                        continue
+
+                    progressed = True
+                    if slot.stage == 'course':
+                        # 課程頁面載入完成，接著在同一分頁載入課程摘要
+                        summary_url = self.driver.execute_script(SUMMARY_LINK_SCRIPT)
+                        if summary_url:
+                            slot.stage = 'summary'
+                            slot.summary_url = summary_url
+                            pool.navigate(slot, summary_url)
+                        else:
+                            self._finish_tab(pool, slot, None, fallback)
+                        continue
+
+                    with self.metrics.span('stats_extraction', course=slot.course['name']):
+                        slot.tables = self.driver.execute_script(
+                            TABLES_SCRIPT, SUMMARY_TABLE_SELECTOR, self.stats_extractor.table_keywords()
+                        ) or []
+                    stats = self.stats_extractor.extract(slot.tables) if slot.tables else None
+                    course = slot.course
+                    if self._finish_tab(pool, slot, stats, fallback):
+                        done += 1
+                        fetched += 1
+                        self.events.publish(CourseFinished(course, done, total, True, stats))
+                        # 列表尚未讀完時總數不確定，不估計剩餘時間
+                        self._report_tab_progress(done, total, start_time, 0 if scanning else fetched)
+
+                if not progressed:
+                    self.cancel_token.sleep(0.2)
+        finally:
+            if pool:
+                pool.close()
+            self.on_course_list = True
+        return fallback
+
+    def _queue_tab_courses(self, courses: List[Dict], pending: List, fallback: List[Dict],
+                           base_url: str) -> List[Dict]:
+        """
+        將一段課程排入分頁擷取：有快取的直接完成，其餘解析課程頁面網址（目前頁面需為課程列表）
+        Returns:
+            List[Dict]: 直接取自快取的課程
+        """
+        targets = None
+        # 列表取自網路回應時各列位置不一定遞增
+        first_row = min((course['row_idx'] for course in courses), default=0)
+        cached = []
+        for course in courses:
+            stats = self._cached_stats(course)
+            if stats is not None:
+                course['stats'] = stats
+                cached.append(course)
+                continue
+            summary_url = self.page_cache.get_link(course['key']) if self.page_cache else None
+            if summary_url:
+                pending.append((course, 'summary', summary_url))
+                continue
+            if targets is None:
+                # 只取回本段各列的「進入課程」按鈕
+                count = max(course['row_idx'] for course in courses) - first_row + 1
+                targets = self.driver.execute_script(
+                    ENTRY_TARGETS_SCRIPT, LIST_TABLE_SELECTOR, first_row, count
+                ) or []
+            idx = course['row_idx'] - first_row
+            url = entry_url(targets[idx] if idx < len(targets) else None, base_url)
+            if url:
+                pending.append((course, 'course', url))
+            else:
+                fallback.append(course)
+        return cached
+
+    def _finish_tab(self, pool: TabPool, slot, stats: Optional[Dict], fallback: List[Dict]) -> bool:
+        """結束分頁目前的課程，回報 AIMD 控制器並寫入快取；失敗的課程加入 fallback"""
+        course = slot.course
+        latency = time.perf_counter() - slot.started
+        if self.rate_controller.record(latency, stats is not None):
+            self._report_rate()
+        self.metrics.record('course', slot.started, latency, course=course['name'])
+
+        if stats is None:
+            fallback.append(course)
+        else:
+            course['stats'] = stats
+            self._archive_page('summary', course=course)
+            if self.page_cache and slot.summary_url and not self.stats_extractor.partial:
+                self._store_summary(course, slot.summary_url, slot.tables)
+        pool.release(slot)
+        return stats is not None
+
+    def _report_tab_progress(self, done: int, total: int, start_time: float, fetched: int) -> None:
+        """分頁模式的進度與剩餘時間（fetched 為本次以分頁擷取完成的數量）"""
+        self.events.publish(Progress(int(done / total * 100)))
+        if fetched:
+            self.events.publish(Eta((time.time() - start_time) / fetched * (total - done)))
+
+    def list_courses(self) -> List[Dict]:
+        """執行搜尋並取得符合條件的課程列表"""
+        if self.search_text and self.events.wants(Log):
+            self.events.log(f"搜尋關鍵字: {self.search_text}")
+        self._run_search()
+        courses = self.get_course_rows()
+        self._archive_page('list', search_text=self.search_text)
+        return courses
+
+    def fetch_course(self, course: Dict, next_course: Dict = None) -> Tuple[bool, Dict]:
+        """
+        進入課程擷取統計資料，連線中斷或登入逾期時自動恢復後重試
+        Args:
+            course: 課程（目前頁面需為課程列表）
+            next_course: 下一門要擷取的課程，提供時在背景分頁預先載入
+        """
+        stats = self._cached_stats(course)
+        if stats is not None:
+            # 取自快取時仍在課程列表，下一門照常在背景載入
+            if next_course:
+                self._start_prefetch(next_course)
+            return True, stats
+
+        # 已預先載入時直接讀取背景分頁，不需離開課程列表
+        stats = self._take_prefetched(course, next_course)
+        if stats is not None:
+            return True, stats
+        if next_course:
+            self._start_prefetch(next_course)
+            
+        success, stats = self._timed_enter_course(course)
+        if (not success or stats is None) and self._recover_session():
+            # 恢復後已回到相同的搜尋結果，重試本課程
+            success, stats = self._timed_enter_course(course)
             
+        if success and stats is not None:
+            self._archive_page('summary', course=course)
+            # 只取回部分表格時不寫入快取，以免之後需要全部統計時讀到不完整的資料
+            if self.page_cache and self.last_summary_url and not self.stats_extractor.partial:
+                self._store_summary(course, self.last_summary_url, self.last_tables)
+        return success, stats
+
+    def _start_prefetch(self, course: Dict) -> None:
+        """在背景分頁開始載入課程頁面（目前頁面需為課程列表，結束時仍在課程列表）"""
+        if self.page_cache and self.page_cache.get_link(course['key']):
+            # 有快取的課程不需載入頁面
+            return
+        if self.prefetcher is None:
+            try:
+                self.prefetcher = SummaryPrefetcher(self.driver)
+            except WebDriverException as e:
+                self.prefetch = False
+                if self.events.wants(Log):
+                    self.events.log(f"無法開啟預先載入的分頁，改為不預先載入：{str(e)}", 'warning')
+                return
+        if self.prefetcher.has(course):
+            return
+        self.prefetcher.pool.switch_to_main()
+        targets = self.driver.execute_script(
+            ENTRY_TARGETS_SCRIPT, LIST_TABLE_SELECTOR, course['row_idx'], 1
+        ) or []
+        url = entry_url(targets[0] if targets else None, self.driver.current_url)
+        if url:
+            self.rate_controller.acquire(sleep=self.cancel_token.sleep)
+            self.prefetcher.start(course, url)
+
+    def _take_prefetched(self, course: Dict, next_course: Dict = None) -> Optional[Dict]:
+        """
+        讀取背景分頁預先載入的課程摘要；讀取前先開始預先載入下一門，與解析同時進行
+        Returns:
+            Optional[Dict]: 統計資料，未預先載入或載入失敗時返回 None（應改為進入課程擷取）
+        """
+        if self.prefetcher is None or not self.prefetcher.has(course):
+            return None
+        with self.metrics.span('prefetch_wait', course=course['name']):
+            slot = self.prefetcher.wait(course, self.cancel_token.sleep)
+        if slot is None:
+            return None
+        latency = time.perf_counter() - slot.started
+        summary_url = slot.summary_url
+
+        if next_course:
+            self._start_prefetch(next_course)
+            self.prefetcher.activate(slot)
+        try:
+            with self.metrics.span('stats_extraction', course=course['name']):
+                tables = self.driver.execute_script(
+                    TABLES_SCRIPT, SUMMARY_TABLE_SELECTOR, self.stats_extractor.table_keywords()
+                ) or []
+            stats = self.stats_extractor.extract(tables) if tables else None
+            if stats is not None:
+                self._archive_page('summary', course=course)
+        finally:
+            self.prefetcher.release(slot)
+
+        if self.rate_controller.record(latency, stats is not None):
+            self._report_rate()
+        if stats is None:
+            return None
+        self.courses_since_recycle += 1
+        # 只取回部分表格時不寫入快取，以免之後需要全部統計時讀到不完整的資料
+        if self.page_cache and not self.stats_extractor.partial:
+            self._store_summary(course, summary_url, tables)
+        return stats
+
+    def _discard_prefetch(self) -> None:
+        """關閉預先載入的分頁，捨棄尚未使用的內容"""
+        if self.prefetcher is None:
+            return
+        try:
+            self.prefetcher.close()
+        except WebDriverException:
+            pass
+        self.prefetcher = None
+
+    def _archive_page(self, kind: str, course: Dict = None, **extra) -> None:
+        """將目前頁面寫入封存檔"""
+        if not self.archive:
+            return
+        try:
+            self.archive.record(kind, self.driver.current_url, self.driver.page_source, course=course, **extra)
+        except Exception as e:
+            if self.events.wants(Log):
+                self.events.log(f"保存頁面時發生錯誤: {str(e)}", 'warning')
+
+    def _store_summary(self, course: Dict, summary_url: str, tables: List) -> None:
+        """
+        將課程摘要表格寫入快取，並保存 ETag/Last-Modified，過期後才能以條件式請求確認
+        啟用網路擷取時取自頁面回應的標頭，否則另外送出 HEAD 請求
+        """
+        capture = self._network_capture()
+        headers = capture.find_headers(summary_url) if capture else None
+        with self.metrics.span('cache_validators', course=course['name']):
+            if headers is not None:
+                etag, last_modified = self.page_cache.validators(headers)
+            else:
+                try:
+                    cookies = self.driver.get_cookies()
+                    user_agent = self.driver.execute_script("return navigator.userAgent")
+                except WebDriverException:
+                    cookies = user_agent = None
+                etag, last_modified = self.page_cache.fetch_validators(summary_url, cookies, user_agent) \
+                    if cookies is not None else (None, None)
+        self.page_cache.put_link(course['key'], summary_url)
+        self.page_cache.put(summary_url, tables, etag, last_modified)
+
+    def _cached_stats(self, course: Dict) -> Optional[Dict]:
+        """從快取取得課程統計，過期時先向伺服器確認；無可用快取時返回 None"""
+        if not self.page_cache:
+            return None
+        url = self.page_cache.get_link(course['key'])
+        if not url:
+            return None
+            
+        with self.metrics.span('summary_cache', course=course['name']):
+            entry = self.page_cache.get(url)
+            if entry is not None and not entry['fresh']:
+                try:
+                    cookies = self.driver.get_cookies()
+                    user_agent = self.driver.execute_script("return navigator.userAgent")
+                except WebDriverException:
+                    return None
+                entry = self.page_cache.revalidate(url, entry, cookies, user_agent)
+            if entry is None:
+                return None
+            return self.stats_extractor.extract(entry['tables'])
+
+    def _timed_enter_course(self, course: Dict) -> Tuple[bool, Dict]:
+        """依速率限制進入課程，並將延遲與結果回報給 AIMD 控制器"""
+        self.rate_controller.acquire(sleep=self.cancel_token.sleep)
+        started = time.perf_counter()
+        success, stats = self.enter_course(course['row_idx'])
+        if self.rate_controller.record(time.perf_counter() - started, success and stats is not None):
+            self._report_rate()
+        return success, stats
+
+    def _report_rate(self) -> None:
+        """將目前的速率設定記錄到計時資料並通知介面"""
+        snapshot = self.rate_controller.snapshot()
+        self.metrics.record_value('concurrency', snapshot['concurrency'])
+        self.metrics.record_value('request_rate', snapshot['rate'])
+        if self.events.wants(RateChanged):
+            self.events.publish(RateChanged(snapshot['concurrency'], snapshot['rate'],
+                                            self.rate_controller.describe()))
+
+    def resume_course_list(self, has_more: bool = True) -> bool:
+        """
+        擷取完一門課程後返回課程列表，必要時恢復連線或重啟瀏覽器
+        Args:
+            has_more: 之後是否還有課程要處理（最後一門不需重啟瀏覽器）
+        Returns:
+            bool: 是否可以繼續處理下一門課程
+        """
+        # 資料取自快取或預先載入的分頁時沒有離開課程列表，但仍需檢查是否重啟瀏覽器
+        if not self.on_course_list:
+            if not self.back_to_course_list() and not self._recover_session():
+                if self.events.wants(Log):
+                    self.events.log("無法返回課程列表，停止處理", 'warning')
+                return False
+            self.courses_since_recycle += 1
+
+        if has_more and self._should_recycle_browser():
+            # 預先載入的分頁屬於要關閉的瀏覽器，先關閉並捨棄
+            self._discard_prefetch()
+            if not self._restart_browser('browser_recycle'):
+                if self.events.wants(Log):
+                    self.events.log("重啟瀏覽器失敗，停止處理", 'warning')
+                return False
+        return True
+
+    def reload_course_list(self) -> bool:
+        """重新開啟課程列表並搜尋，用於擷取失敗後回到已知的頁面狀態"""
+        try:
+            self.driver.get(self.login_manager.home_url)
+            self._run_search()
+            self.wait.until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ".table-responsive table"))
+            )
+            return True
+        except Exception:
+            return self._recover_session()
+
+    def _run_search(self) -> None:
+        """輸入搜尋條件並送出，等待課程列表載入"""
+        capture = self._network_capture()
+        if capture:
+            capture.clear()
+        with self.metrics.span('search', keyword=self.search_text or ''):
             # 處理搜尋條件
             if self.search_text:
-                self.progress.emit(f"搜尋關鍵字: {self.search_text}")
                 search_input = self.wait.until(
                     EC.presence_of_element_located((By.ID, "fullname"))
                 )
@@ -362,122 +905,94 @@ class CourseParser:
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "button.btn-primary.hidden-xs"))
             )
             search_button.click()
-            time.sleep(2)
-            
-            # 取得課程列表
-            courses = self.get_course_rows()
-            total_courses = len(courses)
+            self.cancel_token.sleep(2)
+            self.on_course_list = True
 
-            # 顯示開始處理的課程
-            if total_courses > 0:
-                self.progress.emit(f"\n將開始處理 {total_courses} 門符合條件的課程...")
-                self.progress.emit("------------------------")
-
-            if total_courses == 0:
-                self.progress.emit("未找到符合條件的課程")
-                return []
+    def _attach_driver(self, driver) -> None:
+        """改用新的瀏覽器驅動"""
+        self.driver = driver
+        self.wait = CancellableWait(driver, 30, self.cancel_token)
+        # 預先載入的分頁屬於舊的瀏覽器
+        self.prefetcher = None
 
-            # 開始處理每一門課程
-            self.progress.emit("\n開始擷取課程資料...")
-            
-            # 添加時間追蹤
-            start_time = time.time()
-            processed_times = []
-            
-            for idx, course in enumerate(courses, 1):
-                course_start_time = time.time()
-                
-                if self.stop_crawling:
-                    self.progress.emit("使用者停止爬蟲")
-                    break
-                    
-                # 計算進度百分比
-                progress_percent = int((idx - 1) / total_courses * 100)
-                
-                # 發送進度百分比
-                if hasattr(self, 'progress_percent'):
-                    self.progress_percent.emit(progress_percent)
-                
-                # 計算預估剩餘時間
-                elapsed_time = time.time() - start_time
-                if idx > 1:
-                    avg_time_per_course = elapsed_time / (idx - 1)
-                    remaining_courses = total_courses - (idx - 1)
-                    estimated_time_left = avg_time_per_course * remaining_courses
-                    
-                    # 格式化時間
-                    hours, remainder = divmod(estimated_time_left, 3600)
-                    minutes, seconds = divmod(remainder, 60)
-                    time_str = ""
-                    if hours > 0:
-                        time_str += f"{int(hours)}小時"
-                    if minutes > 0:
-                        time_str += f"{int(minutes)}分鐘"
-                    time_str += f"{int(seconds)}秒"
-                    
-                    # 發送剩餘時間
-                    if hasattr(self, 'time_remaining'):
-                        self.time_remaining.emit(time_str)
-                
-                # 修改日誌訊息，不再包含進度百分比和剩餘時間
-                self.progress.emit(f"正在處理：{course['name']}")
-                self.progress.emit(f"課程狀態：{course['status']}")
-                self.progress.emit(f"開課時間：{course['start_time']}")
-
-                success, stats = self.enter_course(course['row_idx'])
-                if success:
-                    course['stats'] = stats
-                    
-                    # 計算該課程的選修總人數
-                    if stats:
-                        total_enrolled = sum(stats['選修人數'].values())
-                        self.progress.emit(f"選修總人數：{total_enrolled} 人")
-                    
-                    if hasattr(self, 'data_ready'):
-                        self.data_ready.emit(courses[:idx])
-                    
-                    time.sleep(1)
+    def _should_recycle_browser(self) -> bool:
+        """檢查是否達到重啟瀏覽器的條件"""
+        if not self.login_manager:
+            return False
+        if self.recycle_every and self.courses_since_recycle >= self.recycle_every:
+            return True
+        if self.max_browser_memory_mb:
+            memory_mb = ProcessUtils.get_memory_mb(self.driver)
+            if memory_mb >= self.max_browser_memory_mb:
+                if self.events.wants(Log):
+                    self.events.log(f"瀏覽器記憶體使用 {memory_mb:.0f} MB，超過上限 {self.max_browser_memory_mb} MB", 'warning')
+                return True
+        return False
 
-                    if not self.back_to_course_list():
-                        self.progress.emit("無法返回課程列表，停止處理")
-                        return courses
-                    
-                    time.sleep(1)
-                    self.progress.emit("------------------------")  # 分隔線
-                    
-                    # 更新進度為當前課程完成的百分比
-                    progress_percent = int(idx / total_courses * 100)
-                    if hasattr(self, 'progress_percent'):
-                        self.progress_percent.emit(progress_percent)
-                    
-                    # 記錄課程處理時間
-                    course_elapsed = time.time() - course_start_time
-                    processed_times.append(course_elapsed)
-                    
-                else:
-                    self.progress.emit(f"無法擷取課程資料：{course['name']}")
-                    return courses
+    def _is_session_lost(self) -> bool:
+        """檢查瀏覽器是否已失去回應，或登入逾期被導回登入頁"""
+        try:
+            self.driver.current_url
+        except WebDriverException:
+            return True
+        return self.login_manager.is_login_page()
 
-            # 最終更新進度為100%
-            if hasattr(self, 'progress_percent'):
-                self.progress_percent.emit(100)
+    def _recover_session(self) -> bool:
+        """
+        瀏覽器崩潰或登入逾期時重新啟動並登入，回到原本的搜尋結果
+        Returns:
+            bool: 是否已恢復，可以繼續處理
+        """
+        if not self.login_manager or self.stop_crawling:
+            return False
+        if self.session_recoveries >= self.MAX_SESSION_RECOVERIES:
+            return False
+        if not self._is_session_lost():
+            return False
             
-            # 清除剩餘時間
-            if hasattr(self, 'time_remaining'):
-                self.time_remaining.emit("完成")
-                
-            self.progress.emit(f"\n資料擷取完成! 共處理 {total_courses} 門課程")
-            return courses
+        self.session_recoveries += 1
+        if self.events.wants(Log):
+            self.events.log(f"偵測到瀏覽器連線中斷或登入逾期，嘗試恢復（第 {self.session_recoveries} 次）...", 'warning')
+        return self._restart_browser('session_recovery')
 
+    def _restart_browser(self, phase: str) -> bool:
+        """
+        重啟瀏覽器並回到相同的搜尋結果
+        Args:
+            phase: 計時階段名稱（browser_recycle 或 session_recovery）
+        Returns:
+            bool: 是否成功回到課程列表
+        """
+        if phase == 'browser_recycle' and self.events.wants(Log):
+            self.events.log(f"已處理 {self.courses_since_recycle} 門課程，重新啟動瀏覽器...")
+        try:
+            with self.metrics.span(phase):
+                success, message = self.login_manager.restart_driver()
+                if not success:
+                    if self.events.wants(Log):
+                        self.events.log(f"重新啟動瀏覽器失敗：{message}", 'warning')
+                    return False
+                    
+                self._attach_driver(self.login_manager.get_driver())
+                self._run_search()
+                self.wait.until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, ".table-responsive table"))
+                )
+            self.courses_since_recycle = 0
+            if self.events.wants(Log):
+                self.events.log(f"瀏覽器已重新啟動（{message}）")
+            return True
         except Exception as e:
-            error_msg = f"處理課程列表時發生錯誤：{str(e)}"
-            print(error_msg)
-            if self.progress:
-                self.progress.emit(error_msg)
-            return []
+            if self.events.wants(Log):
+                self.events.log(f"重新啟動瀏覽器時發生錯誤: {str(e)}", 'warning')
+            return False
 
     def back_to_course_list(self) -> bool:
         """返回課程列表頁面"""
+        with self.metrics.span('return_to_list'):
+            return self._back_to_course_list()
+
+    def _back_to_course_list(self) -> bool:
         try:
             # 使用歷史返回保留搜尋狀態
             self.driver.execute_script("window.history.go(-2)")
@@ -486,6 +1001,7 @@ class CourseParser:
             self.wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, ".table-responsive table"))
             )
+            self.on_course_list = True
             
             # 確保表格已載入（可選，如果發現有時候會抓不到資料再加入）
             # self.wait.until(
@@ -494,6 +1010,6 @@ class CourseParser:
             
             return True
         except Exception as e:
-            if self.progress:
-                self.progress.emit(f"返回課程列表時發生錯誤: {str(e)}")
+            if self.events.wants(Log):
+                self.events.log(f"返回課程列表時發生錯誤: {str(e)}", 'warning')
             return False
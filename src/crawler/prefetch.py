@@ -0,0 +1,100 @@
+import time
+from typing import Callable, Dict, Optional
+
+from src.crawler.tab_pool import SUMMARY_LINK_SCRIPT, TabPool, TabSlot
+
+# 等待預先載入的頁面時的輪詢間隔（秒）
+POLL_INTERVAL = 0.1
+
+
+class SummaryPrefetcher:
+    """
+    在背景分頁預先載入下一門課程的課程摘要，讓目前課程擷取與解析期間網路和瀏覽器不會閒置
+    輪到該課程時直接讀取已載入的頁面；停止時關閉分頁，捨棄預先載入的內容
+    使用兩個分頁：一個保留輪到的課程供讀取，另一個同時載入下一門
+    """
+
+    def __init__(self, driver, page_timeout: float = 30):
+        """
+        Args:
+            driver: 已登入的 WebDriver，目前分頁需為課程列表
+            page_timeout: 單一頁面載入逾時秒數
+        """
+        self.driver = driver
+        self.pool = TabPool(driver, 2, page_timeout)
+
+    def _slot_of(self, course: Dict) -> Optional[TabSlot]:
+        for slot in self.pool.slots:
+            if slot.course is not None and slot.course['key'] == course['key']:
+                return slot
+        return None
+
+    def has(self, course: Dict) -> bool:
+        """是否已開始預先載入此課程"""
+        return self._slot_of(course) is not None
+
+    def start(self, course: Dict, url: str, stage: str = 'course') -> bool:
+        """
+        在空閒的分頁開始載入課程頁面（stage='course'）或課程摘要（stage='summary'），立即返回
+        Returns:
+            bool: 是否已開始（沒有空閒分頁時為 False）
+        """
+        slot = next((slot for slot in self.pool.slots if not slot.busy), None)
+        if slot is None:
+            return False
+        slot.course, slot.stage, slot.started = course, stage, time.perf_counter()
+        slot.summary_url = url if stage == 'summary' else None
+        self.pool.navigate(slot, url)
+        self.pool.switch_to_main()
+        return True
+
+    def _advance(self, slot: TabSlot) -> bool:
+        """
+        課程頁面載入完成後接著載入課程摘要（目前分頁需為 slot）
+        Returns:
+            bool: 是否找到課程摘要連結
+        """
+        summary_url = self.driver.execute_script(SUMMARY_LINK_SCRIPT)
+        if not summary_url:
+            return False
+        slot.stage = 'summary'
+        slot.summary_url = summary_url
+        self.pool.navigate(slot, summary_url)
+        return True
+
+    def wait(self, course: Dict, sleep: Callable[[float], None]) -> Optional[TabSlot]:
+        """
+        等待課程的課程摘要載入完成，完成時目前分頁切換到該分頁
+        Args:
+            course: 課程
+            sleep: 休眠函式（取消時應拋出例外）
+        Returns:
+            Optional[TabSlot]: 載入完成的分頁，未預先載入、逾時或找不到課程摘要時返回 None
+        """
+        slot = self._slot_of(course)
+        if slot is None:
+            return None
+        while True:
+            if self.pool.is_ready(slot):
+                if slot.stage == 'summary':
+                    return slot
+                if not self._advance(slot):
+                    self.release(slot)
+                    return None
+            elif self.pool.is_timed_out(slot):
+                self.release(slot)
+                return None
+            sleep(POLL_INTERVAL)
+
+    def activate(self, slot: TabSlot) -> None:
+        """切換到分頁，例如在 wait 之後開始預先載入其他課程，再回來讀取"""
+        self.driver.switch_to.window(slot.handle)
+
+    def release(self, slot: TabSlot) -> None:
+        """讀取完畢或放棄，分頁可供下一門課程使用，並切回課程列表"""
+        self.pool.release(slot)
+        self.pool.switch_to_main()
+
+    def close(self) -> None:
+        """關閉分頁，捨棄所有預先載入的內容"""
+        self.pool.close()
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+
+class TokenBucket:
+    """權杖桶限速器：平均每秒 rate 個請求，最多累積 capacity 個"""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def set_rate(self, rate: float) -> None:
+        """調整速率（已累積的權杖保留）"""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def acquire(self, tokens: float = 1, sleep=time.sleep) -> float:
+        """
+        取得權杖，不足時等待
+        Args:
+            tokens: 需要的權杖數
+            sleep: 等待使用的函式，可傳入 CancellationToken.sleep 讓等待可被取消
+        Returns:
+            float: 實際等待的秒數
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            sleep(delay)
+            waited += delay
+
+
+class AimdController:
+    """
+    以 AIMD（加法增加、乘法減少）調整同時擷取的課程數與請求速率
+    每收集 window 筆結果評估一次：有錯誤或延遲超過目標時減半，否則逐步增加
+    """
+
+    def __init__(self, min_concurrency: int = 1, max_concurrency: int = 4, min_rate: float = 0.1,
+                 max_rate: float = 4.0, initial_rate: float = 1.0, latency_target: float = 8.0,
+                 rate_step: float = 0.25, decrease_factor: float = 0.5, window: int = 5):
+        """
+        Args:
+            min_concurrency / max_concurrency: 同時擷取課程數的範圍
+            min_rate / max_rate: 每秒請求數的範圍
+            initial_rate: 初始每秒請求數
+            latency_target: 課程摘要載入時間的目標上限（秒）
+            rate_step: 每次增加的速率
+            decrease_factor: 發生錯誤或過慢時的縮減倍率
+            window: 每幾筆結果評估一次
+        """
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.latency_target = latency_target
+        self.rate_step = rate_step
+        self.decrease_factor = decrease_factor
+        self.window = window
+
+        self.concurrency = min_concurrency
+        self.bucket = TokenBucket(initial_rate)
+        self._samples = deque(maxlen=window)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    def acquire(self, sleep=time.sleep) -> float:
+        """發出請求前呼叫，依目前速率等待（sleep 同 TokenBucket.acquire）"""
+        return self.bucket.acquire(sleep=sleep)
+
+    def record(self, latency: float, ok: bool) -> bool:
+        """
+        回報一次擷取結果
+        Args:
+            latency: 擷取耗時（秒）
+            ok: 是否成功
+        Returns:
+            bool: 本次是否調整了設定
+        """
+        with self._lock:
+            self._samples.append((latency, ok))
+            self._pending += 1
+            if self._pending < self.window:
+                return False
+            self._pending = 0
+
+            errors = sum(1 for _, success in self._samples if not success)
+            latencies = sorted(latency for latency, _ in self._samples)
+            median = latencies[len(latencies) // 2]
+
+            if errors or median > self.latency_target:
+                concurrency = max(self.min_concurrency, int(self.concurrency * self.decrease_factor))
+                rate = max(self.min_rate, self.rate * self.decrease_factor)
+            else:
+                concurrency = min(self.max_concurrency, self.concurrency + 1)
+                rate = min(self.max_rate, self.rate + self.rate_step)
+
+            changed = concurrency != self.concurrency or rate != self.rate
+            self.concurrency = concurrency
+            self.bucket.set_rate(rate)
+            return changed
+
+    def snapshot(self) -> Dict[str, float]:
+        """目前的設定值"""
+        return {'concurrency': self.concurrency, 'rate': self.rate}
+
+    def describe(self) -> str:
+        """適合顯示於介面的文字"""
+        return f"同時擷取 {self.concurrency} 門，速率 {self.rate:.2f} 次/秒"
@@ -0,0 +1,81 @@
+import threading
+from typing import Callable, Dict
+
+from src.crawler.events import EventBus, ResourceSample
+from src.crawler.metrics import CrawlMetrics
+from src.utils.process_utils import ProcessUtils
+
+# 取樣間隔（秒）
+SAMPLE_INTERVAL = 2.0
+
+
+class ResourceMonitor:
+    """
+    在背景執行緒定期取樣瀏覽器行程樹（chromedriver 與 Chrome）的 CPU、記憶體與行程數
+    取樣結果以 ResourceSample 事件發布，並記錄到計時統計，可與各階段耗時對照
+    """
+
+    def __init__(self, get_driver: Callable, events: EventBus, metrics: CrawlMetrics = None,
+                 interval: float = SAMPLE_INTERVAL):
+        """
+        Args:
+            get_driver: 返回目前的 WebDriver（重啟瀏覽器後會更換），尚未啟動或已關閉時返回 None
+            events: 事件分派器
+            metrics: 計時記錄器，None 表示不記錄
+            interval: 取樣間隔（秒）
+        """
+        self.get_driver = get_driver
+        self.events = events
+        self.metrics = metrics
+        self.interval = interval
+        self._processes: Dict = {}     # pid -> psutil.Process，保留上次的行程才能計算 CPU 使用率
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='resource-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+    def _run(self) -> None:
+        # 第一次取樣只建立 CPU 使用率的基準，不發布
+        self._sample_safely()
+        while not self._stop.wait(self.interval):
+            event = self._sample_safely()
+            if event is None:
+                continue
+            if self.metrics:
+                self.metrics.record_value('browser_cpu_percent', round(event.cpu_percent, 1))
+                self.metrics.record_value('browser_rss_mb', round(event.rss_mb, 1))
+                self.metrics.record_value('browser_processes', event.processes)
+            if self.events.wants(ResourceSample):
+                self.events.publish(event)
+
+    def _sample_safely(self):
+        try:
+            return self.sample()
+        except Exception as e:
+            print(f"取樣瀏覽器資源時發生錯誤: {str(e)}")
+            return None
+
+    def sample(self):
+        """
+        取樣一次
+        Returns:
+            Optional[ResourceSample]: 瀏覽器未啟動或已結束時返回 None
+        """
+        driver = self.get_driver()
+        if driver is None:
+            self._processes.clear()
+            return None
+        cpu_percent, rss_mb, processes = ProcessUtils.sample_usage(driver, self._processes)
+        if not processes:
+            return None
+        return ResourceSample(cpu_percent, rss_mb, processes)
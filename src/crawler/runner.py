@@ -0,0 +1,74 @@
+from typing import Dict, List, Tuple
+
+from src.crawler.events import EventBus, TextSink
+from src.crawler.login import EwantLogin
+from src.crawler.metrics import CrawlMetrics
+from src.crawler.parser import CourseParser
+
+
+class ConsoleSignal:
+    """以 print 取代 Qt 信號，供無介面執行時輸出進度"""
+
+    def emit(self, *args):
+        print(*args, flush=True)
+
+
+def create_session(username: str, password: str, progress=None, metrics: CrawlMetrics = None,
+                   events: EventBus = None, capture_network: bool = False,
+                   **parser_options) -> Tuple[EwantLogin, CourseParser]:
+    """
+    登入並建立不依賴 GUI 的 CourseParser，呼叫端負責 login_manager.close()
+    Args:
+        username: 使用者名稱
+        password: 密碼
+        progress: 具有 emit(str) 的進度輸出物件，預設輸出到主控台
+        metrics: 計時記錄器
+        events: CourseParser 的事件分派器，預設將事件轉為文字輸出到 progress
+        capture_network: 是否從網路回應直接解析資料（找不到時改讀頁面）
+        parser_options: 傳給 CourseParser 的其餘參數（search_text、status_filters 等）
+    Returns:
+        Tuple[EwantLogin, CourseParser]
+    """
+    progress = progress or ConsoleSignal()
+    metrics = metrics or CrawlMetrics()
+    if events is None:
+        events = EventBus()
+        TextSink(progress.emit).attach(events)
+    login_manager = EwantLogin(headless=True, metrics=metrics, capture_network=capture_network)
+    try:
+        progress.emit("開始登入...")
+        success, message = login_manager.login(username, password)
+        if not success:
+            raise RuntimeError(f"登入失敗：{message}")
+    except BaseException:
+        login_manager.close()
+        raise
+
+    parser = CourseParser(
+        login_manager.get_driver(),
+        events=events,
+        metrics=metrics,
+        login_manager=login_manager,
+        **parser_options
+    )
+    return login_manager, parser
+
+
+def run_headless_crawl(username: str, password: str, progress=None, metrics: CrawlMetrics = None,
+                       **parser_options) -> List[Dict]:
+    """
+    不透過 GUI 執行一次完整的登入與爬取，參數同 create_session
+    Returns:
+        List[Dict]: 爬取到的課程資料
+    """
+    from src.crawler.resource_monitor import ResourceMonitor
+
+    login_manager, parser = create_session(username, password, progress, metrics, **parser_options)
+    # 瀏覽器資源使用量記錄到計時統計
+    monitor = ResourceMonitor(login_manager.get_driver, parser.events, parser.metrics)
+    monitor.start()
+    try:
+        return parser.process_all_courses()
+    finally:
+        monitor.stop()
+        login_manager.close()
@@ -0,0 +1,252 @@
+import json
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from src.crawler.metrics import CrawlMetrics
+from src.crawler.runner import ConsoleSignal, run_headless_crawl
+
+
+class RefreshScheduler:
+    """依課程變動頻率調整各課程重新爬取間隔的常駐排程器"""
+
+    # 各課程狀態的初始重新爬取間隔（秒）
+    INITIAL_INTERVALS = {
+        '開課中': 3600,
+        '即將開課': 12 * 3600,
+        '已結束': 24 * 3600,
+    }
+    DEFAULT_INTERVAL = 6 * 3600
+    MIN_INTERVAL = 15 * 60
+    MAX_INTERVAL = 7 * 24 * 3600
+    # 資料有變動時縮短間隔、沒有變動時拉長間隔的倍率
+    SHRINK_FACTOR = 0.5
+    GROW_FACTOR = 1.5
+    # 變動率（指數移動平均）中最新一次結果的權重
+    CHANGE_RATE_WEIGHT = 0.3
+    # 即使沒有課程到期，也定期掃描列表以發現新課程（秒）
+    DISCOVERY_INTERVAL = 3600
+    # 爬取失敗後的重試等待時間（秒）
+    RETRY_DELAY = 5 * 60
+
+    def __init__(self, db_path: str, username: str, password: str, search_text: str = None,
+                 status_filters: List[str] = None, progress=None):
+        """
+        Args:
+            db_path: 儲存各課程爬取狀態的 SQLite 檔案
+            username: 使用者名稱
+            password: 密碼
+            search_text: 搜尋關鍵字
+            status_filters: 納入排程的課程狀態，預設為全部狀態
+            progress: 具有 emit(str) 的進度輸出物件
+        """
+        self.username = username
+        self.password = password
+        self.search_text = search_text
+        self.status_filters = status_filters or list(self.INITIAL_INTERVALS)
+        self.progress = progress or ConsoleSignal()
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self._init_db()
+        self._cycle_time = time.time()
+        self._listed = set()    # 本輪列表中符合條件的課程
+        self._due = set()       # 本輪列表中已到期、排入爬取的課程
+
+    def _init_db(self) -> None:
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS course_state (
+                key TEXT PRIMARY KEY,
+                name TEXT,
+                status TEXT,
+                start_time TEXT,
+                end_time TEXT,
+                last_crawled REAL,
+                next_due REAL,
+                interval REAL,
+                change_rate REAL DEFAULT 0,
+                stats TEXT,
+                stale INTEGER DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_course_state_next_due ON course_state(next_due);
+            CREATE TABLE IF NOT EXISTS scheduler_meta (
+                name TEXT PRIMARY KEY,
+                value REAL
+            );
+        """)
+        # 舊版資料庫沒有 stale 欄位
+        columns = [row['name'] for row in self.conn.execute("PRAGMA table_info(course_state)")]
+        if 'stale' not in columns:
+            self.conn.execute("ALTER TABLE course_state ADD COLUMN stale INTEGER DEFAULT 0")
+        self.conn.commit()
+
+    def _get_meta(self, name: str, default: float = 0) -> float:
+        row = self.conn.execute("SELECT value FROM scheduler_meta WHERE name = ?", (name,)).fetchone()
+        return row['value'] if row else default
+
+    def _set_meta(self, name: str, value: float) -> None:
+        self.conn.execute(
+            "INSERT INTO scheduler_meta(name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+            (name, value)
+        )
+        self.conn.commit()
+
+    def _clamp(self, interval: float) -> float:
+        return max(self.MIN_INTERVAL, min(self.MAX_INTERVAL, interval))
+
+    def get_state(self, key: str) -> Optional[sqlite3.Row]:
+        """取得課程的排程狀態"""
+        return self.conn.execute("SELECT * FROM course_state WHERE key = ?", (key,)).fetchone()
+
+    def is_due(self, course: Dict) -> bool:
+        """課程是否已到重新爬取時間（新課程一律視為到期）"""
+        self._listed.add(course['key'])
+        state = self.get_state(course['key'])
+        # 狀態改變（例如即將開課 -> 開課中）時立即重新爬取
+        due = state is None or state['status'] != course['status'] or state['next_due'] <= self._cycle_time
+        if due:
+            self._due.add(course['key'])
+        return due
+
+    def record(self, course: Dict, crawled_at: float) -> None:
+        """依本次結果與上次比較，更新變動率與下次爬取時間"""
+        state = self.get_state(course['key'])
+        stats_json = json.dumps(course['stats'], ensure_ascii=False, sort_keys=True)
+        initial = self.INITIAL_INTERVALS.get(course['status'], self.DEFAULT_INTERVAL)
+
+        if state is None or state['status'] != course['status']:
+            interval = initial
+            change_rate = state['change_rate'] if state else 0
+        else:
+            changed = state['stats'] != stats_json
+            factor = self.SHRINK_FACTOR if changed else self.GROW_FACTOR
+            interval = self._clamp(state['interval'] * factor)
+            change_rate = (1 - self.CHANGE_RATE_WEIGHT) * state['change_rate'] + \
+                self.CHANGE_RATE_WEIGHT * (1 if changed else 0)
+
+        self.conn.execute("""
+            INSERT INTO course_state(key, name, status, start_time, end_time,
+                                     last_crawled, next_due, interval, change_rate, stats, stale)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+            ON CONFLICT(key) DO UPDATE SET
+                name = excluded.name, status = excluded.status,
+                start_time = excluded.start_time, end_time = excluded.end_time,
+                last_crawled = excluded.last_crawled, next_due = excluded.next_due,
+                interval = excluded.interval, change_rate = excluded.change_rate,
+                stats = excluded.stats, stale = 0
+        """, (course['key'], course['name'], course['status'], course['start_time'], course['end_time'],
+              crawled_at, crawled_at + interval, interval, change_rate, stats_json))
+        self.conn.commit()
+
+    def postpone(self, key: str, now: float) -> None:
+        """爬取失敗的課程延後重試，避免每輪都卡在同一門課"""
+        self.conn.execute(
+            "UPDATE course_state SET next_due = ? WHERE key = ?",
+            (now + self.RETRY_DELAY, key)
+        )
+        self.conn.commit()
+
+    def postpone_due(self, now: float) -> None:
+        """無法取得課程列表時，所有已到期的課程延後重試"""
+        self.conn.execute(
+            "UPDATE course_state SET next_due = ? WHERE stale = 0 AND next_due <= ?",
+            (now + self.RETRY_DELAY, now)
+        )
+        self.conn.commit()
+
+    def mark_unlisted(self, listed_keys) -> int:
+        """
+        將已到期、但本輪列表中沒有出現的課程（已改名、下架或不符合搜尋與狀態條件）標為過時
+        過時的課程不再決定下一次執行時間，只在定期掃描列表時重新出現後恢復
+        Returns:
+            int: 標為過時的課程數
+        """
+        due_keys = [row['key'] for row in self.conn.execute(
+            "SELECT key FROM course_state WHERE stale = 0 AND next_due <= ?", (self._cycle_time,)
+        )]
+        stale_keys = [(key,) for key in due_keys if key not in listed_keys]
+        self.conn.executemany("UPDATE course_state SET stale = 1 WHERE key = ?", stale_keys)
+        self.conn.commit()
+        return len(stale_keys)
+
+    def next_wakeup(self) -> float:
+        """下一次需要執行的時間點"""
+        row = self.conn.execute("SELECT MIN(next_due) AS due FROM course_state WHERE stale = 0").fetchone()
+        discovery_due = self._get_meta('last_discovery') + self.DISCOVERY_INTERVAL
+        if row['due'] is None:
+            return discovery_due
+        return min(row['due'], discovery_due)
+
+    def run_once(self) -> int:
+        """
+        執行一輪爬取，只進入已到期或新出現的課程
+        Returns:
+            int: 本輪成功更新的課程數
+        """
+        self._cycle_time = time.time()
+        self._listed = set()
+        self._due = set()
+        metrics = CrawlMetrics()
+        courses = run_headless_crawl(
+            self.username,
+            self.password,
+            progress=self.progress,
+            metrics=metrics,
+            search_text=self.search_text,
+            status_filters=self.status_filters,
+            course_filter=self.is_due
+        )
+
+        updated = 0
+        now = time.time()
+        fetched = set()
+        for course in courses:
+            if course.get('stats'):
+                self.record(course, now)
+                fetched.add(course['key'])
+                updated += 1
+
+        if not self._listed:
+            # 登入或讀取列表失敗：不能據此判斷課程已下架，到期的課程與定期掃描都稍後重試
+            self.postpone_due(now)
+            self._set_meta('last_discovery', now - self.DISCOVERY_INTERVAL + self.RETRY_DELAY)
+            self.progress.emit("未取得課程列表，稍後重試")
+            return 0
+
+        # 排入爬取但沒有取得資料的課程（失敗或停止後未處理）延後重試，避免每輪都卡在同一門課
+        for key in self._due - fetched:
+            self.postpone(key, now)
+
+        # 沒有出現在列表中的到期課程不會被更新，不標記的話下一次執行時間會一直停在過去
+        stale = self.mark_unlisted(self._listed)
+        self._set_meta('last_discovery', self._cycle_time)
+        self.progress.emit(f"本輪更新 {updated} 門課程")
+        if stale:
+            self.progress.emit(f"{stale} 門已到期的課程未出現在列表中，暫停排程直到再次出現")
+        return updated
+
+    def run_forever(self, max_sleep: float = 300) -> None:
+        """
+        常駐執行，直到收到 KeyboardInterrupt
+        Args:
+            max_sleep: 單次休眠的最長秒數，讓排程能定期重新檢查
+        """
+        self.progress.emit("排程器已啟動")
+        try:
+            while True:
+                now = time.time()
+                if self.next_wakeup() <= now:
+                    try:
+                        self.run_once()
+                    except Exception as e:
+                        self.progress.emit(f"排程爬取時發生錯誤：{str(e)}")
+                        # 失敗時等待一段時間再重試，避免連續重試
+                        time.sleep(self.RETRY_DELAY)
+                        continue
+
+                sleep_time = min(max_sleep, max(1, self.next_wakeup() - time.time()))
+                time.sleep(sleep_time)
+        except KeyboardInterrupt:
+            self.progress.emit("排程器已停止")
+        finally:
+            self.conn.close()
@@ -0,0 +1,103 @@
+import os
+import socket
+import time
+from typing import Dict, List
+
+from src.crawler.runner import ConsoleSignal, create_session
+from src.crawler.work_queue import WorkQueue
+
+
+def default_worker_id() -> str:
+    """以主機名稱與行程編號識別 worker"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def publish_job(queue: WorkQueue, job_id: str, username: str, password: str,
+                search_text: str = None, status_filters: List[str] = None, progress=None) -> int:
+    """
+    由協調者登入並掃描課程列表，將符合條件的課程發布為工作項目
+    Returns:
+        int: 新發布的項目數
+    """
+    progress = progress or ConsoleSignal()
+    options = {'search_text': search_text, 'status_filters': status_filters}
+    login_manager, parser = create_session(username, password, progress, **options)
+    try:
+        courses = parser.list_courses()
+    finally:
+        login_manager.close()
+
+    added = queue.publish(job_id, courses, options)
+    progress.emit(f"工作 {job_id} 已發布 {added} 門課程")
+    return added
+
+
+def run_worker(queue: WorkQueue, job_id: str, username: str, password: str,
+               worker_id: str = None, progress=None) -> int:
+    """
+    以獨立登入的瀏覽器持續領取並處理工作項目，直到佇列中沒有可領取的項目
+    Returns:
+        int: 此 worker 完成的項目數
+    """
+    progress = progress or ConsoleSignal()
+    worker_id = worker_id or default_worker_id()
+    options = queue.get_options(job_id)
+    if options is None:
+        raise RuntimeError(f"找不到工作：{job_id}")
+
+    login_manager, parser = create_session(username, password, progress, **options)
+    completed = 0
+    try:
+        # 以本節點的搜尋結果重新對應列表位置，不依賴協調者的 row_idx
+        row_index = {course['key']: course['row_idx'] for course in parser.list_courses()}
+
+        while True:
+            item = queue.claim(job_id, worker_id)
+            if item is None:
+                break
+
+            course = item['course']
+            if course['key'] not in row_index:
+                queue.fail(item['id'], worker_id, "課程不在本節點的搜尋結果中")
+                continue
+            course['row_idx'] = row_index[course['key']]
+
+            progress.emit(f"[{worker_id}] 正在處理：{course['name']}")
+            success, stats = parser.fetch_course(course)
+            if success and stats is not None:
+                if queue.complete(item['id'], worker_id, stats):
+                    completed += 1
+                if not parser.resume_course_list():
+                    break
+            else:
+                queue.fail(item['id'], worker_id, "無法擷取課程資料")
+                if not parser.reload_course_list():
+                    break
+    finally:
+        login_manager.close()
+
+    progress.emit(f"[{worker_id}] 完成 {completed} 門課程")
+    return completed
+
+
+def collect_results(queue: WorkQueue, job_id: str, wait: bool = True, poll_interval: float = 10,
+                    progress=None) -> List[Dict]:
+    """
+    合併所有 worker 的結果
+    Args:
+        wait: 是否等待所有項目完成（租約逾時的項目會由其他 worker 重新處理）
+        poll_interval: 等待時的檢查間隔（秒）
+    Returns:
+        List[Dict]: 依發布順序排列的課程資料
+    """
+    progress = progress or ConsoleSignal()
+    while wait and not queue.is_finished(job_id):
+        counts = queue.counts(job_id)
+        progress.emit(f"等待中：完成 {counts.get('done', 0)}，處理中 {counts.get('leased', 0)}，"
+                      f"待處理 {counts.get('pending', 0)}")
+        time.sleep(poll_interval)
+
+    counts = queue.counts(job_id)
+    if counts.get('failed'):
+        progress.emit(f"有 {counts['failed']} 門課程多次擷取失敗")
+    return queue.results(job_id)
@@ -0,0 +1,204 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 課程摘要中的地區欄位
+REGIONS = ("台灣", "中國大陸", "其他")
+
+# 一次取回課程摘要頁所有表格的儲存格文字：[表格][列][儲存格]
+# arguments[1] 為關鍵字清單時，只取回內容包含任一關鍵字的表格
+TABLES_SCRIPT = """
+var keywords = arguments[1];
+return Array.from(document.querySelectorAll(arguments[0])).filter(function (table) {
+    if (!keywords) { return true; }
+    var text = table.textContent;
+    return keywords.some(function (keyword) { return text.indexOf(keyword) >= 0; });
+}).map(function (table) {
+    return Array.from(table.querySelectorAll('tr')).map(function (row) {
+        return Array.from(row.querySelectorAll('td')).map(function (cell) {
+            return (cell.innerText || '').trim();
+        });
+    });
+});
+"""
+
+# 課程摘要頁中需要擷取的表格
+SUMMARY_TABLE_SELECTOR = "section.panel .table-responsive table, table.table"
+
+
+def parse_number(text: str) -> int:
+    """解析數字文字"""
+    try:
+        # 移除所有非數字字元
+        number = ''.join(filter(str.isdigit, text))
+        return int(number) if number else 0
+    except:
+        return 0
+
+
+class StatField:
+    """統計欄位定義：標籤需包含 include 全部文字且不含 exclude 任一文字"""
+
+    def __init__(self, key: str, include: Sequence[str], exclude: Sequence[str] = (),
+                 kind: str = 'region', default=0):
+        """
+        Args:
+            key: 輸出的統計名稱
+            include: 標籤必須包含的文字
+            exclude: 標籤不可包含的文字
+            kind: 'region' 依地區拆分，'scalar' 為單一數值
+            default: scalar 欄位找不到時的預設值
+        """
+        self.key = key
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.kind = kind
+        self.default = default
+
+    def matches(self, label: str) -> bool:
+        return all(text in label for text in self.include) and \
+            not any(text in label for text in self.exclude)
+
+    def empty_value(self):
+        if self.kind == 'region':
+            return {region: 0 for region in REGIONS}
+        return self.default
+
+
+# 課程摘要統計欄位，順序即比對優先順序
+STATS_SCHEMA = [
+    StatField('選修人數', include=('選修人數',)),
+    StatField('通過人數', include=('通過人數',)),
+    StatField('影片瀏覽次數', include=('影片瀏覽次數',), exclude=('行動載具',)),
+    StatField('作業測驗作答次數', include=('作業測驗作答次數',)),
+    StatField('講義參考資料瀏覽次數', include=('講義', '參考資料', '瀏覽次數')),
+    StatField('講義參考資料瀏覽人數', include=('講義', '參考資料', '瀏覽人數')),
+    StatField('討論次數', include=('討論次數',), exclude=('人數',), kind='scalar'),
+    StatField('使用行動載具瀏覽影片次數', include=('使用行動載具瀏覽影片次數',), kind='scalar', default='N/A'),
+]
+
+# 表格與匯出檔案中統計欄位的顯示順序
+METRIC_ORDER = (
+    '選修人數', '通過人數', '影片瀏覽次數', '作業測驗作答次數',
+    '講義參考資料瀏覽人數', '講義參考資料瀏覽次數', '討論次數', '使用行動載具瀏覽影片次數',
+)
+
+
+def parse_metric_keys(text: Optional[str]) -> Optional[List[str]]:
+    """
+    解析以逗號分隔的統計名稱
+    Returns:
+        Optional[List[str]]: 統計名稱（依顯示順序），未指定時返回 None 表示全部
+    Raises:
+        ValueError: 包含不存在的統計名稱
+    """
+    keys = [key.strip() for key in (text or '').replace('，', ',').split(',') if key.strip()]
+    if not keys:
+        return None
+    unknown = [key for key in keys if key not in METRIC_ORDER]
+    if unknown:
+        raise ValueError(f"不支援的統計欄位：{'、'.join(unknown)}（可用：{'、'.join(METRIC_ORDER)}）")
+    return [key for key in METRIC_ORDER if key in keys]
+
+
+def stat_columns(keys: Optional[Sequence[str]] = None) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    統計欄位展開後的表格欄位
+    Args:
+        keys: 要顯示的統計名稱，None 表示全部
+    Returns:
+        List[Tuple]: (欄位標題, 統計名稱, 地區)，不分地區的欄位地區為 None
+    """
+    kinds = {field.key: field.kind for field in STATS_SCHEMA}
+    columns = []
+    for key in METRIC_ORDER:
+        if keys is not None and key not in keys:
+            continue
+        if kinds[key] == 'region':
+            columns.extend((f"{key}({region})", key, region) for region in REGIONS)
+        else:
+            columns.append((key, key, None))
+    return columns
+
+
+def stat_value(stats: Dict, key: str, region: Optional[str]):
+    """取出 stat_columns 欄位對應的數值，缺少時返回 None"""
+    value = stats.get(key)
+    if region is None or value is None:
+        return value
+    return value.get(region, 0)
+
+
+class StatsExtractor:
+    """依 schema 從表格資料單次掃描擷取統計"""
+
+    def __init__(self, schema: Iterable[StatField] = None, keys: Optional[Sequence[str]] = None):
+        """
+        Args:
+            schema: 統計欄位定義，預設為 STATS_SCHEMA
+            keys: 只擷取這些統計，None 表示全部；其他欄位仍用於辨識表格列的歸屬，但不記錄數值
+        """
+        self.fields: List[StatField] = list(schema if schema is not None else STATS_SCHEMA)
+        self.selected = [field for field in self.fields if keys is None or field.key in keys]
+        # 只擷取部分統計時，頁面快取不可保存（表格資料不完整）
+        self.partial = len(self.selected) < len(self.fields)
+        # 標籤文字 -> 欄位 的快取，相同標籤只比對一次
+        self._label_cache: Dict[str, Optional[StatField]] = {}
+
+    def table_keywords(self) -> Optional[List[str]]:
+        """只擷取部分統計時，頁面上需要取回的表格所包含的關鍵字；全部擷取時返回 None"""
+        if not self.partial:
+            return None
+        return [field.include[0] for field in self.selected]
+
+    def match(self, label: str) -> Optional[StatField]:
+        """找出標籤對應的欄位"""
+        try:
+            return self._label_cache[label]
+        except KeyError:
+            field = next((f for f in self.fields if f.matches(label)), None)
+            self._label_cache[label] = field
+            return field
+
+    def empty_stats(self) -> Dict:
+        """建立預設值的統計結構"""
+        return {field.key: field.empty_value() for field in self.selected}
+
+    def extract(self, tables: Sequence[Sequence[Sequence[str]]]) -> Dict:
+        """
+        擷取統計資料
+        Args:
+            tables: [表格][列][儲存格文字] 的巢狀串列
+        Returns:
+            Dict: 統計名稱 -> 地區數值字典或單一數值
+        """
+        stats = self.empty_stats()
+
+        for rows in tables:
+            current: Optional[StatField] = None
+
+            for cells in rows:
+                # 跳過空行；單一儲存格的列只可能是類型標題
+                if not cells:
+                    continue
+                if len(cells) == 1:
+                    current = self.match(cells[0]) or current
+                    continue
+
+                if len(cells) >= 3:
+                    # 類型, 地區, 數值（類型欄位以 rowspan 延續到後續列）
+                    current = self.match(cells[0])
+                    region, value = cells[-2], cells[-1]
+                else:
+                    field = self.match(cells[0])
+                    if field and field.kind == 'scalar':
+                        if field.key in stats:
+                            stats[field.key] = parse_number(cells[1])
+                        continue
+                    if field:
+                        current = field
+                        continue
+                    region, value = cells[0], cells[1]
+
+                if current and current.kind == 'region' and region in REGIONS and current.key in stats:
+                    stats[current.key][region] = parse_number(value)
+
+        return stats
@@ -0,0 +1,126 @@
+import re
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+# 取得課程列表每一列「進入課程」按鈕的 onclick
+# arguments[1]、arguments[2] 為起始列與列數（可省略）
+ENTRY_TARGETS_SCRIPT = """
+var table = document.querySelector(arguments[0]);
+if (!table) { return []; }
+var start = arguments[1] || 0;
+var rows = Array.from(table.querySelectorAll('tbody tr'));
+rows = arguments[2] ? rows.slice(start, start + arguments[2]) : rows.slice(start);
+return rows.map(function (row) {
+    var button = row.querySelector("input.btn.btn-primary[type='button'][value='進入課程']");
+    if (!button) { return null; }
+    return {onclick: button.getAttribute('onclick') || ''};
+});
+"""
+
+# 在課程頁面取得「課程摘要」連結
+SUMMARY_LINK_SCRIPT = """
+var links = Array.from(document.querySelectorAll('a'));
+for (var i = 0; i < links.length; i++) {
+    if (links[i].textContent.trim() === '課程摘要') { return links[i].href; }
+}
+return null;
+"""
+
+# 不等待頁面載入完成的導覽：標記舊頁面後直接改變網址，新頁面不會帶有標記
+NAVIGATE_SCRIPT = "window.__tabPending = true; window.location.href = arguments[0];"
+READY_SCRIPT = "return !window.__tabPending && document.readyState === 'complete';"
+
+_ONCLICK_URL = re.compile(r"""(?:location(?:\.href)?\s*=|window\.open\(|location\.assign\()\s*['"]([^'"]+)['"]""")
+
+
+def entry_url(target: Optional[Dict], base_url: str) -> Optional[str]:
+    """
+    從「進入課程」按鈕的 onclick 解析課程頁面網址，無法解析時返回 None（改為在課程列表點擊按鈕）
+    表單的 action 可能需要 POST 及表單欄位，不當作可直接開啟的網址
+    """
+    if not target:
+        return None
+    match = _ONCLICK_URL.search(target.get('onclick') or '')
+    if match:
+        return urljoin(base_url, match.group(1))
+    return None
+
+
+class TabSlot:
+    """一個分頁目前負責的課程與進度"""
+
+    def __init__(self, handle: str):
+        self.handle = handle
+        self.course = None
+        self.stage = None           # 'course'：載入課程頁面，'summary'：載入課程摘要
+        self.started = 0.0          # 本課程開始的時間（perf_counter）
+        self.deadline = 0.0         # 目前頁面的逾時時間（monotonic）
+        self.summary_url = None
+        self.tables = None
+
+    @property
+    def busy(self) -> bool:
+        return self.course is not None
+
+
+class TabPool:
+    """
+    在同一個已登入的瀏覽器中開啟多個分頁，各分頁共用登入狀態
+    導覽以 JavaScript 發出、不等待載入完成，再輪詢哪個分頁先載入完成
+    """
+
+    def __init__(self, driver, size: int, page_timeout: float = 30):
+        """
+        Args:
+            driver: 已登入的 WebDriver
+            size: 分頁數
+            page_timeout: 單一頁面載入逾時秒數
+        """
+        self.driver = driver
+        self.page_timeout = page_timeout
+        self.main_handle = driver.current_window_handle
+        self.slots: List[TabSlot] = []
+        for _ in range(size):
+            driver.switch_to.new_window('tab')
+            self.slots.append(TabSlot(driver.current_window_handle))
+        driver.switch_to.window(self.main_handle)
+
+    def navigate(self, slot: TabSlot, url: str) -> None:
+        """在分頁中開始載入網址（立即返回）"""
+        self.driver.switch_to.window(slot.handle)
+        self.driver.execute_script(NAVIGATE_SCRIPT, url)
+        slot.deadline = time.monotonic() + self.page_timeout
+
+    def is_ready(self, slot: TabSlot) -> bool:
+        """分頁是否已載入完成"""
+        self.driver.switch_to.window(slot.handle)
+        try:
+            return bool(self.driver.execute_script(READY_SCRIPT))
+        except Exception:
+            # 頁面切換中執行腳本可能失敗，視為尚未完成
+            return False
+
+    def switch_to_main(self) -> None:
+        """切回原本的分頁（課程列表）"""
+        self.driver.switch_to.window(self.main_handle)
+
+    def is_timed_out(self, slot: TabSlot) -> bool:
+        return time.monotonic() > slot.deadline
+
+    def release(self, slot: TabSlot) -> None:
+        slot.course = None
+        slot.stage = None
+        slot.summary_url = None
+        slot.tables = None
+
+    def close(self) -> None:
+        """關閉所有分頁並切回原本的分頁"""
+        for slot in self.slots:
+            try:
+                self.driver.switch_to.window(slot.handle)
+                self.driver.close()
+            except Exception:
+                pass
+        self.slots = []
+        self.driver.switch_to.window(self.main_handle)
@@ -0,0 +1,164 @@
+import json
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+
+class WorkQueue:
+    """
+    以 SQLite 檔案實作的共用工作佇列
+    檔案可放在多台機器都能存取的共用資料夾；工作項目以租約方式分派，
+    租約逾時（例如 worker 當機）的項目會被其他 worker 重新領取
+    """
+
+    DEFAULT_LEASE_SECONDS = 600
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, db_path: str, lease_seconds: int = DEFAULT_LEASE_SECONDS):
+        """
+        Args:
+            db_path: 佇列資料庫路徑
+            lease_seconds: 領取後多久未完成視為 worker 已失效
+        """
+        self.lease_seconds = lease_seconds
+        # 共用資料夾上不使用 WAL，並以較長的 timeout 等待其他節點釋放鎖定
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                options TEXT,
+                created_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT,
+                key TEXT,
+                payload TEXT,
+                state TEXT DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                updated_at REAL,
+                UNIQUE(job_id, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_items_job_state ON items(job_id, state);
+        """)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def publish(self, job_id: str, courses: List[Dict], options: Dict = None) -> int:
+        """
+        建立工作並發布課程項目（同一工作重複發布的課程會被忽略）
+        Args:
+            job_id: 工作識別碼
+            courses: get_course_rows() 取得的課程
+            options: worker 重現搜尋所需的參數（search_text、status_filters）
+        Returns:
+            int: 新增的項目數
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO jobs(job_id, options, created_at) VALUES (?, ?, ?)",
+                (job_id, json.dumps(options or {}, ensure_ascii=False), now)
+            )
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO items(job_id, key, payload, updated_at) VALUES (?, ?, ?, ?)",
+                [(job_id, course['key'], json.dumps(course, ensure_ascii=False), now) for course in courses]
+            )
+            added = self.conn.total_changes - before
+            self.conn.execute("COMMIT")
+            return added
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def get_options(self, job_id: str) -> Optional[Dict]:
+        """取得工作的搜尋參數，工作不存在時返回 None"""
+        row = self.conn.execute("SELECT options FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row['options']) if row else None
+
+    def claim(self, job_id: str, worker_id: str) -> Optional[Dict]:
+        """
+        領取一個待處理或租約已逾時的項目
+        租約逾時且已達重試次數的項目（例如每次都讓 worker 當機的課程）標記為失敗，不再分派
+        Returns:
+            Dict: {'id': 項目編號, 'course': 課程資料}，沒有可領取的項目時返回 None
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("""
+                UPDATE items SET state = 'failed', error = ?, lease_until = NULL, updated_at = ?
+                WHERE job_id = ? AND state = 'leased' AND lease_until < ? AND attempts >= ?
+            """, ("租約逾時且已達重試次數", now, job_id, now, self.MAX_ATTEMPTS))
+            row = self.conn.execute("""
+                SELECT id, payload FROM items
+                WHERE job_id = ?
+                  AND (state = 'pending' OR (state = 'leased' AND lease_until < ?))
+                ORDER BY id LIMIT 1
+            """, (job_id, now)).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute("""
+                UPDATE items SET state = 'leased', worker = ?, lease_until = ?,
+                                 attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+            """, (worker_id, now + self.lease_seconds, now, row['id']))
+            self.conn.execute("COMMIT")
+            return {'id': row['id'], 'course': json.loads(row['payload'])}
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def complete(self, item_id: int, worker_id: str, result: Dict) -> bool:
+        """
+        回報項目完成
+        Returns:
+            bool: 是否仍持有租約（租約已被他人接手時結果不會寫入）
+        """
+        cursor = self.conn.execute("""
+            UPDATE items SET state = 'done', result = ?, lease_until = NULL, updated_at = ?
+            WHERE id = ? AND worker = ? AND state = 'leased'
+        """, (json.dumps(result, ensure_ascii=False), time.time(), item_id, worker_id))
+        return cursor.rowcount == 1
+
+    def fail(self, item_id: int, worker_id: str, error: str) -> None:
+        """回報項目失敗；未超過重試次數時放回佇列"""
+        self.conn.execute("""
+            UPDATE items
+            SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                error = ?, lease_until = NULL, updated_at = ?
+            WHERE id = ? AND worker = ? AND state = 'leased'
+        """, (self.MAX_ATTEMPTS, error, time.time(), item_id, worker_id))
+
+    def counts(self, job_id: str) -> Dict[str, int]:
+        """各狀態的項目數"""
+        rows = self.conn.execute(
+            "SELECT state, COUNT(*) AS n FROM items WHERE job_id = ? GROUP BY state", (job_id,)
+        ).fetchall()
+        return {row['state']: row['n'] for row in rows}
+
+    def is_finished(self, job_id: str) -> bool:
+        """所有項目皆已完成或放棄"""
+        counts = self.counts(job_id)
+        return not counts.get('pending') and not counts.get('leased')
+
+    def results(self, job_id: str) -> List[Dict]:
+        """依發布順序取得所有課程，已完成的項目附帶 stats"""
+        courses = []
+        for row in self.conn.execute(
+            "SELECT payload, result, state FROM items WHERE job_id = ? ORDER BY id", (job_id,)
+        ):
+            course = json.loads(row['payload'])
+            if row['state'] == 'done':
+                course['stats'] = json.loads(row['result'])
+            courses.append(course)
+        return courses
@@ -0,0 +1,35 @@
+from src.crawler.events import (
+    CourseFinished, CourseListed, Eta, EventBus, Progress, RateChanged, ResourceSample, Results, TextSink,
+    format_duration, format_resource
+)
+
+
+class QtEventSink:
+    """將爬蟲事件轉送到 CrawlerThread 的 Qt 信號（跨執行緒由 Qt 排入主執行緒處理）"""
+
+    def __init__(self, thread):
+        """
+        Args:
+            thread: 具有 progress、data_ready、course_fetched、list_ready、progress_percent、time_remaining、rate_info、resource_info 信號的物件
+        """
+        self.thread = thread
+
+    def attach(self, bus: EventBus) -> None:
+        thread = self.thread
+        TextSink(thread.progress.emit).attach(bus)
+        bus.subscribe(Results, lambda event: thread.data_ready.emit(event.courses))
+        bus.subscribe(CourseFinished, self._on_course_finished)
+        bus.subscribe(CourseListed, lambda event: thread.list_ready.emit(event.courses))
+        bus.subscribe(Progress, lambda event: thread.progress_percent.emit(event.percent))
+        bus.subscribe(Eta, self._on_eta)
+        bus.subscribe(RateChanged, lambda event: thread.rate_info.emit(event.description))
+        bus.subscribe(ResourceSample, lambda event: thread.resource_info.emit(format_resource(event)))
+
+    def _on_eta(self, event: Eta) -> None:
+        text = format_duration(event.seconds) if event.seconds is not None else "完成"
+        self.thread.time_remaining.emit(text)
+
+    def _on_course_finished(self, event: CourseFinished) -> None:
+        # 每完成一門只送出該門課程，完整的結果在結束時才送出一次
+        if event.ok and event.stats:
+            self.thread.course_fetched.emit(dict(event.course, stats=event.stats))
@@ -14,141 +14,177 @@ from PyQt6.QtWidgets import (
     QCheckBox,
     QDateEdit,
     QApplication,
-    QProgressBar
+    QProgressBar,
+    QSpinBox,
+    QComboBox
 )
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QObject, QDate, QTimer
+import multiprocessing
 import os
-import psutil
+import queue
+import time
 from datetime import datetime
 
-from src.crawler.login import EwantLogin
-from src.crawler.parser import CourseParser
-from src.crawler.export import CourseExporter
+# selenium、openpyxl、psutil、keyring 等較重的模組在實際使用時才載入，以加快程式啟動
+from src.crawler.aggregate import SUMMARY_HEADERS, summarize_courses
+from src.crawler.course_index import CourseIndex
+from src.crawler.crawl_job import run_crawl_process
+from src.crawler.events import EventBus, Finished
+from src.crawler.page_cache import PageCache
+from src.crawler.stats_schema import METRIC_ORDER, stat_columns, stat_value
 from src.utils.config import Config
 from src.utils.resource_utils import ResourceUtils
-
-class CrawlerThread(QThread):
-    """處理爬蟲的工作執行緒"""
+from src.ui.event_sink import QtEventSink
+
+# 課程表格的基本欄位，其後為勾選的統計欄位
+BASE_HEADERS = ["課程狀態", "課程名稱", "開始時間", "結束時間"]
+BASE_COLUMN_COUNT = len(BASE_HEADERS)
+
+# 匯出模式（與 src.crawler.export 的 MODE_* 相同），匯出模組較重，實際匯出時才載入
+EXPORT_MODES = [
+    ('new', "新檔案"),
+    ('sheet', "新增工作表"),
+    ('rows', "附加列"),
+    ('csv', "CSV 累積檔"),
+]
+
+class CrawlerProcess(QObject):
+    """在子行程執行爬蟲，透過佇列接收事件並轉為 Qt 信號（爬蟲崩潰不影響介面）"""
     finished = pyqtSignal(bool, str)   # 信號：(是否成功, 訊息)
     progress = pyqtSignal(str)         # 信號：進度訊息
-    data_ready = pyqtSignal(list)      # 信號：爬取到的資料
+    data_ready = pyqtSignal(list)      # 信號：爬取到的資料（結束時送出一次）
+    course_fetched = pyqtSignal(dict)  # 信號：剛擷取完成的一門課程
+    list_ready = pyqtSignal(list)      # 信號：完整的課程列表（未經篩選）
     progress_percent = pyqtSignal(int) # 信號：進度百分比
     time_remaining = pyqtSignal(str)   # 信號：剩餘時間
+    rate_info = pyqtSignal(str)        # 信號：目前的同時擷取數與請求速率
+    resource_info = pyqtSignal(str)    # 信號：瀏覽器的 CPU 與記憶體使用量
+
+    POLL_INTERVAL_MS = 100
+    MAX_EVENTS_PER_POLL = 200          # 每次最多處理的事件數，避免大量事件時介面停頓
 
     def __init__(self, username: str, password: str, search_text: str = None, 
-                 status_filters: list = None, start_date=None, end_date=None):
+                 status_filters: list = None, start_date=None, end_date=None, use_cache: bool = True,
+                 use_archive: bool = False, skip_keys: set = None, tabs: int = 1,
+                 capture_network: bool = False, stat_keys: list = None):
         super().__init__()
-        self.username = username
-        self.password = password
-        self.search_text = search_text
-        self.status_filters = status_filters or ["開課中"]
-        self.start_date = start_date
-        self.end_date = end_date
-        self.login_manager = None
-        self.parser = None
-        self.stop_flag = False
+        self.options = {
+            'username': username,
+            'password': password,
+            'search_text': search_text,
+            'status_filters': status_filters or ["開課中"],
+            'start_date': start_date,
+            'end_date': end_date,
+            'use_cache': use_cache,
+            'use_archive': use_archive,
+            'skip_keys': set(skip_keys or ()),
+            'tabs': tabs,
+            'capture_network': capture_network,
+            'stat_keys': stat_keys,
+        }
+        self.process = None
+        self.queue = None
+        self.stop_event = None
+        self.stop_deadline = None
+        self.done = False
         self.cleanup_timeout = 3  # 設定清理資源的最大等待時間（秒）
-        
-    def run(self):
-        try:
-            # 執行登入
-            self.progress.emit("初始化登入...")
-            self.login_manager = EwantLogin(headless=True)
-            
-            # 檢查是否提前收到停止信號
-            if self.stop_flag:
-                self.finished.emit(False, "爬蟲已停止")
-                return
-            
-            self.progress.emit("開始登入...")
-            success, message = self.login_manager.login(self.username, self.password)
-            
-            if not success:
-                self.finished.emit(False, f"登入失敗：{message}")
-                return
-                
-            # 再次檢查停止信號
-            if self.stop_flag:
-                self.finished.emit(False, "爬蟲已停止")
-                return
 
-            # 開始爬取資料
-            self.progress.emit("開始爬取課程資料...")
-            self.parser = CourseParser(
-                self.login_manager.get_driver(), 
-                progress=self.progress,
-                search_text=self.search_text,
-                status_filters=self.status_filters,
-                start_date=self.start_date,
-                end_date=self.end_date
-            )
-            
-            self.parser.data_ready = self.data_ready
-            self.parser.progress_percent = self.progress_percent
-            self.parser.time_remaining = self.time_remaining
+        # 子行程送來的事件在主執行緒重新分派，沿用 QtEventSink 轉為信號
+        self.events = EventBus()
+        QtEventSink(self).attach(self.events)
+        self.events.subscribe(Finished, self._on_finished)
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self.drain_events)
+
+    def start(self):
+        ctx = multiprocessing.get_context('spawn')
+        self.queue = ctx.Queue()
+        self.stop_event = ctx.Event()
+        self.process = ctx.Process(
+            target=run_crawl_process,
+            args=(self.options, self.queue, self.stop_event),
+            daemon=True
+        )
+        self.process.start()
+        self.poll_timer.start(self.POLL_INTERVAL_MS)
 
+    def drain_events(self, limit: int = MAX_EVENTS_PER_POLL):
+        """取出佇列中的事件並發送對應的信號"""
+        for _ in range(limit):
             try:
-                # 再次檢查停止信號
-                if self.stop_flag:
-                    self.finished.emit(False, "爬蟲已停止")
-                    return
-                    
-                # 執行爬蟲並獲取結果
-                courses = self.parser.process_all_courses()
-
-                if courses:
-                    # 直接發送完整的課程資料
-                    self.data_ready.emit(courses)
-                    self.finished.emit(True, "爬取完成")
-                else:
-                    self.finished.emit(False, "未取得任何課程資料")
-                
-            except Exception as e:
-                self.finished.emit(False, f"爬取過程發生錯誤：{str(e)}")
-            
-            finally:
-                # 確保總是清理資源
-                if self.login_manager:
-                    self.login_manager.close()
-                
-        except Exception as e:
-            self.finished.emit(False, f"執行過程發生錯誤：{str(e)}")
-        
+                event = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self.events.publish(event)
+
+        if not self.done and not self.process.is_alive() and self.queue.empty():
+            # 子行程結束卻沒有送出結果，代表異常終止
+            self._on_finished(Finished(False, f"爬蟲行程異常結束（代碼 {self.process.exitcode}）"))
+
+    def flush(self):
+        """子行程結束後取出所有剩餘的事件，確保停止前已擷取的資料送達介面"""
+        if self.queue is not None and not self.done:
+            while not self.queue.empty() and not self.done:
+                self.drain_events()
+            self.drain_events(0)
+
+    def _on_finished(self, event):
+        if self.done:
+            return
+        self.done = True
+        self.poll_timer.stop()
+        self.finished.emit(event.success, event.message)
+
+    def isRunning(self) -> bool:
+        if self.process is None:
+            return False
+        if self.stop_deadline and time.monotonic() > self.stop_deadline:
+            self.kill()
+        return self.process.is_alive()
+
+    def wait(self, timeout: float = None):
+        """等待子行程結束，已要求停止時最多等待 cleanup_timeout 秒後強制結束"""
+        if self.process is None:
+            return
+        if self.stop_event.is_set():
+            timeout = self.cleanup_timeout if timeout is None else min(timeout, self.cleanup_timeout)
+        self.process.join(timeout)
+        if self.stop_event.is_set() and self.process.is_alive():
+            self.kill()
+
     def stop(self):
-        """停止爬蟲並快速釋放資源"""
-        self.stop_flag = True
-        
-        if hasattr(self, 'parser') and self.parser:
-            try:
-                self.parser.stop_crawling = True
-            except Exception as e:
-                print(f"停止parser時出錯: {str(e)}")
-            self.parser = None
-        
-        if hasattr(self, 'login_manager') and self.login_manager:
-            try:
-                # 先嘗試透過WebDriver關閉
-                if hasattr(self.login_manager, 'driver') and self.login_manager.driver:
-                    try:
-                        self.login_manager.driver.quit()
-                    except Exception as e:
-                        print(f"關閉WebDriver時出錯: {str(e)}")
-            except Exception as e:
-                print(f"停止login_manager時出錯: {str(e)}")
-                
-            # 強制終止所有Chrome進程 (僅用於非生產環境)
-            try:
-                for proc in psutil.process_iter(['pid', 'name']):
-                    if 'chrome' in proc.info['name'].lower() or 'chromedriver' in proc.info['name'].lower():
-                        try:
-                            proc.terminate()  # 嘗試優雅終止
-                        except:
-                            pass
-            except:
-                pass
-                
-            self.login_manager = None
+        """要求子行程停止（不等待）"""
+        if self.stop_event is not None and not self.stop_event.is_set():
+            self.stop_event.set()
+            self.stop_deadline = time.monotonic() + self.cleanup_timeout
+
+    def kill(self):
+        """強制結束子行程及其啟動的瀏覽器"""
+        try:
+            import psutil
+            parent = psutil.Process(self.process.pid)
+            for child in parent.children(recursive=True):
+                try:
+                    child.kill()
+                except psutil.Error:
+                    pass
+        except Exception:
+            pass
+        self.process.kill()
+        self.process.join(1)
+
+class ConfigLoader(QThread):
+    """在背景讀取已儲存的帳號密碼（系統金鑰管理工具可能需要數秒）"""
+    loaded = pyqtSignal(dict)
+
+    def __init__(self, config):
+        super().__init__()
+        self.config = config
+
+    def run(self):
+        self.loaded.emit(self.config.load_config())
 
 class StopWorker(QObject):
     """停止爬蟲的工作執行緒"""
@@ -182,7 +218,17 @@ class MainWindow(QMainWindow):
         self.crawler_thread = None
         self.last_valid_row_count = 0
         self.courses = []
+        self.list_snapshot_search = None   # 課程列表快照對應的搜尋關鍵字
+        self.crawl_started_at = None       # 最近一次爬取的開始時間，匯出時作為擷取時間
+        self.course_index = None           # 課程列表快照的索引，用於本機篩選
+        self.fetched_courses = {}          # 已擷取的課程資料（以課程識別鍵為鍵）
+        self.course_rows = {}              # 課程識別鍵對應 (在 courses 中的位置, 表格的課程名稱項目)，排序後仍可找到所在列
         self.is_stopping = False
+        # 爬取期間逐門更新表格，統計摘要合併後再重新計算
+        self.summary_timer = QTimer(self)
+        self.summary_timer.setSingleShot(True)
+        self.summary_timer.setInterval(500)
+        self.summary_timer.timeout.connect(lambda: self.update_summary_table(self.courses))
         self.showMaximized()
     
     def init_ui(self):
@@ -240,6 +286,7 @@ class MainWindow(QMainWindow):
         
         search_label = QLabel("搜尋課程:")
         self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("多個關鍵字以逗號分隔，重複的課程只擷取一次")
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_input)
 
@@ -262,6 +309,11 @@ class MainWindow(QMainWindow):
         self.finished_checkbox.setChecked(False)
         status_layout.addWidget(self.finished_checkbox)
         
+        status_layout.addWidget(QLabel("名稱篩選:"))
+        self.name_filter_input = QLineEdit()
+        self.name_filter_input.setPlaceholderText("在已爬取的列表中篩選")
+        status_layout.addWidget(self.name_filter_input)
+
         status_layout.addStretch()  # 增加彈性空間
         
         layout.addWidget(login_group)
@@ -309,6 +361,31 @@ class MainWindow(QMainWindow):
         # 將日期選擇區域加入主布局
         layout.addWidget(date_group)
 
+        # ===擷取統計選擇區域===
+        metric_group = QWidget()
+        metric_layout = QHBoxLayout(metric_group)
+        metric_layout.addWidget(QLabel("擷取統計:"))
+
+        # 只勾選需要的統計可減少每門課程的擷取工作，表格與匯出也只包含這些欄位
+        self.metric_checkboxes = {}
+        for key in METRIC_ORDER:
+            checkbox = QCheckBox(key)
+            checkbox.setChecked(True)
+            checkbox.stateChanged.connect(self.refresh_course_table)
+            metric_layout.addWidget(checkbox)
+            self.metric_checkboxes[key] = checkbox
+
+        metric_layout.addStretch()
+        layout.addWidget(metric_group)
+
+        # 篩選條件變更時直接在本機重新篩選已爬取的列表
+        for checkbox in (self.ongoing_checkbox, self.upcoming_checkbox, self.finished_checkbox,
+                         self.enable_date_filter):
+            checkbox.stateChanged.connect(self.apply_local_filter)
+        self.start_date.dateChanged.connect(self.apply_local_filter)
+        self.end_date.dateChanged.connect(self.apply_local_filter)
+        self.name_filter_input.textChanged.connect(self.apply_local_filter)
+
         # ===按鈕區域===
         button_group = QWidget()
         button_layout = QHBoxLayout(button_group)
@@ -327,6 +404,37 @@ class MainWindow(QMainWindow):
         self.export_button.setEnabled(False)
         button_layout.addWidget(self.export_button)
 
+        self.export_mode_combo = QComboBox()
+        for mode, label in EXPORT_MODES:
+            self.export_mode_combo.addItem(label, mode)
+        self.export_mode_combo.setToolTip(
+            "新檔案：每次輸出新的 Excel 檔\n"
+            "新增工作表：在既有 Excel 檔加入以擷取時間命名的工作表\n"
+            "附加列：在既有 Excel 檔的「歷史資料」工作表附加資料列（含擷取時間欄位）\n"
+            "CSV 累積檔：附加到 CSV 檔，只寫入本次資料；檔案過大或欄位不同時另起新檔"
+        )
+        button_layout.addWidget(self.export_mode_combo)
+
+        self.cache_checkbox = QCheckBox("使用頁面快取")
+        self.cache_checkbox.setChecked(True)
+        self.cache_checkbox.setToolTip(f"{PageCache.DEFAULT_TTL // 60} 分鐘內重複爬取相同課程時直接使用上次的資料")
+        button_layout.addWidget(self.cache_checkbox)
+
+        button_layout.addWidget(QLabel("同時分頁數:"))
+        self.tabs_spinbox = QSpinBox()
+        self.tabs_spinbox.setRange(1, 8)
+        self.tabs_spinbox.setValue(1)
+        self.tabs_spinbox.setToolTip("在同一個已登入的瀏覽器開啟多個分頁同時擷取課程摘要，1 表示逐一擷取")
+        button_layout.addWidget(self.tabs_spinbox)
+
+        self.archive_checkbox = QCheckBox("保存頁面封存")
+        self.archive_checkbox.setToolTip("保存抓到的頁面原始碼，之後可用 cli.py reparse 離線重新解析")
+        button_layout.addWidget(self.archive_checkbox)
+
+        self.network_checkbox = QCheckBox("網路擷取")
+        self.network_checkbox.setToolTip("從瀏覽器收到的網路回應直接解析課程資料，找不到時改讀頁面內容（僅逐一擷取時使用）")
+        button_layout.addWidget(self.network_checkbox)
+
         layout.addWidget(button_group)
         
         # ===日誌視窗===
@@ -365,37 +473,31 @@ class MainWindow(QMainWindow):
         self.remaining_time_label = QLabel("剩餘時間: --:--")
         progress_layout.addWidget(self.remaining_time_label)
         
+        # 添加同時擷取數與請求速率標籤
+        self.rate_label = QLabel("")
+        progress_layout.addWidget(self.rate_label)
+
+        # 添加瀏覽器資源使用量標籤
+        self.resource_label = QLabel("")
+        progress_layout.addWidget(self.resource_label)
+        
         layout.addWidget(progress_container)
 
+        # 統計摘要
+        self.summary_table = QTableWidget()
+        self.summary_table.setColumnCount(len(SUMMARY_HEADERS))
+        self.summary_table.setHorizontalHeaderLabels(SUMMARY_HEADERS)
+        self.summary_table.verticalHeader().setVisible(False)
+        self.summary_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.summary_table.setMaximumHeight(200)
+        self.summary_table.setColumnWidth(1, 120)
+        layout.addWidget(self.summary_table)
+
         # 課程列表
         self.course_table = QTableWidget()
-        self.course_table.setColumnCount(24)
-        self.course_table.setHorizontalHeaderLabels([
-            '課程狀態',
-            '課程名稱',
-            '開始時間',
-            '結束時間', 
-            '選修人數(台灣)',
-            '選修人數(中國大陸)',
-            '選修人數(其他)',
-            '通過人數(台灣)',
-            '通過人數(中國大陸)',
-            '通過人數(其他)',
-            '影片瀏覽次數(台灣)',
-            '影片瀏覽次數(中國大陸)',
-            '影片瀏覽次數(其他)',
-            '作業測驗作答次數(台灣)',
-            '作業測驗作答次數(中國大陸)',
-            '作業測驗作答次數(其他)',
-            '講義參考資料瀏覽人數(台灣)',
-            '講義參考資料瀏覽人數(中國大陸)',
-            '講義參考資料瀏覽人數(其他)',
-            '講義參考資料瀏覽次數(台灣)',
-            '講義參考資料瀏覽次數(中國大陸)',
-            '講義參考資料瀏覽次數(其他)',
-            '討論次數',
-            '使用行動載具瀏覽影片次數'
-        ])
+        headers = self._course_headers()
+        self.course_table.setColumnCount(len(headers))
+        self.course_table.setHorizontalHeaderLabels(headers)
 
         # 設定表格屬性
         self.course_table.horizontalHeader().setStretchLastSection(True)
@@ -427,11 +529,17 @@ class MainWindow(QMainWindow):
             self.toggle_password_btn.setToolTip("顯示密碼")
     
     def load_config(self):
-        """載入設定"""
+        """在背景載入設定，不阻塞視窗顯示"""
         self.config = Config()
-        saved_config = self.config.load_config()
-        self.username_input.setText(saved_config.get('username', ''))
-        self.password_input.setText(saved_config.get('password', ''))
+        self.config_loader = ConfigLoader(self.config)
+        self.config_loader.loaded.connect(self.apply_config)
+        self.config_loader.start()
+
+    def apply_config(self, saved_config):
+        """填入已儲存的帳號密碼（使用者已自行輸入時不覆蓋）"""
+        if not self.username_input.text() and not self.password_input.text():
+            self.username_input.setText(saved_config.get('username', ''))
+            self.password_input.setText(saved_config.get('password', ''))
 
     def start_crawling(self):
         """開始爬蟲"""
@@ -443,9 +551,15 @@ class MainWindow(QMainWindow):
                     QMessageBox.warning(self, "警告", "請輸入帳號和密碼")
                     return
         
-        # 清空課程表格
-        self.courses = []
+        # 搜尋關鍵字不同時，先前的列表與擷取結果不再適用
+        if search_text != self.list_snapshot_search:
+            self.list_snapshot_search = search_text
+            self.course_index = None
+            self.fetched_courses = {}
+            self.courses = []
+            self.update_course_table(self.courses)
         self.last_valid_row_count = 0
+        self.crawl_started_at = datetime.now()
 
         # 檢查是否至少選擇一個狀態
         status_filters = []
@@ -459,6 +573,12 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "警告", "請至少選擇一種課程狀態")
             return
 
+        # 檢查是否至少選擇一種統計（None 表示全部）
+        stat_keys = self.selected_stat_keys()
+        if stat_keys == []:
+            QMessageBox.warning(self, "警告", "請至少選擇一種統計")
+            return
+
         # 檢查日期範圍
         start_date = None
         end_date = None
@@ -478,24 +598,36 @@ class MainWindow(QMainWindow):
         self.config.save_config(username, password)
         
         self.log_message("開始爬取程序...")
-        self.crawler_thread = CrawlerThread(
+        self.crawler_thread = CrawlerProcess(
             username, 
             password, 
             search_text,
             status_filters=status_filters,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            use_cache=self.cache_checkbox.isChecked(),
+            use_archive=self.archive_checkbox.isChecked(),
+            skip_keys=self.fetched_keys(stat_keys),
+            tabs=self.tabs_spinbox.value(),
+            capture_network=self.network_checkbox.isChecked(),
+            stat_keys=stat_keys
         )
 
         self.crawler_thread.progress.connect(self.log_message)
         self.crawler_thread.progress_percent.connect(self.update_progress)
         self.crawler_thread.time_remaining.connect(self.update_remaining_time)
+        self.crawler_thread.rate_info.connect(self.rate_label.setText)
+        self.crawler_thread.resource_info.connect(self.resource_label.setText)
         self.crawler_thread.finished.connect(self.handle_crawler_result)
-        self.crawler_thread.data_ready.connect(self.update_course_table)
+        self.crawler_thread.data_ready.connect(self.handle_crawler_data)
+        self.crawler_thread.course_fetched.connect(self.handle_course_fetched)
+        self.crawler_thread.list_ready.connect(self.handle_course_list)
 
         # 重置進度條和剩餘時間
         self.progress_bar.setValue(0)
         self.remaining_time_label.setText("剩餘時間: --:--")
+        self.rate_label.setText("")
+        self.resource_label.setText("")
         self.progress_bar.repaint()
         self.remaining_time_label.repaint()
         
@@ -535,6 +667,25 @@ class MainWindow(QMainWindow):
         self.start_date.clearFocus()
         self.end_date.clearFocus()
 
+    def selected_stat_keys(self):
+        """勾選的統計名稱，全部勾選時返回 None"""
+        keys = [key for key, checkbox in self.metric_checkboxes.items() if checkbox.isChecked()]
+        return None if len(keys) == len(self.metric_checkboxes) else keys
+
+    def fetched_keys(self, stat_keys) -> set:
+        """已擷取且包含所有需要統計的課程，不需重新擷取"""
+        needed = stat_keys if stat_keys is not None else METRIC_ORDER
+        return {key for key, course in self.fetched_courses.items()
+                if all(field in course['stats'] for field in needed)}
+
+    def _course_headers(self) -> list:
+        """課程表格的欄位標題"""
+        return BASE_HEADERS + [header for header, _, _ in stat_columns(self.selected_stat_keys())]
+
+    def refresh_course_table(self, *args):
+        """勾選的統計變更時重新產生表格欄位"""
+        self.update_course_table(self.courses)
+
     def _create_table_item(self, value, is_numeric=False):
         """建立表格項目"""
         if is_numeric:
@@ -553,20 +704,15 @@ class MainWindow(QMainWindow):
 
     def update_course_table(self, courses):
         """更新課程表格資料"""
+        # 填入資料時暫停排序與重繪，避免已排序的表格在填入過程中移動列
+        self.course_table.setSortingEnabled(False)
+        self.course_table.setUpdatesEnabled(False)
         self.course_table.setRowCount(0)  # 清空表格
         self.course_table.setRowCount(len(courses))
         
-        # 設置表頭
-        headers = [
-            "課程狀態", "課程名稱", "開始時間", "結束時間",
-            "選修人數(台灣)", "選修人數(中國大陸)", "選修人數(其他)",
-            "通過人數(台灣)", "通過人數(中國大陸)", "通過人數(其他)",
-            "影片瀏覽次數(台灣)", "影片瀏覽次數(中國大陸)", "影片瀏覽次數(其他)",
-            "作業測驗作答次數(台灣)", "作業測驗作答次數(中國大陸)", "作業測驗作答次數(其他)",
-            "講義參考資料瀏覽人數(台灣)", "講義參考資料瀏覽人數(中國大陸)", "講義參考資料瀏覽人數(其他)",
-            "講義參考資料瀏覽次數(台灣)", "講義參考資料瀏覽次數(中國大陸)", "講義參考資料瀏覽次數(其他)",
-            "討論次數", "使用行動載具瀏覽影片次數"
-        ]
+        # 設置表頭：基本欄位加上目前勾選的統計欄位
+        columns = stat_columns(self.selected_stat_keys())
+        headers = self._course_headers()
         self.course_table.setColumnCount(len(headers))
         self.course_table.setHorizontalHeaderLabels(headers)
         
@@ -576,71 +722,18 @@ class MainWindow(QMainWindow):
         self.course_table.setColumnWidth(2, 100)  # 開始時間
         self.course_table.setColumnWidth(3, 100)  # 結束時間
         
-        # 設定數字類型欄位寬度
-        for col in range(4, 24):
-            self.course_table.setColumnWidth(col, 130)  # 數字類資料欄位
-        
-        # 設置最後兩列較小的寬度
-        self.course_table.setColumnWidth(22, 80)  # 討論次數
-        self.course_table.setColumnWidth(23, 160) # 使用行動載具瀏覽影片次數
+        # 設定數字類型欄位寬度，討論次數較窄、使用行動載具瀏覽影片次數較寬
+        narrow_widths = {'討論次數': 80, '使用行動載具瀏覽影片次數': 160}
+        for col, (header, _, _) in enumerate(columns, start=BASE_COLUMN_COUNT):
+            self.course_table.setColumnWidth(col, narrow_widths.get(header, 130))
         
         # 如果有課程數據，則填充表格
+        self.course_rows = {}
         for row, course in enumerate(courses):
-            # 顯示課程基本資訊
-            self.course_table.setItem(row, 0, self._create_table_item(course["status"]))
-            self.course_table.setItem(row, 1, self._create_table_item(course["name"]))
-            self.course_table.setItem(row, 2, self._create_table_item(course["start_time"]))
-            self.course_table.setItem(row, 3, self._create_table_item(course["end_time"]))
-            
-            # 如果有統計資訊，顯示選修人數等統計資料
-            if 'stats' in course and course["stats"]:
-                stats = course["stats"]
-                
-                # 選修人數
-                if '選修人數' in stats:
-                    self.course_table.setItem(row, 4, self._create_table_item(stats['選修人數'].get('台灣', 0), True))
-                    self.course_table.setItem(row, 5, self._create_table_item(stats['選修人數'].get('中國大陸', 0), True))
-                    self.course_table.setItem(row, 6, self._create_table_item(stats['選修人數'].get('其他', 0), True))
-                
-                # 通過人數
-                if '通過人數' in stats:
-                    self.course_table.setItem(row, 7, self._create_table_item(stats['通過人數'].get('台灣', 0), True))
-                    self.course_table.setItem(row, 8, self._create_table_item(stats['通過人數'].get('中國大陸', 0), True))
-                    self.course_table.setItem(row, 9, self._create_table_item(stats['通過人數'].get('其他', 0), True))
-                
-                # 影片瀏覽次數
-                if '影片瀏覽次數' in stats:
-                    self.course_table.setItem(row, 10, self._create_table_item(stats['影片瀏覽次數'].get('台灣', 0), True))
-                    self.course_table.setItem(row, 11, self._create_table_item(stats['影片瀏覽次數'].get('中國大陸', 0), True))
-                    self.course_table.setItem(row, 12, self._create_table_item(stats['影片瀏覽次數'].get('其他', 0), True))
-                    
-                # 作業測驗作答次數
-                if '作業測驗作答次數' in stats:
-                    self.course_table.setItem(row, 13, self._create_table_item(stats['作業測驗作答次數'].get('台灣', 0), True))
-                    self.course_table.setItem(row, 14, self._create_table_item(stats['作業測驗作答次數'].get('中國大陸', 0), True))
-                    self.course_table.setItem(row, 15, self._create_table_item(stats['作業測驗作答次數'].get('其他', 0), True))
-                
-                # 講義參考資料瀏覽人數
-                if '講義參考資料瀏覽人數' in stats:
-                    self.course_table.setItem(row, 16, self._create_table_item(stats['講義參考資料瀏覽人數'].get('台灣', 0), True))
-                    self.course_table.setItem(row, 17, self._create_table_item(stats['講義參考資料瀏覽人數'].get('中國大陸', 0), True))
-                    self.course_table.setItem(row, 18, self._create_table_item(stats['講義參考資料瀏覽人數'].get('其他', 0), True))
-                    
-                # 講義參考資料瀏覽次數
-                if '講義參考資料瀏覽次數' in stats:
-                    self.course_table.setItem(row, 19, self._create_table_item(stats['講義參考資料瀏覽次數'].get('台灣', 0), True))
-                    self.course_table.setItem(row, 20, self._create_table_item(stats['講義參考資料瀏覽次數'].get('中國大陸', 0), True))
-                    self.course_table.setItem(row, 21, self._create_table_item(stats['講義參考資料瀏覽次數'].get('其他', 0), True))
-                
-                # 討論次數
-                if '討論次數' in stats:
-                    self.course_table.setItem(row, 22, self._create_table_item(stats['討論次數'], True))
-                    
-                # 使用行動載具瀏覽影片次數
-                if '使用行動載具瀏覽影片次數' in stats:
-                    self.course_table.setItem(row, 23, self._create_table_item(stats['使用行動載具瀏覽影片次數'], True))
+            self.course_rows[course['key']] = (row, self._fill_course_row(row, course, columns))
                     
         # 設定表格屬性
+        self.course_table.setUpdatesEnabled(True)
         self.course_table.setSortingEnabled(True)  # 啟用排序功能
         self.course_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)  # 整行選取
         
@@ -650,6 +743,30 @@ class MainWindow(QMainWindow):
         # 啟用匯出按鈕
         self.export_button.setEnabled(len(courses) > 0)
 
+    def _fill_course_row(self, row, course, columns):
+        """
+        填入一列課程資料
+        Returns:
+            QTableWidgetItem: 課程名稱項目
+        """
+        # 顯示課程基本資訊
+        self.course_table.setItem(row, 0, self._create_table_item(course["status"]))
+        name_item = self._create_table_item(course["name"])
+        if course.get('keywords'):
+            name_item.setToolTip(f"符合關鍵字：{'、'.join(course['keywords'])}")
+        self.course_table.setItem(row, 1, name_item)
+        self.course_table.setItem(row, 2, self._create_table_item(course["start_time"]))
+        self.course_table.setItem(row, 3, self._create_table_item(course["end_time"]))
+
+        # 如果有統計資訊，只顯示勾選的統計欄位（未擷取的統計留白）
+        if 'stats' in course and course["stats"]:
+            stats = course["stats"]
+            for col, (_, key, region) in enumerate(columns, start=BASE_COLUMN_COUNT):
+                value = stat_value(stats, key, region)
+                if value is not None:
+                    self.course_table.setItem(row, col, self._create_table_item(value, True))
+        return name_item
+
     def stop_crawling(self):
         """停止爬取"""
         if not self.is_stopping and self.crawler_thread and self.crawler_thread.isRunning():
@@ -661,15 +778,18 @@ class MainWindow(QMainWindow):
             if self.crawler_thread:
                 self.crawler_thread.stop()
                 
-                # 創建一個計時器，定期檢查線程是否結束
+                # 創建一個計時器，定期檢查爬蟲是否結束（取消後通常在一秒內結束）
                 self.check_timer = QTimer()
                 self.check_timer.timeout.connect(self.check_thread_stopped)
-                self.check_timer.start(500)  # 每500毫秒檢查一次
+                self.check_timer.start(100)
 
     def check_thread_stopped(self):
         """檢查爬蟲線程是否已停止"""
         if not self.crawler_thread or not self.crawler_thread.isRunning():
             self.check_timer.stop()
+            if self.crawler_thread:
+                # 保留停止前已擷取的資料
+                self.crawler_thread.flush()
             self.is_stopping = False
             self.crawler_thread = None
             if hasattr(self, 'course_table') and self.courses:
@@ -704,8 +824,14 @@ class MainWindow(QMainWindow):
             else:
                 filter_info = f"{start_date_str}到{end_date_str}"
         
+        from src.crawler.export import CourseExporter
         exporter = CourseExporter(self.course_table)
-        exporter.export_to_excel(filter_info)
+        exporter.export(
+            self.export_mode_combo.currentData(),
+            filter_info,
+            summary_rows=summarize_courses(self.courses),
+            crawled_at=self.crawl_started_at
+        )
     
     def log_message(self, message):
         """添加日誌訊息"""
@@ -730,23 +856,97 @@ class MainWindow(QMainWindow):
         if success:
             self.log_message("爬取完成！")
             self.export_button.setEnabled(True)
+        elif self.is_stopping:
+            # 使用者要求停止，已擷取的資料已顯示於表格
+            self.export_button.setEnabled(self.course_table.rowCount() > 0)
         else:
             self.log_message(f"爬取失敗：{message}")
             QMessageBox.critical(self, "錯誤", f"爬取失敗：{message}")
 
-        # 關閉瀏覽器
-        if self.crawler_thread and self.crawler_thread.login_manager:
-            self.crawler_thread.login_manager.close()
-
     def handle_crawler_data(self, data: list):
         """處理爬取到的資料"""
-        self.update_course_table(data)
+        for course in data:
+            if course.get('stats'):
+                self.fetched_courses[course['key']] = course
+        if self.course_index:
+            self.apply_local_filter()
+        else:
+            self.courses = data
+            self.update_course_table(data)
+            self.update_summary_table(data)
+
+    def handle_course_fetched(self, course: dict):
+        """爬取期間每完成一門課程只更新（或新增）該列，完整的資料在結束時由 handle_crawler_data 處理"""
+        key = course['key']
+        self.fetched_courses[key] = course
+        if key in self.course_rows:
+            position, name_item = self.course_rows[key]
+            row = name_item.row()
+            self.courses[position] = course
+        elif self.course_index:
+            # 不在目前的篩選結果中
+            return
+        else:
+            # 課程列表尚未送達，依完成順序新增
+            position, row = len(self.courses), self.course_table.rowCount()
+            self.course_table.insertRow(row)
+            self.courses.append(course)
+
+        self.course_table.setSortingEnabled(False)
+        name_item = self._fill_course_row(row, course, stat_columns(self.selected_stat_keys()))
+        self.course_table.setSortingEnabled(True)
+        self.course_rows[key] = (position, name_item)
+        self.export_button.setEnabled(True)
+        if not self.summary_timer.isActive():
+            self.summary_timer.start()
+
+    def handle_course_list(self, courses: list):
+        """收到完整的課程列表後建立索引（多個關鍵字時合併各次搜尋的列表）"""
+        snapshot = {course['key']: course for course in self.course_index.courses} if self.course_index else {}
+        snapshot.update((course['key'], course) for course in courses)
+        self.course_index = CourseIndex(list(snapshot.values()))
+        self.apply_local_filter()
+
+    def apply_local_filter(self, *args):
+        """以目前的狀態、日期與名稱條件在本機篩選課程列表，已擷取的課程顯示統計資料"""
+        if not self.course_index:
+            return
+
+        statuses = [checkbox.text() for checkbox in
+                    (self.ongoing_checkbox, self.upcoming_checkbox, self.finished_checkbox)
+                    if checkbox.isChecked()]
+        start_date = end_date = None
+        if self.enable_date_filter.isChecked() and self.start_date.date() <= self.end_date.date():
+            start_date = datetime.combine(self.start_date.date().toPyDate(), datetime.min.time())
+            end_date = datetime.combine(self.end_date.date().toPyDate(), datetime.max.time())
+
+        rows = self.course_index.filter(statuses, start_date, end_date, self.name_filter_input.text())
+        self.courses = [self.fetched_courses.get(course['key'], course) for course in rows]
+        self.update_course_table(self.courses)
+        self.update_summary_table(self.courses)
+
+        pending = sum(1 for course in self.courses if course['key'] not in self.fetched_courses)
+        if pending:
+            self.statusBar().showMessage(f"共 {len(self.courses)} 門課程，其中 {pending} 門尚未擷取，"
+                                         f"按「開始爬取」只會擷取這些課程")
+
+    def update_summary_table(self, courses):
+        """更新統計摘要（全部、各課程狀態、各地區的合計與比例）"""
+        self.summary_rows = summarize_courses(courses)
+        self.summary_table.setRowCount(len(self.summary_rows))
+        pass_rate_col = SUMMARY_HEADERS.index("通過率")
+        for row, values in enumerate(self.summary_rows):
+            for col, value in enumerate(values):
+                text = f"{value:.2%}" if col == pass_rate_col and value != "" else str(value)
+                self.summary_table.setItem(row, col, QTableWidgetItem(text))
 
     def closeEvent(self, event):
         """視窗關閉事件"""
         if self.crawler_thread and self.crawler_thread.isRunning():
             self.stop_crawling()
             self.crawler_thread.wait()
+        if self.config_loader.isRunning():
+            self.config_loader.wait()
         event.accept()
     
     def _setup_date_filter(self):
@@ -1,4 +1,3 @@
-import keyring
 import os
 from typing import Dict
 
@@ -13,6 +12,8 @@ class Config:
     def load_config(self) -> Dict[str, str]:
         """讀取設定"""
         try:
+            # keyring 載入時會搜尋可用的後端，延後到實際讀取時才載入
+            import keyring
             # 先取得使用者名稱（不加密儲存）
             username = keyring.get_password(self.app_name, "username") or ""
             # 再用使用者名稱取得對應的密碼
@@ -28,6 +29,7 @@ class Config:
     def save_config(self, username: str, password: str) -> None:
         """儲存設定"""
         try:
+            import keyring
             # 儲存使用者名稱
             keyring.set_password(self.app_name, "username", username)
             # 儲存密碼
@@ -0,0 +1,68 @@
+from typing import Dict, List, Tuple
+
+
+class ProcessUtils:
+    """瀏覽器行程工具類別（psutil 在使用時才載入，不影響程式啟動）"""
+
+    @staticmethod
+    def get_driver_processes(driver) -> List:
+        """
+        取得 WebDriver 啟動的 chromedriver 及其所有子行程（Chrome）
+
+        Args:
+            driver: Selenium WebDriver 實例
+
+        Returns:
+            psutil.Process 列表，無法取得時返回空列表
+        """
+        import psutil
+
+        try:
+            service_process = driver.service.process
+            root = psutil.Process(service_process.pid)
+            return [root] + root.children(recursive=True)
+        except Exception:
+            return []
+
+    @staticmethod
+    def get_memory_mb(driver) -> float:
+        """取得瀏覽器行程樹的常駐記憶體總和（MB）"""
+        import psutil
+
+        total = 0
+        for proc in ProcessUtils.get_driver_processes(driver):
+            try:
+                total += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+
+    @staticmethod
+    def sample_usage(driver, known: Dict) -> Tuple[float, float, int]:
+        """
+        取得瀏覽器行程樹目前的 CPU 使用率、常駐記憶體與行程數
+
+        Args:
+            driver: Selenium WebDriver 實例
+            known: pid -> 上次取樣的 psutil.Process，會就地更新；CPU 使用率是與上次取樣之間的平均，
+                   同一行程第一次取樣時為 0
+
+        Returns:
+            (CPU 使用率 %（各行程加總，可超過 100）, 常駐記憶體 MB, 行程數)
+        """
+        import psutil
+
+        cpu_percent = 0.0
+        rss = 0
+        current = {}
+        for proc in ProcessUtils.get_driver_processes(driver):
+            proc = known.get(proc.pid, proc)
+            try:
+                cpu_percent += proc.cpu_percent(interval=None)
+                rss += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            current[proc.pid] = proc
+        known.clear()
+        known.update(current)
+        return cpu_percent, rss / (1024 * 1024), len(current)
@@ -52,4 +52,23 @@ class ResourceUtils:
             
         except Exception as e:
             print(f"取得資源路徑時發生錯誤: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def get_output_dir(name: str) -> str:
+        """
+        取得輸出資料夾路徑（不存在時自動建立）
+        
+        Args:
+            name: 資料夾名稱，例如 metrics
+            
+        Returns:
+            位於執行檔旁（開發環境為目前工作目錄）的資料夾路徑
+        """
+        if getattr(sys, 'frozen', False):
+            base_path = os.path.dirname(sys.executable)
+        else:
+            base_path = os.getcwd()
+        path = os.path.join(base_path, name)
+        os.makedirs(path, exist_ok=True)
+        return path